@@ -0,0 +1,132 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.deps import get_async_db, get_skill_index, require_admin
+from app.core.security import password_hasher
+from app.crud import async_course as async_crud_course
+from app.crud import async_user as async_crud_user
+from app.db.database import pool_metrics
+from app.services.cache import user_cache
+from app.services.principal import principal_cache
+from app.schemas import course as course_schema
+from app.services.recommendation import recommendation_service
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/models")
+def get_model_status():
+    """
+    Phiên bản model đang chạy, thống kê các lần nạp và nội dung registry.
+    """
+    manifest = recommendation_service.registry.read()
+    return {
+        **recommendation_service.model_info(),
+        "history": manifest["history"],
+        "versions": manifest["versions"],
+    }
+
+
+def _start_reload(version=None):
+    if not recommendation_service.reload(version):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="A model reload is in progress."
+        )
+    return {"status": "loading", "version": version}
+
+
+@router.post("/models/reload", status_code=status.HTTP_202_ACCEPTED)
+def reload_active_model():
+    """
+    Nạp (trong nền) phiên bản active trong manifest rồi hoán đổi vào.
+    """
+    return _start_reload(recommendation_service.registry.active_version())
+
+
+@router.post("/models/activate/{version}", status_code=status.HTTP_202_ACCEPTED)
+def activate_model(version: str):
+    """
+    Đặt `version` làm phiên bản active trong manifest và nạp nó.
+    """
+    try:
+        recommendation_service.registry.activate(version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _start_reload(version)
+
+
+@router.post("/models/rollback", status_code=status.HTTP_202_ACCEPTED)
+def rollback_model():
+    """
+    Quay về phiên bản được kích hoạt trước đó và nạp lại.
+    """
+    try:
+        version = recommendation_service.registry.rollback()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _start_reload(version)
+
+
+@router.get("/db/pool")
+def get_pool_stats():
+    """
+    Số liệu pool kết nối của worker xử lý request này (mỗi worker có pool riêng).
+    """
+    return {name: metrics.stats() for name, metrics in pool_metrics.items()}
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """
+    Số liệu cache principal (xác thực) và cache kết quả theo người dùng của worker này.
+    """
+    return {"principal": principal_cache.stats(), "user_results": user_cache.stats()}
+
+
+@router.get("/password-hasher")
+def get_password_hasher_stats():
+    """
+    Trạng thái pool băm mật khẩu (bcrypt) của worker này.
+    """
+    return password_hasher.stats()
+
+
+@router.post(
+    "/personalized-paths", response_model=List[course_schema.UserLearningPath]
+)
+async def precompute_personalized_paths(
+    request: course_schema.BatchPathRequest, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Tính lộ trình cá nhân hóa cho nhiều người dùng (ví dụ tính sẵn trang chủ)
+    và ghi vào cache kết quả. Dữ liệu kỹ năng của cả lô được tải bằng 3 truy
+    vấn, thông tin khóa học bằng 1 truy vấn; người dùng chưa làm khảo sát bị
+    bỏ qua. Lô lớn hơn nên chạy qua scripts/precompute_paths.py.
+    """
+    # Khóa cache lấy trước khi đọc dữ liệu và chỉ mục (xem UserResultCache.key)
+    keys = {
+        user_id: user_cache.key("personalized_path", user_id)
+        for user_id in request.user_ids
+    }
+    index = await get_skill_index()
+    path_requests = await async_crud_user.get_path_requests(db, request.user_ids)
+    paths = await run_in_threadpool(
+        recommendation_service.get_personalized_paths, path_requests, index=index
+    )
+    for user_id, course_ids in paths.items():
+        user_cache.set(keys[user_id], course_ids)
+
+    courses = await async_crud_course.get_courses_by_ids(
+        db, course_ids=list({id for ids in paths.values() for id in ids})
+    )
+    course_map = {course.id: course for course in courses}
+    return [
+        {
+            "user_id": user_id,
+            "courses": [course_map[id] for id in course_ids if id in course_map],
+        }
+        for user_id, course_ids in paths.items()
+    ]
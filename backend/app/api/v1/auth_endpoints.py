@@ -1,41 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # TRƯỚC KHI SỬA: from app import schemas
 # SAU KHI SỬA: Import trực tiếp các module bạn cần
 from app.schemas import user as user_schema
 from app.schemas import token as token_schema
 
-from app.crud import user as crud_user
-from app.core.security import create_access_token, verify_password
+from app.crud import async_user as async_crud_user
+from app.core.security import PasswordPoolBusy, create_access_token, password_hasher
 
-# Đổi tên import này để tránh nhầm lẫn, hoặc đảm bảo nó import đúng file
-from .endpoints import get_db
+from app.api.v1.deps import get_async_db
 
 router = APIRouter()
 
 
+async def _password_op(operation):
+    """
+    Chờ một thao tác của password_hasher; khi pool băm đã đầy thì trả 503
+    để client thử lại sau, thay vì xếp hàng làm chậm cả API.
+    """
+    try:
+        return await operation
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent password operations, please retry.",
+            headers={"Retry-After": "1"},
+        )
+
+
 # Dùng user_schema.User thay vì schemas.user.User
 @router.post("/register", response_model=user_schema.User)
-def register_user(user: user_schema.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud_user.get_user_by_email(db, email=user.email)
+async def register_user(
+    user: user_schema.UserCreate, db: AsyncSession = Depends(get_async_db)
+):
+    db_user = await async_crud_user.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud_user.create_user(db=db, user=user)
+    hashed_password = await _password_op(password_hasher.hash(user.password))
+    return await async_crud_user.create_user(
+        db, email=user.email, hashed_password=hashed_password
+    )
 
 
 # Dùng token_schema.Token thay vì schemas.token.Token
 @router.post("/login/token", response_model=token_schema.Token)
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = crud_user.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await async_crud_user.get_user_by_email(db, email=form_data.username)
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await _password_op(
+            password_hasher.verify_and_update(form_data.password, user.hashed_password)
+        )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.email})
+    # Hash cũ dùng cost khác BCRYPT_ROUNDS: lưu hash mới, người dùng không cần làm gì
+    if new_hash:
+        await async_crud_user.update_password_hash(db, user, new_hash)
+    # `sub` là user id để các request sau tra cứu theo khóa chính
+    access_token = create_access_token(
+        data={"sub": str(user.id), "email": user.email}
+    )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,15 +1,21 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+import hmac
+from typing import AsyncGenerator, Generator, List, Optional, Set
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
 
 from app.db import models
 from app.schemas import token as token_schema
 from app.crud import user as crud_user
+from app.crud import async_user as async_crud_user
 from app.core import config
-from app.db.database import SessionLocal
+from app.db.database import AsyncSessionLocal, SessionLocal
+from app.services.principal import Principal, principal_cache
+from app.services.recommendation import recommendation_service
+from app.services.skill_index import CourseSkillIndex
 
 # Tạo một "scheme" OAuth2, nó sẽ yêu cầu token từ header "Authorization: Bearer <token>"
 # tokenUrl trỏ đến API login của chúng ta, điều này giúp Swagger UI hoạt động tốt
@@ -18,8 +24,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login/token")
 
 def get_db() -> Generator:
     """
-    Dependency để lấy một session CSDL.
-    (Chúng ta định nghĩa lại ở đây để tránh import vòng lặp)
+    Dependency để lấy một session CSDL (bản duy nhất, dùng cho mọi router).
     """
     db = SessionLocal()
     try:
@@ -28,41 +33,209 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> models.User:
+async def get_async_db() -> AsyncGenerator:
+    """
+    Dependency để lấy một AsyncSession, dùng cho các endpoint `async def`.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_skill_index() -> CourseSkillIndex:
     """
-    Dependency để lấy người dùng hiện tại từ JWT token.
+    Dependency lấy chỉ mục khóa học-kỹ năng mà không chặn event loop: khi
+    catalog đổi, bản mới được dựng ở luồng nền trong lúc bản cũ vẫn phục vụ.
+    Trả 503 khi model và chỉ mục còn đang tải (worker vừa khởi động).
     """
-    credentials_exception = HTTPException(
+    index = recommendation_service.skill_index.current()
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendation index is loading, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    return index
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> token_schema.TokenData:
+    """Giải mã JWT và lấy định danh trong trường 'sub'; token không hợp lệ -> 401."""
     try:
-        # Giải mã token JWT
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
-        # Lấy email từ payload. 'sub' (subject) là một trường phổ biến để chứa định danh user
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = token_schema.TokenData(email=email)
+        # 'sub' (subject) là user id với token mới, email với token phát hành trước đó
+        subject: str = payload.get("sub")
+        if subject is None:
+            raise _credentials_exception()
+        if subject.isdigit():
+            return token_schema.TokenData(
+                user_id=int(subject), email=payload.get("email")
+            )
+        return token_schema.TokenData(email=subject)
     except (JWTError, ValidationError):
-        raise credentials_exception
+        raise _credentials_exception()
 
-    # Lấy thông tin user từ CSDL
-    user = crud_user.get_user_by_email(db, email=token_data.email)
+
+def _load_user(db: Session, token_data: token_schema.TokenData) -> models.User:
+    if token_data.user_id is not None:
+        user = crud_user.get_user(db, token_data.user_id)
+    else:
+        user = crud_user.get_user_by_email(db, email=token_data.email)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+
+def _cache_principal(user: models.User) -> Principal:
+    principal = Principal.from_user(user)
+    principal_cache.set(principal)
+    return principal
+
+
+def _check_active(user):
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
 
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> models.User:
+    """
+    Dependency để lấy người dùng hiện tại (đối tượng ORM) từ JWT token. Chỉ
+    dùng khi endpoint cần ghi vào User; các trường hợp khác dùng
+    get_current_principal (có cache).
+    """
+    return _load_user(db, _decode_token(token))
+
+
 def get_current_active_user(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
     """
     Dependency để lấy người dùng hiện tại và kiểm tra xem họ có "active" không.
     """
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+    return _check_active(current_user)
+
+
+def get_current_principal(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Principal của người dùng hiện tại; không truy vấn CSDL khi cache hit.
+    """
+    token_data = _decode_token(token)
+    if token_data.user_id is not None:
+        principal = principal_cache.get(token_data.user_id)
+        if principal is not None:
+            return principal
+    return _cache_principal(_load_user(db, token_data))
+
+
+def get_current_active_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    return _check_active(principal)
+
+
+async def get_current_principal_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Phiên bản async của get_current_principal. Khi cache miss, User được tải
+    theo khóa chính kèm profile trong một truy vấn.
+    """
+    token_data = _decode_token(token)
+    if token_data.user_id is not None:
+        principal = principal_cache.get(token_data.user_id)
+        if principal is not None:
+            return principal
+        user = await async_crud_user.get_user(db, token_data.user_id)
+    else:
+        user = await async_crud_user.get_user_by_email(db, email=token_data.email)
+    if user is None:
+        raise _credentials_exception()
+    return _cache_principal(user)
+
+
+async def get_current_active_principal_async(
+    principal: Principal = Depends(get_current_principal_async),
+) -> Principal:
+    return _check_active(principal)
+
+
+def require_admin(x_admin_token: str = Header(default="")):
+    """
+    Dependency cho các endpoint quản trị: yêu cầu header X-Admin-Token khớp
+    với ADMIN_TOKEN. Nếu ADMIN_TOKEN không được cấu hình thì mọi request bị từ chối.
+    """
+    if not config.ADMIN_TOKEN or not hmac.compare_digest(
+        x_admin_token, config.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+class UserSkillContext:
+    """
+    Dữ liệu kỹ năng của người dùng hiện tại, được tải một lần cho mỗi request.
+    FastAPI cache kết quả của một dependency trong phạm vi request, nên mọi
+    endpoint/dependency dùng `get_user_skill_context` trong cùng request đều
+    dùng chung một lần truy vấn.
+    """
+
+    def __init__(
+        self,
+        user: Principal,
+        known_skill_ids: Set[int],
+        target_skills: List[models.Skill],
+        learning_style: Optional[str],
+    ):
+        self.user = user
+        self.known_skill_ids = known_skill_ids
+        self.target_skills = target_skills
+        self.target_skill_ids = {skill.id for skill in target_skills}
+        self.learning_style = learning_style
+
+
+def load_user_skill_context(db: Session, user: Principal) -> UserSkillContext:
+    """
+    Tải kỹ năng đã biết (1 truy vấn UNION), kỹ năng mục tiêu (1 truy vấn) và
+    phong cách học của người dùng. Dùng trực tiếp khi endpoint chỉ cần dữ liệu
+    này lúc cache kết quả bị miss.
+    """
+    return UserSkillContext(
+        user=user,
+        known_skill_ids=crud_user.get_known_skill_ids(db, user.id),
+        target_skills=crud_user.get_target_skills(db, user.id),
+        learning_style=user.learning_style,
+    )
+
+
+async def load_user_skill_context_async(
+    db: AsyncSession, user: Principal
+) -> UserSkillContext:
+    """
+    Phiên bản async của load_user_skill_context.
+    """
+    return UserSkillContext(
+        user=user,
+        known_skill_ids=await async_crud_user.get_known_skill_ids(db, user.id),
+        target_skills=await async_crud_user.get_target_skills(db, user.id),
+        learning_style=user.learning_style,
+    )
+
+
+def get_user_skill_context(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_principal),
+) -> UserSkillContext:
+    """
+    Dependency trả về UserSkillContext của người dùng hiện tại.
+    """
+    return load_user_skill_context(db, current_user)
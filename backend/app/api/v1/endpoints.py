@@ -1,34 +1,68 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import database, models
-from app.crud import course as crud_course
+from app.api.v1.deps import get_async_db
+from app.api.v1.pagination import decode_cursor_param, ndjson_stream, set_next_cursor
+from app.db import models
+from app.crud import async_course as async_crud_course
 from app.schemas import course as schemas
 from app.services.recommendation import recommendation_service
+from app.services.search import SearchIndexNotReady, SearchQuery
 
 router = APIRouter()
 
 
-def get_db():
-    db = database.SessionLocal()
+@router.get("/courses", response_model=List[schemas.Course])
+async def read_courses(
+    response: Response,
+    search: str = "",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Danh sách khóa học theo id, hoặc kết quả tìm kiếm theo độ liên quan khi có
+    `search`. Trang tiếp theo: gửi lại header X-Next-Cursor qua `cursor` (chi
+    phí không tăng theo độ sâu như `skip`, vẫn được hỗ trợ cho client cũ).
+    """
+    query = SearchQuery(search)
+    if query:
+        # Cursor của kết quả tìm kiếm chỉ dùng được với đúng truy vấn đó
+        kind, key_types = "search:" + " ".join(query.terms), (float, int)
+    else:
+        kind, key_types = "courses", (int,)
+    after = decode_cursor_param(cursor, kind, key_types)
     try:
-        yield db
-    finally:
-        db.close()
+        page = await async_crud_course.get_course_page(
+            db, limit=limit, search=search, after=after, skip=0 if after else skip
+        )
+    except SearchIndexNotReady:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search index is loading, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    set_next_cursor(response, kind, page)
+    return page.items
 
 
-@router.get("/courses", response_model=List[schemas.Course])
-def read_courses(
-    search: str = "", skip: int = 0, limit: int = 20, db: Session = Depends(get_db)
-):
-    courses = crud_course.get_courses(db, skip=skip, limit=limit, search=search)
-    return courses
+# Khai báo trước /courses/{course_id} để "export" không bị hiểu là course_id
+@router.get("/courses/export", response_class=StreamingResponse)
+async def export_courses():
+    """Xuất toàn bộ catalog dạng NDJSON (mỗi dòng một khóa học), đọc theo lô keyset."""
+    return StreamingResponse(
+        ndjson_stream(async_crud_course.iter_courses, schemas.Course),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get("/courses/{course_id}", response_model=schemas.CourseWithSkills)
-def read_course_detail(course_id: int, db: Session = Depends(get_db)):
-    db_course = crud_course.get_course_by_id(db, course_id=course_id)
+async def read_course_detail(course_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_course = await async_crud_course.get_course_by_id(db, course_id=course_id)
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
     return db_course
@@ -37,12 +71,18 @@ def read_course_detail(course_id: int, db: Session = Depends(get_db)):
 @router.get(
     "/recommendations/content-based/{course_id}", response_model=List[schemas.Course]
 )
-def get_content_based_recommendations(course_id: int, db: Session = Depends(get_db)):
+async def get_content_based_recommendations(
+    course_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Lấy các khóa học tương tự dựa trên nội dung (Content-Based).
     """
-    # 1. Gọi service để lấy list các ID được gợi ý
-    recommended_ids = recommendation_service.get_recommendations(course_id)
+    # 1. Gọi service để lấy list các ID được gợi ý. Chạy trong threadpool: top-K
+    # là tính toán CPU, và ở worker vừa khởi động lời gọi này chờ lần tải model
+    # đang chạy; cả hai đều không được chặn event loop (/healthz, request khác)
+    recommended_ids = await run_in_threadpool(
+        recommendation_service.get_recommendations, course_id
+    )
 
     if not recommended_ids:
         # Nếu không có gợi ý, trả về một danh sách rỗng
@@ -50,6 +90,50 @@ def get_content_based_recommendations(course_id: int, db: Session = Depends(get_
 
     # 2. Dùng các ID đó để truy vấn thông tin đầy đủ của khóa học từ CSDL
     # Điều này đảm bảo dữ liệu trả về luôn mới nhất
-    recommended_courses = crud_course.get_courses_by_ids(db, course_ids=recommended_ids)
+    recommended_courses = await async_crud_course.get_courses_by_ids(
+        db, course_ids=recommended_ids
+    )
 
     return recommended_courses
+
+
+@router.post(
+    "/recommendations/content-based/batch",
+    response_model=List[schemas.CourseRecommendations],
+)
+async def get_content_based_recommendations_batch(
+    request: schemas.BatchRecommendationRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Gợi ý Content-Based cho nhiều khóa học trong một lần gọi: láng giềng của
+    mọi khóa học được tính trong một phép toán ma trận, thông tin khóa học được
+    lấy bằng MỘT truy vấn. Kết quả theo thứ tự `course_ids`; khóa học không có
+    trong model nhận danh sách rỗng.
+    """
+    # Chấm điểm là tính toán CPU, chạy trong threadpool để không chặn event loop
+    similar = await run_in_threadpool(
+        recommendation_service.get_similar_courses_many,
+        request.course_ids,
+        request.limit,
+    )
+    recommended_ids = {
+        int(course_id) for ids, _ in similar.values() for course_id in ids
+    }
+    courses = await async_crud_course.get_courses_by_ids(
+        db, course_ids=list(recommended_ids)
+    )
+    course_map = {course.id: course for course in courses}
+
+    empty = ((), ())
+    return [
+        {
+            "course_id": course_id,
+            "recommendations": [
+                course_map[id]
+                for id in similar.get(course_id, empty)[0]
+                if id in course_map
+            ],
+        }
+        for course_id in dict.fromkeys(request.course_ids)
+    ]
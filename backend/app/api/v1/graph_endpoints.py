@@ -1,21 +1,180 @@
-from fastapi import APIRouter, Depends
-from networkx.readwrite import json_graph
+import gzip
+import hashlib
+from typing import Dict, List, Optional
 
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.deps import get_async_db, get_current_active_principal_async
+from app.crud import async_user as async_crud_user
+from app.services.graph_view import GraphView
+from app.services.principal import Principal
 from app.services.recommendation import recommendation_service
 
 router = APIRouter()
 
+# Đồ thị con nhỏ hơn ngưỡng này không đáng nén
+MIN_COMPRESS_BYTES = 1400
+
+
+def _accepted_encodings(request: Request) -> List[str]:
+    """Các encoding client chấp nhận (bỏ qua những encoding có q=0)."""
+    accepted = []
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if q and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.append(name.strip().lower())
+    return accepted
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": f'"{etag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Response 304 nếu If-None-Match chứa `etag` (kể cả biến thể -gzip/-br)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        if candidate in ("*", etag) or candidate.rsplit("-", 1)[0] == etag:
+            return Response(status_code=304, headers=_cache_headers(etag))
+    return None
+
+
+def _graph_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    encoded: Optional[Dict[str, bytes]] = None,
+) -> Response:
+    """
+    Trả `body` (JSON đã mã hóa) với ETag; 304 nếu client đã có đúng phiên bản,
+    bản nén sẵn (hoặc gzip tại chỗ với payload lớn) nếu client chấp nhận. Mỗi
+    encoding có ETag riêng (hậu tố -gzip/-br) vì nội dung bytes khác nhau.
+    """
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    accepted = _accepted_encodings(request)
+    if encoded is None and len(body) >= MIN_COMPRESS_BYTES and "gzip" in accepted:
+        encoded = {"gzip": gzip.compress(body, 5)}
+    for name in ("br", "gzip"):
+        if encoded and name in encoded and name in accepted:
+            headers = _cache_headers(f"{etag}-{name}")
+            headers["Content-Encoding"] = name
+            return Response(
+                encoded[name], media_type="application/json", headers=headers
+            )
+    return Response(body, media_type="application/json", headers=_cache_headers(etag))
+
+
+def _graph_view() -> GraphView:
+    view = recommendation_service.graph_view
+    if view is None:
+        raise HTTPException(status_code=404, detail="Skill graph is not loaded")
+    return view
+
+
+def _subgraph_response(
+    request: Request, view: GraphView, nodes: np.ndarray, params: str
+) -> Response:
+    # Đồ thị con chỉ phụ thuộc vào đồ thị và tham số truy vấn
+    etag = f"{view.digest}.{hashlib.sha1(params.encode()).hexdigest()[:12]}"
+    return _not_modified(request, etag) or _graph_response(
+        request, view.subgraph_json(nodes), etag
+    )
+
 
 @router.get("/dependency-graph")
-def get_dependency_graph():
+def get_dependency_graph(request: Request):
     """
     Lấy dữ liệu đồ thị phụ thuộc kỹ năng ở định dạng JSON.
     """
-    graph = recommendation_service.skill_graph
-    if not graph:
+    view = recommendation_service.graph_view
+    if view is None:
         return {"nodes": [], "links": []}
 
-    # Chuyển đổi đối tượng NetworkX graph thành JSON tương thích
-    # Định dạng này gồm các nút (nodes) và các liên kết (links/edges)
-    graph_data = json_graph.node_link_data(graph)
-    return graph_data
+    # Payload node-link đã được mã hóa và nén sẵn một lần cho mỗi phiên bản model
+    return _graph_response(request, view.body, view.digest, view.encoded)
+
+
+@router.get("/ego")
+def get_ego_graph(
+    request: Request,
+    skill: str,
+    radius: int = Query(1, ge=1, le=5),
+    direction: str = Query("both", pattern="^(in|out|both)$"),
+):
+    """
+    Đồ thị con quanh một kỹ năng trong `radius` bước: kỹ năng tiên quyết (in),
+    kỹ năng học sau (out) hoặc cả hai.
+    """
+    view = _graph_view()
+    if skill not in view.position:
+        raise HTTPException(status_code=404, detail="Skill not found in graph")
+    nodes = view.ego(skill, radius, direction)
+    return _subgraph_response(
+        request, view, nodes, f"ego|{skill}|{radius}|{direction}"
+    )
+
+
+@router.get("/prerequisites")
+def get_prerequisite_graph(
+    request: Request,
+    skill: List[str] = Query(...),
+    depth: Optional[int] = Query(None, ge=1, le=50),
+):
+    """
+    Các kỹ năng đã cho cùng các kỹ năng tiên quyết của chúng (tới `depth` bước,
+    mặc định không giới hạn), dạng node-link.
+    """
+    view = _graph_view()
+    nodes = view.prerequisites(skill, depth)
+    if nodes.size == 0:
+        raise HTTPException(status_code=404, detail="Skill not found in graph")
+    return _subgraph_response(
+        request, view, nodes, f"prerequisites|{'|'.join(sorted(set(skill)))}|{depth}"
+    )
+
+
+@router.get("/me/prerequisites")
+async def get_my_prerequisite_graph(
+    request: Request,
+    depth: Optional[int] = Query(None, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_active_principal_async),
+):
+    """Đồ thị tiên quyết của các kỹ năng mục tiêu của người dùng hiện tại."""
+    # Handler async: không được tải model trên event loop (xem _model trong
+    # recommendation.py), worker vừa khởi động trả 503 để client thử lại
+    if not recommendation_service.is_loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Skill graph is loading, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    targets = await async_crud_user.get_target_skills(db, principal.id)
+    names = sorted({skill.skill_name for skill in targets})
+    # Duyệt đồ thị và mã hóa JSON là tính toán CPU, chạy trong threadpool
+    return await run_in_threadpool(_my_prerequisite_response, request, names, depth)
+
+
+def _my_prerequisite_response(
+    request: Request, names: List[str], depth: Optional[int]
+) -> Response:
+    view = _graph_view()
+    nodes = view.prerequisites(names, depth)
+    return _subgraph_response(
+        request, view, nodes, f"prerequisites|{'|'.join(names)}|{depth}"
+    )
+
@@ -0,0 +1,50 @@
+"""
+Phân trang cho các endpoint danh sách.
+
+Body vẫn là một mảng JSON như trước; khi còn dữ liệu, response có header
+X-Next-Cursor, client gửi lại giá trị đó qua tham số `cursor` để lấy trang
+tiếp theo. Các endpoint /export trả toàn bộ danh sách dạng NDJSON (mỗi dòng
+một đối tượng) theo luồng.
+"""
+from typing import AsyncIterator, Callable, List, Optional, Sequence, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+
+from app.core.pagination import InvalidCursor, Page, decode_cursor, encode_cursor
+from app.db.database import AsyncSessionLocal
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def decode_cursor_param(
+    cursor: Optional[str], kind: str, types: Sequence[type]
+) -> Optional[List]:
+    """Khóa keyset từ tham số `cursor`; cursor không hợp lệ -> 400."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, kind, types)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def set_next_cursor(response: Response, kind: str, page: Page):
+    if page.next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(kind, page.next_key)
+
+
+async def ndjson_stream(
+    iter_batches: Callable[..., AsyncIterator[List]], schema: Type[BaseModel]
+) -> AsyncIterator[str]:
+    """
+    Mỗi lô từ `iter_batches(db)` thành các dòng NDJSON. Dùng session riêng vì
+    response còn được gửi sau khi các dependency của endpoint đã kết thúc.
+    """
+    async with AsyncSessionLocal() as db:
+        async for batch in iter_batches(db):
+            yield "".join(
+                schema.model_validate(item, from_attributes=True).model_dump_json()
+                + "\n"
+                for item in batch
+            )
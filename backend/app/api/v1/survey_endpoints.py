@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.db import models
 from app.schemas import survey as survey_schema
 from app.schemas import survey as skill_schema
 from app.api.v1.deps import get_current_active_user  # Sẽ tạo dependency này ở bước sau
-from app.api.v1.deps import get_db
+from app.api.v1.deps import get_async_db, get_db
+from app.api.v1.pagination import decode_cursor_param, ndjson_stream, set_next_cursor
+from app.crud import async_skill as async_crud_skill
+from app.services.cache import user_cache
 
 router = APIRouter()
 
@@ -46,6 +51,9 @@ def submit_user_survey(
     db.add(profile)
 
     db.commit()
+    # learning_style đã được lưu (kể cả khi skill id không hợp lệ bên dưới) nên
+    # bỏ kết quả đã cache ngay; lần tăng thứ hai sau khi lưu kỹ năng bên dưới
+    user_cache.bump_user(current_user.id)
 
     # Kiểm tra xem tất cả các skill id gửi lên có hợp lệ không
     if len(known_skills) != len(survey_data.known_skill_ids) or len(
@@ -61,17 +69,38 @@ def submit_user_survey(
     # 3. Lưu vào CSDL
     db.add(current_user)
     db.commit()
+    user_cache.bump_user(current_user.id)
 
     # status_code=204 có nghĩa là "thành công nhưng không có nội dung trả về"
     return
 
 
-# API để lấy tất cả các skill có trong hệ thống (để hiển thị trên trang khảo sát)
+# API để lấy các skill có trong hệ thống (để hiển thị trên trang khảo sát)
 @router.get(
     "/skills", response_model=List[skill_schema.Skill]
 )  # <--- SỬA LẠI RESPONSE MODEL
-def get_all_skills(db: Session = Depends(get_db)):
+async def get_all_skills(
+    response: Response,
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Lấy danh sách tất cả các kỹ năng có sẵn.
+    Lấy danh sách các kỹ năng theo tên, từng trang; trang tiếp theo: gửi lại
+    header X-Next-Cursor qua `cursor`.
     """
-    return db.query(models.Skill).order_by(models.Skill.skill_name).all()
+    after = decode_cursor_param(cursor, "skills", (str,))
+    page = await async_crud_skill.get_skill_page(
+        db, limit=limit, after_name=after[0] if after else None
+    )
+    set_next_cursor(response, "skills", page)
+    return page.items
+
+
+@router.get("/skills/export", response_class=StreamingResponse)
+async def export_skills():
+    """Xuất toàn bộ kỹ năng dạng NDJSON (mỗi dòng một kỹ năng)."""
+    return StreamingResponse(
+        ndjson_stream(async_crud_skill.iter_skills, skill_schema.Skill),
+        media_type="application/x-ndjson",
+    )
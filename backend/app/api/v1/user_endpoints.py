@@ -1,20 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 
+from app.core.metrics import span
 from app.db import models
 from app.db.models import UserCourseProgress
 from app.schemas import user as user_schema, course as course_schema
 from app.schemas import analytics as analytics_schema, progress as progress_schema
-from app.crud import course as crud_course
+from app.crud import async_course as async_crud_course
+from app.crud import async_user as async_crud_user
+from app.services.cache import user_cache
+from app.services.principal import Principal
 from app.services.recommendation import recommendation_service
-from app.api.v1.deps import get_current_active_user, get_db
+from app.api.v1.deps import (
+    UserSkillContext,
+    get_async_db,
+    get_current_active_principal,
+    get_current_active_principal_async,
+    get_db,
+    get_skill_index,
+    load_user_skill_context_async,
+)
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=user_schema.User)
-def read_users_me(current_user: models.User = Depends(get_current_active_user)):
+async def read_users_me(
+    current_user: Principal = Depends(get_current_active_principal_async),
+):
     """
     Lấy thông tin của người dùng hiện tại đã được xác thực.
     """
@@ -26,7 +42,7 @@ def update_course_progress(
     *,
     db: Session = Depends(get_db),
     progress_update: progress_schema.ProgressUpdate,
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_principal)
 ):
     """
     Cập nhật hoặc tạo mới trạng thái tiến độ của một khóa học cho người dùng.
@@ -62,68 +78,58 @@ def update_course_progress(
 
     db.add(progress_item)
     db.commit()
+    # Khóa học hoàn thành làm thay đổi kỹ năng đã biết -> bỏ kết quả đã cache
+    user_cache.bump_user(current_user.id)
     db.refresh(progress_item)
     return progress_item
 
 
 @router.get("/me/progress", response_model=List[progress_schema.ProgressInDB])
-def get_my_progress(
+async def get_my_progress(
     *,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_principal_async)
 ):
     """
     Lấy tất cả các bản ghi tiến độ (trạng thái khóa học) của người dùng hiện tại.
     """
-    return (
-        db.query(UserCourseProgress)
-        .filter(UserCourseProgress.user_id == current_user.id)
-        .all()
-    )
-
-
-def get_dynamic_known_skills(user: models.User) -> set:
-    """Helper function to calculate user's current known skills."""
-    # Lấy kỹ năng từ khảo sát
-    known_from_survey = {skill.id for skill in user.known_skills}
-
-    # Lấy kỹ năng từ các khóa học đã hoàn thành
-    # Eager loading 'course' and 'course.skills' is recommended for performance
-    completed_progress = [
-        p for p in user.progress if p.status == "completed" and p.course
-    ]
-
-    known_from_completed = set()
-    for progress_item in completed_progress:
-        for skill in progress_item.course.skills:
-            known_from_completed.add(skill.id)
-
-    return known_from_survey.union(known_from_completed)
+    return await async_crud_user.get_progress(db, current_user.id)
 
 
 @router.get(
     "/me/skill-gap-analytics", response_model=analytics_schema.SkillGapAnalytics
 )
-def get_my_skill_gap_analytics(
+async def get_my_skill_gap_analytics(
     *,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_principal_async)
 ):
     """
     Lấy dữ liệu phân tích "động" về khoảng trống kỹ năng của người dùng.
+    Kết quả được cache đến khi người dùng nộp khảo sát hoặc cập nhật tiến độ.
     """
-    if not current_user.target_skills:
+    key = user_cache.key("skill_gap", current_user.id)
+    analytics = user_cache.get(key)
+    if analytics is None:
+        skill_context = await load_user_skill_context_async(db, current_user)
+        analytics = _compute_skill_gap_analytics(skill_context)
+        user_cache.set(key, analytics)
+    return analytics_schema.SkillGapAnalytics(**analytics)
+
+
+def _compute_skill_gap_analytics(skill_context: UserSkillContext) -> dict:
+    if not skill_context.target_skills:
         raise HTTPException(status_code=400, detail="Please complete the survey first.")
 
-    dynamic_known_skills = get_dynamic_known_skills(current_user)
+    dynamic_known_skills = skill_context.known_skill_ids
 
-    target_skills_set = set(current_user.target_skills)
-    target_skill_ids = {skill.id for skill in target_skills_set}
+    target_skills_set = set(skill_context.target_skills)
+    target_skill_ids = skill_context.target_skill_ids
     skill_gap_ids = target_skill_ids - dynamic_known_skills
 
     total_target = len(target_skill_ids)
     if total_target == 0:
-        return analytics_schema.SkillGapAnalytics(
+        return dict(
             total_target_skills=0,
             known_skills=0,
             gap_skills=0,
@@ -140,7 +146,7 @@ def get_my_skill_gap_analytics(
     }
     gap_skill_names = sorted([skill.skill_name for skill in gap_skill_objects])
 
-    return analytics_schema.SkillGapAnalytics(
+    return dict(
         total_target_skills=total_target,
         known_skills=known_count,
         gap_skills=gap_count,
@@ -151,31 +157,50 @@ def get_my_skill_gap_analytics(
 
 
 @router.get("/me/personalized-path", response_model=List[course_schema.Course])
-def get_my_personalized_learning_path(
+async def get_my_personalized_learning_path(
     *,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_principal_async)
 ):
     """
     Lấy lộ trình học tập "động" cho người dùng, tính đến cả tiến độ hiện tại.
+    Danh sách id khóa học được cache; thông tin khóa học luôn được lấy mới.
+    Khi catalog đổi, chỉ mục được dựng lại ở nền và cache bị vô hiệu hóa.
     """
-    if not current_user.target_skills:
-        raise HTTPException(
-            status_code=400, detail="User has not completed the survey yet."
+    key = user_cache.key("personalized_path", current_user.id)
+    recommended_ids = user_cache.get(key)
+    if recommended_ids is None:
+        # Chỉ mục lấy SAU khóa cache: nếu nó được dựng lại giữa chừng, kết quả
+        # rơi vào thế hệ cũ (sẽ bị bỏ) chứ không ghi đè thế hệ mới
+        index = await get_skill_index()
+        with span("path.user_context"):
+            skill_context = await load_user_skill_context_async(db, current_user)
+        if not skill_context.target_skills:
+            raise HTTPException(
+                status_code=400, detail="User has not completed the survey yet."
+            )
+
+        # Phần chấm điểm là tính toán CPU, chạy trong threadpool để không
+        # chặn event loop
+        recommended_ids = await run_in_threadpool(
+            recommendation_service.get_personalized_path,
+            user=current_user,
+            known_skill_ids=skill_context.known_skill_ids,
+            target_skill_ids=skill_context.target_skill_ids,
+            index=index,
+            learning_style=skill_context.learning_style,
         )
-
-    dynamic_known_skills = get_dynamic_known_skills(current_user)
-
-    recommended_ids = recommendation_service.get_personalized_path(
-        user=current_user, known_skill_ids=dynamic_known_skills, db=db
-    )
+        user_cache.set(key, recommended_ids)
 
     if not recommended_ids:
         return []
 
-    courses = crud_course.get_courses_by_ids(db, course_ids=recommended_ids)
+    with span("path.hydrate"):
+        courses = await async_crud_course.get_courses_by_ids(
+            db, course_ids=recommended_ids
+        )
 
-    course_map = {course.id: course for course in courses}
-    sorted_courses = [course_map[id] for id in recommended_ids if id in course_map]
+        course_map = {course.id: course for course in courses}
+        sorted_courses = [course_map[id] for id in recommended_ids if id in course_map]
 
     return sorted_courses
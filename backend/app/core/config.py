@@ -7,3 +7,100 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY", "a_very_secret_key_that_should_be_in_env_file")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Token sẽ hết hạn sau 30 phút
+
+# Thư mục chứa các file model (được mount vào '/models' trong docker-compose)
+MODEL_DIR = os.getenv("MODEL_DIR", "/models")
+# Chế độ tính độ tương đồng: "topk" (bảng láng giềng tính sẵn, mặc định),
+# "dense" (ma trận N×N, cần train_model.py --dense), "sparse" (tính khi cần
+# từ ma trận TF-IDF) hoặc "ann" (chỉ mục IVF, scripts/build_ann_index.py)
+SIMILARITY_MODE = os.getenv("SIMILARITY_MODE", "topk")
+# Núm vặn recall/độ trễ cho chế độ "ann": số danh sách IVF được quét và số
+# ứng viên được chấm lại bằng cosine chính xác (0 = không chấm lại)
+ANN_N_PROBE = int(os.getenv("ANN_N_PROBE", "8"))
+ANN_RERANK = int(os.getenv("ANN_RERANK", "0"))
+# Định dạng artifact: "joblib" (file gốc từ notebook) hoặc "mmap" (các file .npy
+# do scripts/convert_artifacts.py tạo ra, dùng chung giữa các worker)
+ARTIFACT_FORMAT = os.getenv("ARTIFACT_FORMAT", "joblib")
+MMAP_ARTIFACT_DIR = os.getenv("MMAP_ARTIFACT_DIR", os.path.join(MODEL_DIR, "mmap"))
+# Số luồng đọc song song các file model (ma trận tương đồng, dữ liệu khóa học,
+# đồ thị, vectorizer) khi khởi động
+MODEL_LOAD_WORKERS = int(os.getenv("MODEL_LOAD_WORKERS", "4"))
+# Khởi động (tạo bảng, tải model, dựng chỉ mục) chạy ở luồng nền để worker trả
+# lời /healthz ngay; 0 = chạy xong trong lifespan rồi mới nhận request
+STARTUP_BACKGROUND = os.getenv("STARTUP_BACKGROUND", "1") == "1"
+# Kiểu lưu điểm tương đồng (dense/topk) khi tải artifact joblib/npz: "float32",
+# "float16" hoặc "uint8"; để trống thì giữ nguyên. Với mmap, kiểu được chọn lúc
+# chuyển đổi (scripts/convert_artifacts.py --score-dtype)
+SCORE_DTYPE = os.getenv("SCORE_DTYPE", "")
+# Chu kỳ (giây) kiểm tra catalog trong CSDL để dựng lại chỉ mục khóa học-kỹ năng
+SKILL_INDEX_REFRESH_SECONDS = float(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "60"))
+# Trọng số chấm điểm lộ trình cá nhân hóa (xem app/services/path_scorer.py)
+PATH_WEIGHT_GAP_SKILL = float(os.getenv("PATH_WEIGHT_GAP_SKILL", "10"))
+PATH_WEIGHT_BEGINNER = float(os.getenv("PATH_WEIGHT_BEGINNER", "5"))
+PATH_WEIGHT_INTERMEDIATE = float(os.getenv("PATH_WEIGHT_INTERMEDIATE", "2"))
+PATH_WEIGHT_RATING = float(os.getenv("PATH_WEIGHT_RATING", "1"))
+PATH_WEIGHT_LEARNING_STYLE = float(os.getenv("PATH_WEIGHT_LEARNING_STYLE", "15"))
+# Số khóa học tối đa trong một lộ trình
+PATH_LENGTH = int(os.getenv("PATH_LENGTH", "20"))
+# Cache kết quả theo người dùng (lộ trình, phân tích skill gap):
+# "memory" (LRU trong tiến trình), "redis" (dùng REDIS_URL) hoặc "none".
+# Với "memory", số phiên bản dùng để vô hiệu hóa cũng nằm trong từng worker:
+# chỉ đúng khi chạy MỘT worker, trừ khi đặt USER_CACHE_COUNTERS=redis; nếu
+# không, worker khác có thể trả kết quả cũ tới USER_CACHE_TTL_SECONDS
+USER_CACHE_BACKEND = os.getenv("USER_CACHE_BACKEND", "memory")
+# Nơi giữ số phiên bản người dùng/thế hệ: "backend" (cùng chỗ với giá trị)
+# hoặc "redis" (dùng chung giữa các worker, giá trị vẫn ở USER_CACHE_BACKEND)
+USER_CACHE_COUNTERS = os.getenv("USER_CACHE_COUNTERS", "backend")
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Đồng bộ tăng dần catalog trong CSDL vào model Content-Based (xem
+# app/services/catalog_update.py); fit lại TF-IDF khi tỉ lệ token ngoài từ vựng
+# vượt ngưỡng hoặc một lần thay đổi chạm tới quá tỉ lệ catalog cho phép
+CATALOG_SYNC_ENABLED = os.getenv("CATALOG_SYNC_ENABLED", "true").lower() == "true"
+CATALOG_DRIFT_OOV_THRESHOLD = float(os.getenv("CATALOG_DRIFT_OOV_THRESHOLD", "0.05"))
+CATALOG_MAX_DELTA_FRACTION = float(os.getenv("CATALOG_MAX_DELTA_FRACTION", "0.2"))
+# Registry phiên bản model (xem app/services/model_registry.py) và chu kỳ (giây)
+# đọc manifest để tự nạp phiên bản active mới; 0 = chỉ nạp qua endpoint admin
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(MODEL_DIR, "registry"))
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "30"))
+# Token cho các endpoint /api/v1/admin (header X-Admin-Token); để trống = tắt
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Pool kết nối CSDL (áp dụng cho cả engine đồng bộ và async, mỗi worker
+# uvicorn có pool riêng: tổng kết nối tối đa = số worker × (size + overflow))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Số giây chờ lấy kết nối từ pool trước khi báo lỗi
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Đóng và mở lại kết nối đã sống quá số giây này (-1 = không bao giờ)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Timeout mở kết nối (giây) và timeout mỗi câu lệnh (ms, 0 = không giới hạn);
+# chỉ áp dụng cho PostgreSQL
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# Cache principal cho các request có JWT (xem app/services/principal.py);
+# TTL ngắn vì mỗi worker có cache riêng
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+# Băm mật khẩu bằng bcrypt: cost (log2 số vòng; hash cũ có cost khác được băm
+# lại khi đăng nhập), số tiến trình băm riêng (0 = dùng thread trong tiến trình
+# chính) và số thao tác băm tối đa đang chờ trước khi trả 503
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))
+)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+# Tìm kiếm khóa học (xem app/services/search.py): "auto" dùng tsvector + GIN
+# khi CSDL là PostgreSQL và chỉ mục BM25 trong bộ nhớ với các CSDL khác;
+# "memory" luôn dùng chỉ mục trong bộ nhớ. SEARCH_PREFIX_EXPANSIONS giới hạn
+# số từ được mở rộng từ tiền tố đang gõ
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_PREFIX_EXPANSIONS = int(os.getenv("SEARCH_PREFIX_EXPANSIONS", "50"))
+# Ghi log theo cấp (DEBUG/INFO/WARNING/ERROR); "OFF" tắt log của ứng dụng.
+# Chi tiết từng request (thời gian, số câu lệnh SQL, các span) ở cấp DEBUG
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Đo độ trễ request, span và số câu lệnh SQL, xuất ở GET /metrics (Prometheus)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Request chậm hơn ngưỡng này (ms) được ghi log WARNING kèm chi tiết; 0 = tắt
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
@@ -0,0 +1,27 @@
+"""
+Cấu hình logging cho các logger "app.*" (mỗi module dùng logging.getLogger(__name__)).
+
+Không đụng tới logger gốc và logger của uvicorn. LOG_LEVEL=OFF tắt hẳn log của
+ứng dụng: các lệnh logger.debug(...) trên đường nóng khi đó chỉ còn là một
+phép so sánh cấp, không định dạng chuỗi và không ghi stdout.
+"""
+import logging
+import sys
+
+from app.core import config
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def setup_logging(level: str = config.LOG_LEVEL):
+    logger = logging.getLogger("app")
+    if level == "OFF":
+        logger.setLevel(logging.CRITICAL + 1)
+        return
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        # Không lặp lại qua handler của logger gốc (nếu có)
+        logger.propagate = False
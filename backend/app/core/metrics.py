@@ -0,0 +1,475 @@
+"""
+Đo đạc request và xuất số liệu theo định dạng văn bản của Prometheus (GET /metrics).
+
+- MetricsMiddleware: histogram độ trễ theo method, route (mẫu đường dẫn như
+  "/api/v1/courses/{course_id}", không phải đường dẫn thật, để số chuỗi số liệu
+  không tăng theo id) và mã trạng thái; cùng số câu lệnh SQL và thời gian CSDL
+  của mỗi request.
+- span(name): đo một đoạn trên đường nóng (sinh ứng viên, chấm điểm, sắp xếp
+  theo đồ thị, hydrate khóa học...), cộng vào histogram chung và vào thống kê
+  của request hiện tại.
+- instrument_engine(engine): event before/after_cursor_execute của SQLAlchemy
+  cộng số câu lệnh và thời gian vào request hiện tại (qua ContextVar, nên đúng
+  cả với endpoint đồng bộ chạy trong threadpool và AsyncSession).
+
+Số liệu nằm trong bộ nhớ của từng worker uvicorn; Prometheus scrape từng worker
+(hoặc cộng theo nhãn instance). METRICS_ENABLED=false tắt toàn bộ việc đo.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+# Content-Type của định dạng văn bản Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Ngưỡng (giây) của các histogram, theo kiểu Prometheus (le = "nhỏ hơn hoặc bằng")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SPAN_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histogram có nhãn; mỗi tổ hợp nhãn giữ số đếm theo ngưỡng, tổng và số mẫu."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # nhãn -> [số mẫu theo ngưỡng (không cộng dồn, phần tử cuối là +Inf), tổng]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self) -> Dict[Tuple, Tuple[List[int], float]]:
+        with self._lock:
+            return {labels: (list(s[0]), s[1]) for labels, s in self._series.items()}
+
+    def render(self, lines: List[str]):
+        lines.append(f"# HELP {self.name} {self.documentation}")
+        lines.append(f"# TYPE {self.name} histogram")
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_labels(names, labels + (_number(bound),))} "
+                    f"{cumulative}"
+                )
+            label_str = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+
+
+class Counter:
+    """Bộ đếm tăng dần có nhãn."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self, lines: List[str]):
+        lines.append(f"# HELP {self.name} {self.documentation}")
+        lines.append(f"# TYPE {self.name} counter")
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(
+                f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            )
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Thời gian xử lý request HTTP (tới khi gửi xong body).",
+    ("method", "route", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Số câu lệnh SQL của mỗi request.",
+    ("method", "route"),
+    QUERY_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Tổng thời gian thực thi SQL của mỗi request.",
+    ("method", "route"),
+)
+SPAN_SECONDS = Histogram(
+    "recommender_span_seconds",
+    "Thời gian các đoạn trên đường nóng của RecommendationService.",
+    ("span",),
+    SPAN_BUCKETS,
+)
+DB_QUERIES = Counter(
+    "db_queries_total", "Số câu lệnh SQL đã thực thi (mọi request và tác vụ nền).", ("engine",)
+)
+DB_SECONDS = Counter(
+    "db_query_seconds_total", "Tổng thời gian thực thi SQL.", ("engine",)
+)
+
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_DB_SECONDS, SPAN_SECONDS)
+COUNTERS = (DB_QUERIES, DB_SECONDS)
+
+
+class RequestStats:
+    """Thống kê của request đang xử lý (đặt bởi MetricsMiddleware)."""
+
+    __slots__ = ("queries", "db_seconds", "spans")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.spans: Dict[str, float] = {}
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    return _current.get()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        SPAN_SECONDS.observe(elapsed, self.name)
+        stats = _current.get()
+        if stats is not None:
+            stats.spans[self.name] = stats.spans.get(self.name, 0.0) + elapsed
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """Context manager đo thời gian một đoạn code: `with span("scoring"): ...`."""
+    if not config.METRICS_ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+# ---- Đếm câu lệnh SQL ----
+
+_START_KEY = "metrics_query_start"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _finish_query(conn, engine_name: str):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERIES.inc(1, engine_name)
+    DB_SECONDS.inc(elapsed, engine_name)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(engine: Engine, name: str):
+    """Đăng ký event đếm câu lệnh; với engine async truyền `async_engine.sync_engine`."""
+    if not config.METRICS_ENABLED:
+        return
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _finish_query(conn, name)
+
+    def handle_error(exception_context):
+        # Câu lệnh lỗi vẫn được tính (after_cursor_execute không được gọi)
+        if exception_context.connection is not None:
+            _finish_query(exception_context.connection, name)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+# ---- Middleware ----
+
+
+def route_template(scope) -> str:
+    """
+    Mẫu đường dẫn của route đã khớp, gồm cả prefix của include_router (ví dụ
+    "/api/v1/courses/{course_id}"). Đường dẫn không khớp route nào gom chung
+    thành "unmatched" để tránh bùng nổ nhãn.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    # Các bản FastAPI mới lồng router con nên route.path không có prefix:
+    # tìm hậu tố của đường dẫn thật mà route khớp, phần trước nó là prefix
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is None or regex.match(path):
+        return template
+    start = path.find("/", 1)
+    while start != -1:
+        if regex.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI thuần (không dùng BaseHTTPMiddleware để không chạy endpoint
+    trong task riêng và không đệm response streaming).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = [500]
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - start
+            route = route_template(scope)
+            method = scope["method"]
+            REQUEST_SECONDS.observe(elapsed, method, route, str(status[0]))
+            REQUEST_QUERIES.observe(stats.queries, method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+            _log_request(method, route, status[0], elapsed, stats)
+
+
+def _log_request(method: str, route: str, status: int, elapsed: float, stats: RequestStats):
+    slow = config.SLOW_REQUEST_MS > 0 and elapsed * 1000 >= config.SLOW_REQUEST_MS
+    level = logging.WARNING if slow else logging.DEBUG
+    if not logger.isEnabledFor(level):
+        return
+    spans = "".join(f" {name}={1000 * s:.1f}ms" for name, s in stats.spans.items())
+    logger.log(
+        level,
+        "%s %s %s %.1fms queries=%d db=%.1fms%s",
+        method,
+        route,
+        status,
+        1000 * elapsed,
+        stats.queries,
+        1000 * stats.db_seconds,
+        spans,
+    )
+
+
+# ---- Xuất số liệu ----
+
+
+def _gauge(lines: List[str], name: str, documentation: str, samples: Iterable, kind="gauge"):
+    """`samples`: các cặp (dict nhãn, giá trị); bỏ qua giá trị None."""
+    samples = [(labels, value) for labels, value in samples if value is not None]
+    if not samples:
+        return
+    lines.append(f"# HELP {name} {documentation}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(
+            f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}"
+        )
+
+
+def _service_metrics(lines: List[str]):
+    """Số liệu sẵn có của các thành phần (cache, pool, băm mật khẩu, model, khởi động)."""
+    # Import tại chỗ: các module này import app.db.database, vốn import module này
+    from app.core.security import password_hasher
+    from app.core.startup import startup
+    from app.db.database import pool_metrics
+    from app.db.pool_metrics import CHECKOUT_BUCKETS
+    from app.services.cache import user_cache
+    from app.services.principal import principal_cache
+    from app.services.recommendation import recommendation_service
+
+    caches = {"user": user_cache.stats(), "principal": principal_cache.stats()}
+    for field in ("hits", "misses", "evictions", "expirations"):
+        _gauge(
+            lines,
+            f"cache_{field}_total",
+            f"Số lần {field} của cache trong tiến trình.",
+            (({"cache": name}, stats.get(field)) for name, stats in caches.items()),
+            kind="counter",
+        )
+
+    pools = {name: metrics.stats() for name, metrics in pool_metrics.items()}
+    for field, kind, doc in (
+        ("in_use", "gauge", "Số kết nối đang được dùng."),
+        ("connects", "counter", "Số kết nối CSDL đã mở."),
+        ("overflow_connects", "counter", "Số kết nối mở vượt pool_size."),
+        ("timeouts", "counter", "Số lần hết thời gian chờ lấy kết nối."),
+    ):
+        name = f"db_pool_{field}" + ("_total" if kind == "counter" else "")
+        _gauge(
+            lines,
+            name,
+            doc,
+            (({"engine": engine}, stats[field]) for engine, stats in pools.items()),
+            kind=kind,
+        )
+    lines.append("# HELP db_pool_checkout_seconds Thời gian chờ lấy kết nối từ pool.")
+    lines.append("# TYPE db_pool_checkout_seconds histogram")
+    for engine, stats in pools.items():
+        for bound, count in stats["checkout_seconds_buckets"].items():
+            le = "+Inf" if bound == "+Inf" else _number(float(bound))
+            lines.append(
+                f'db_pool_checkout_seconds_bucket{{engine="{engine}",le="{le}"}} {count}'
+            )
+        lines.append(
+            f'db_pool_checkout_seconds_sum{{engine="{engine}"}} '
+            f"{_number(stats['checkout_seconds_sum'])}"
+        )
+        lines.append(
+            f'db_pool_checkout_seconds_count{{engine="{engine}"}} {stats["checkouts"]}'
+        )
+
+    hasher = password_hasher.stats()
+    _gauge(lines, "password_hash_pending", "Số thao tác băm đang chờ.", [({}, hasher["pending"])])
+    _gauge(
+        lines,
+        "password_hash_completed_total",
+        "Số thao tác băm đã xong.",
+        [({}, hasher["completed"])],
+        kind="counter",
+    )
+    _gauge(
+        lines,
+        "password_hash_failed_total",
+        "Số thao tác băm lỗi (ví dụ tiến trình con bị dừng, bị hủy).",
+        [({}, hasher["failed"])],
+        kind="counter",
+    )
+    _gauge(
+        lines,
+        "password_hash_rejected_total",
+        "Số thao tác băm bị từ chối (503).",
+        [({}, hasher["rejected"])],
+        kind="counter",
+    )
+
+    # Không dùng model_info(): hàm đó tải model nếu chưa tải
+    bundle = recommendation_service._bundle
+    _gauge(
+        lines, "model_loaded", "1 nếu model gợi ý đã được tải.", [({}, int(bundle is not None))]
+    )
+    if bundle is not None:
+        mode = bundle.similarity.mode if bundle.similarity is not None else ""
+        _gauge(
+            lines,
+            "model_info",
+            "Phiên bản và chế độ của model đang phục vụ.",
+            [({"version": bundle.version, "mode": mode}, 1)],
+        )
+
+    _gauge(
+        lines,
+        "startup_step_seconds",
+        "Thời gian của từng bước khởi động.",
+        (
+            ({"step": name}, step["seconds"])
+            for name, step in startup.steps.items()
+        ),
+    )
+    _gauge(lines, "startup_ready", "1 nếu mọi bước khởi động đã thành công.", [({}, int(startup.ok))])
+    _gauge(lines, "process_id", "PID của worker.", [({}, os.getpid())])
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        histogram.render(lines)
+    for counter in COUNTERS:
+        counter.render(lines)
+    _service_metrics(lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,52 @@
+"""
+Cursor cho phân trang keyset.
+
+Cursor mã hóa khóa sắp xếp của phần tử cuối trang trước (ví dụ id khóa học,
+hoặc (điểm, id) với kết quả tìm kiếm), nên trang tiếp theo chỉ là
+`WHERE khóa > cursor ORDER BY khóa LIMIT n`: chi phí không phụ thuộc độ sâu
+của trang, và phần tử được thêm/xóa giữa hai lần gọi không làm lặp hay mất
+hàng như OFFSET. Với client, cursor là một chuỗi mờ (base64url của JSON) chỉ
+dùng để gửi lại; `kind` gắn cursor với đúng danh sách đã tạo ra nó.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence
+
+
+class InvalidCursor(ValueError):
+    """Cursor hỏng hoặc thuộc về một danh sách khác."""
+
+
+class Page:
+    """Một trang kết quả; `next_key` là None khi đã hết dữ liệu."""
+
+    def __init__(self, items: List[Any], next_key: Optional[Sequence] = None):
+        self.items = items
+        self.next_key = next_key
+
+
+def encode_cursor(kind: str, key: Sequence) -> str:
+    payload = json.dumps({"k": kind, "v": list(key)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str, types: Sequence[type]) -> List:
+    """Giải mã cursor và kiểm tra từng thành phần của khóa theo `types`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = payload["v"]
+        valid_kind = payload["k"] == kind
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise InvalidCursor("Malformed cursor.")
+    if not valid_kind:
+        raise InvalidCursor("Cursor belongs to a different listing.")
+    if not isinstance(key, list) or len(key) != len(types):
+        raise InvalidCursor("Malformed cursor.")
+    for value, expected in zip(key, types):
+        # int hợp lệ cho float (JSON ghi 2.0 thành 2.0 nhưng client có thể gửi 2)
+        allowed = (int, float) if expected is float else expected
+        if isinstance(value, bool) or not isinstance(value, allowed):
+            raise InvalidCursor("Malformed cursor.")
+    return key
@@ -1,14 +1,30 @@
 # Nội dung cho backend/app/core/security.py
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-from .config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from .config import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_WORKERS,
+)
 
-# Context để băm mật khẩu, sử dụng thuật toán bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Context để băm mật khẩu, sử dụng thuật toán bcrypt. Hash có cost khác
+# BCRYPT_ROUNDS bị coi là cần cập nhật (xem verify_and_update_password)
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -16,11 +32,116 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Xác thực mật khẩu; nếu đúng và hash cũ dùng cost khác BCRYPT_ROUNDS thì
+    trả thêm hash mới để lưu lại, ngược lại phần tử thứ hai là None.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Băm mật khẩu."""
     return pwd_context.hash(password)
 
 
+class PasswordPoolBusy(Exception):
+    """Số thao tác băm đang chờ đã chạm PASSWORD_HASH_MAX_PENDING."""
+
+
+class PasswordHasher:
+    """
+    Chạy bcrypt trong một pool tiến trình riêng có giới hạn, để một đợt đăng
+    nhập dồn dập không chiếm event loop/threadpool (và GIL) của API.
+    Khi đã có `max_pending` thao tác đang chạy hoặc chờ, thao tác mới bị từ
+    chối ngay bằng PasswordPoolBusy (backpressure) thay vì xếp hàng vô hạn.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.seconds_sum = 0.0
+
+    def _get_executor(self) -> Executor:
+        # Tạo khi cần để việc import module (kể cả trong tiến trình con) không
+        # sinh thêm tiến trình; dùng "spawn" vì tiến trình chính có các thread nền
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy()
+            self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), fn, *args)
+            # Chỉ thao tác thành công được tính vào completed/avg_seconds
+            with self._lock:
+                self.completed += 1
+                self.seconds_sum += time.perf_counter() - start
+            return result
+        except BaseException as e:
+            with self._lock:
+                self.failed += 1
+            if isinstance(e, BrokenProcessPool):
+                # Một tiến trình con bị dừng đột ngột: lần gọi sau tạo pool mới
+                self._executor = None
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(
+            verify_and_update_password, plain_password, hashed_password
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_seconds": round(self.seconds_sum / self.completed, 4)
+            if self.completed
+            else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
 def create_access_token(data: dict) -> str:
     """Tạo JWT access token."""
     to_encode = data.copy()
@@ -0,0 +1,196 @@
+"""
+Khởi động ứng dụng qua lifespan của FastAPI.
+
+Import app.main không còn làm I/O: tạo bảng, tải model và dựng các chỉ mục được
+chạy ở đây, mặc định trên một luồng nền (STARTUP_BACKGROUND=1) để worker nhận
+kết nối và trả lời /healthz ngay khi uvicorn lắng nghe:
+  1. "database" (create_all) và "models" (RecommendationService.load, các file
+     model được đọc song song) chạy đồng thời;
+  2. sau khi cả hai xong: "skill_index" và "search_index" dựng sẵn chỉ mục để
+     request đầu tiên không phải chờ, rồi "model_watcher" theo dõi registry.
+/readyz chỉ trả 200 khi mọi bước thành công và CSDL đang kết nối được, để load
+balancer/Kubernetes không gửi request tới worker chưa sẵn sàng. Request đến
+sớm cần model vẫn chạy đúng: chúng chờ lần tải đang chạy.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core import config
+from app.core.security import password_hasher
+from app.db import models
+from app.db.database import SessionLocal, engine
+from app.services.recommendation import recommendation_service
+from app.services.search import course_search
+
+logger = logging.getLogger(__name__)
+
+# Thứ tự các bước khởi động (dùng cho báo cáo)
+STEPS = ("database", "models", "skill_index", "search_index", "model_watcher")
+
+
+class Startup:
+    """Trạng thái và thời gian của từng bước khởi động."""
+
+    def __init__(self):
+        # Thời điểm bắt đầu import app.main và thời gian import (giây)
+        self.created_at = time.perf_counter()
+        self.import_seconds: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict] = {
+            name: {"state": "pending", "seconds": None, "error": None} for name in STEPS
+        }
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def mark_imported(self, import_started: float):
+        """Ghi lại thời gian import app.main (gọi ở cuối app/main.py)."""
+        self.created_at = import_started
+        self.import_seconds = round(time.perf_counter() - import_started, 3)
+
+    def _step(self, name: str, run: Callable[[], None]) -> bool:
+        step = self.steps[name]
+        step["state"] = "running"
+        start = time.perf_counter()
+        try:
+            run()
+            step["state"] = "done"
+            return True
+        except Exception as e:
+            step["state"] = "failed"
+            step["error"] = str(e)
+            logger.error(f"Bước khởi động '{name}' thất bại: {e}")
+            return False
+        finally:
+            step["seconds"] = round(time.perf_counter() - start, 3)
+
+    def run(self):
+        """Chạy toàn bộ các bước khởi động (chặn tới khi xong)."""
+        self.started_at = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as pool:
+                database = pool.submit(self._step, "database", create_tables)
+                model_load = pool.submit(self._step, "models", load_models)
+                database_ok, models_ok = database.result(), model_load.result()
+            if database_ok:
+                self._step("skill_index", build_skill_index)
+                self._step("search_index", build_search_index)
+            if models_ok:
+                self._step("model_watcher", start_model_watcher)
+        finally:
+            self.finished_at = time.perf_counter()
+            self._done.set()
+        logger.info(self.summary())
+
+    def start(self, background: bool = True):
+        if not background:
+            self.run()
+            return
+        self._thread = threading.Thread(target=self.run, name="startup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def ok(self) -> bool:
+        return self.finished and all(
+            step["state"] == "done" for step in self.steps.values()
+        )
+
+    def summary(self) -> str:
+        total = (
+            self.finished_at - self.created_at if self.finished_at is not None else None
+        )
+        parts = []
+        for name, step in self.steps.items():
+            if step["seconds"] is None:
+                # Bước chưa chạy (bị bỏ qua vì bước trước lỗi)
+                parts.append(f"{name} ({step['state']})")
+            else:
+                parts.append(
+                    f"{name} {step['seconds']}s"
+                    + ("" if step["state"] == "done" else f" ({step['state']})")
+                )
+        if self.import_seconds is not None:
+            parts.insert(0, f"import {self.import_seconds}s")
+        return (
+            "Khởi động: "
+            + ", ".join(parts)
+            + (f"; tổng {total:.2f}s từ lúc import." if total is not None else ".")
+        )
+
+    def status(self) -> Dict:
+        return {
+            "import_seconds": self.import_seconds,
+            "startup_seconds": (
+                round(self.finished_at - self.started_at, 3)
+                if self.finished_at is not None
+                else None
+            ),
+            "steps": self.steps,
+        }
+
+
+def create_tables():
+    # Tạo các bảng trong CSDL
+    models.Base.metadata.create_all(bind=engine)
+
+
+def load_models():
+    bundle = recommendation_service.load()
+    if bundle.similarity is None or bundle.course_ids is None:
+        raise RuntimeError("Thiếu artifact bắt buộc của model gợi ý.")
+
+
+def build_skill_index():
+    db = SessionLocal()
+    try:
+        recommendation_service.skill_index.get(db)
+    finally:
+        db.close()
+
+
+def build_search_index():
+    # Dựng sẵn chỉ mục tìm kiếm (hoặc làm mới bảng course_search trên PostgreSQL)
+    db = SessionLocal()
+    try:
+        course_search.get(db)
+    finally:
+        db.close()
+
+
+def start_model_watcher():
+    # Theo dõi manifest của registry để nạp phiên bản model mới mà không khởi động lại
+    recommendation_service.start_watcher(config.MODEL_WATCH_INTERVAL_SECONDS)
+
+
+def database_reachable() -> Optional[str]:
+    """None nếu chạy được một truy vấn, ngược lại là thông báo lỗi."""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return None
+    except Exception as e:
+        return str(e)
+
+
+startup = Startup()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    startup.start(background=config.STARTUP_BACKGROUND)
+    yield
+    # Dừng các tiến trình băm mật khẩu
+    password_hasher.shutdown()
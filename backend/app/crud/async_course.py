@@ -0,0 +1,91 @@
+"""
+Phiên bản async của app/crud/course.py, dùng với AsyncSession
+(xem app/db/database.py). Các quan hệ cần trả về phải được tải sẵn
+(selectinload) vì AsyncSession không lazy-load được.
+"""
+from typing import AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import Page
+from app.crud.course import (
+    course_detail_statement,
+    course_list_page,
+    courses_by_ids_statement,
+    courses_statement,
+    order_by_ids,
+    search_page,
+    search_statement,
+)
+from app.db import models
+from app.services.search import SearchQuery, course_search
+
+
+async def get_course_page(
+    db: AsyncSession,
+    limit: int = 20,
+    search: str = "",
+    after: Optional[Sequence] = None,
+    skip: int = 0,
+) -> Page:
+    """Xem get_course_page trong app/crud/course.py."""
+    query = SearchQuery(search)
+    if not query:
+        after_id = after[0] if after else None
+        result = await db.execute(courses_statement(skip, limit, after_id))
+        return course_list_page(result.scalars().all(), limit)
+    # Không làm mới chỉ mục trên event loop: catalog đổi thì bảng course_search
+    # (PostgreSQL) hoặc chỉ mục trong bộ nhớ được làm mới ở luồng nền
+    index = course_search.current_for(db)
+    if index.in_database:
+        rows = (await db.execute(search_statement(query, skip, limit, after))).all()
+        return search_page(
+            [row[0] for row in rows], [(row[1], row[0].id) for row in rows], limit
+        )
+    course_ids, scores = index.search(query, skip, limit, after)
+    return search_page(
+        order_by_ids(await get_courses_by_ids(db, course_ids), course_ids),
+        list(zip(scores, course_ids)),
+        limit,
+    )
+
+
+async def get_courses(
+    db: AsyncSession, skip: int = 0, limit: int = 20, search: str = ""
+):
+    page = await get_course_page(db, limit=limit, search=search, skip=skip)
+    return page.items
+
+
+async def iter_courses(
+    db: AsyncSession, batch_size: int = 1000
+) -> AsyncIterator[List[models.Course]]:
+    """
+    Toàn bộ catalog theo từng lô, mỗi lô một truy vấn keyset ngắn thay vì giữ
+    một truy vấn lớn mở suốt quá trình xuất. Lô đã trả về được bỏ khỏi session
+    để bộ nhớ không tăng theo kích thước catalog.
+    """
+    after_id = None
+    while True:
+        result = await db.execute(courses_statement(0, batch_size, after_id))
+        batch = result.scalars().all()
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1].id
+        db.expunge_all()
+
+
+async def get_course_by_id(db: AsyncSession, course_id: int):
+    result = await db.execute(course_detail_statement(course_id))
+    return result.scalars().first()
+
+
+async def get_courses_by_ids(db: AsyncSession, course_ids: List[int]):
+    """
+    Lấy thông tin các khóa học dựa trên một danh sách ID.
+    """
+    if not course_ids:
+        return []
+    result = await db.execute(courses_by_ids_statement(course_ids))
+    return result.scalars().all()
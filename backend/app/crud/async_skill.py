@@ -0,0 +1,32 @@
+"""
+Phiên bản async của app/crud/skill.py, dùng với AsyncSession.
+"""
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import Page
+from app.crud.skill import skill_page, skills_statement
+from app.db import models
+
+
+async def get_skill_page(
+    db: AsyncSession, limit: int = 500, after_name: Optional[str] = None
+) -> Page:
+    result = await db.execute(skills_statement(limit, after_name))
+    return skill_page(result.scalars().all(), limit)
+
+
+async def iter_skills(
+    db: AsyncSession, batch_size: int = 1000
+) -> AsyncIterator[List[models.Skill]]:
+    """Toàn bộ kỹ năng theo từng lô keyset (xem iter_courses trong async_course.py)."""
+    after_name = None
+    while True:
+        result = await db.execute(skills_statement(batch_size, after_name))
+        batch = result.scalars().all()
+        if not batch:
+            return
+        yield batch
+        after_name = batch[-1].skill_name
+        db.expunge_all()
@@ -0,0 +1,100 @@
+"""
+Phiên bản async của các hàm đọc trong app/crud/user.py, dùng với AsyncSession.
+"""
+from typing import List, Optional, Sequence, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.crud.user import (
+    build_path_requests,
+    known_skill_ids_statement,
+    known_skill_pairs_statement,
+    survey_users_statement,
+    target_skill_pairs_statement,
+    target_skills_statement,
+)
+from app.db import models
+from app.schemas.user import PathRequest
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    """
+    Lấy người dùng theo email, kèm profile trong cùng truy vấn (LEFT JOIN) vì
+    user.profile không thể lazy-load trên AsyncSession.
+    """
+    result = await db.execute(
+        select(models.User)
+        .options(joinedload(models.User.profile))
+        .where(models.User.email == email)
+    )
+    return result.scalars().first()
+
+
+async def create_user(db: AsyncSession, email: str, hashed_password: str):
+    """Tạo người dùng mới; mật khẩu đã được băm sẵn (xem password_hasher)."""
+    db_user = models.User(email=email, hashed_password=hashed_password)
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+
+async def update_password_hash(
+    db: AsyncSession, user: models.User, hashed_password: str
+):
+    """Lưu hash mới (ví dụ sau khi đổi BCRYPT_ROUNDS)."""
+    user.hashed_password = hashed_password
+    await db.commit()
+
+
+async def get_user(db: AsyncSession, user_id: int):
+    """Lấy người dùng theo khóa chính, kèm profile (LEFT JOIN)."""
+    return await db.get(
+        models.User, user_id, options=[joinedload(models.User.profile)]
+    )
+
+
+async def get_known_skill_ids(db: AsyncSession, user_id: int) -> Set[int]:
+    """Xem crud.user.get_known_skill_ids (một truy vấn UNION)."""
+    result = await db.execute(known_skill_ids_statement(user_id))
+    return set(result.scalars())
+
+
+async def get_target_skills(db: AsyncSession, user_id: int) -> List[models.Skill]:
+    """Lấy các kỹ năng mục tiêu của người dùng bằng một truy vấn."""
+    result = await db.execute(target_skills_statement(user_id))
+    return result.scalars().all()
+
+
+async def get_progress(
+    db: AsyncSession, user_id: int
+) -> List[models.UserCourseProgress]:
+    """Lấy tất cả bản ghi tiến độ của người dùng."""
+    result = await db.execute(
+        select(models.UserCourseProgress).where(
+            models.UserCourseProgress.user_id == user_id
+        )
+    )
+    return result.scalars().all()
+
+
+async def get_path_requests(
+    db: AsyncSession,
+    user_ids: Optional[Sequence[int]] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[PathRequest]:
+    """Xem crud.user.get_path_requests (3 truy vấn cho cả lô)."""
+    user_rows = (
+        await db.execute(survey_users_statement(user_ids, after_id, limit))
+    ).all()
+    ids = [row[0] for row in user_rows]
+    if not ids:
+        return []
+    return build_path_requests(
+        user_rows,
+        (await db.execute(known_skill_pairs_statement(ids))).all(),
+        (await db.execute(target_skill_pairs_statement(ids))).all(),
+    )
@@ -1,14 +1,116 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from ..core.pagination import Page
 from ..db import models
 from ..schemas import course as schemas
-from typing import List
+from ..services.search import TS_CONFIG, SearchQuery, course_search
+from typing import List, Optional, Sequence
+
+
+# Các câu lệnh được dùng chung cho crud đồng bộ và crud async (async_course.py).
+# Danh sách được sắp xếp theo một khóa duy nhất để phân trang keyset: `after`
+# là khóa của phần tử cuối trang trước (xem app/core/pagination.py)
+def courses_statement(
+    skip: int = 0, limit: int = 20, after_id: Optional[int] = None
+):
+    statement = select(models.Course).order_by(models.Course.id)
+    if after_id is not None:
+        statement = statement.where(models.Course.id > after_id)
+    return statement.offset(skip).limit(limit)
+
+
+def search_statement(
+    query: SearchQuery,
+    skip: int = 0,
+    limit: int = 20,
+    after: Optional[Sequence] = None,
+):
+    """
+    Tìm kiếm trên PostgreSQL: lọc qua chỉ mục GIN của course_search, xếp theo
+    ts_rank. Trả về các hàng (Course, rank); `after` là (rank, id).
+    """
+    document = models.course_search_table.c.document
+    tsquery = func.to_tsquery(TS_CONFIG, query.tsquery())
+    # Chuẩn hóa 1: chia cho 1 + log(độ dài) để văn bản dài không lấn át
+    rank = func.ts_rank(document, tsquery, 1)
+    statement = (
+        select(models.Course, rank)
+        .join(
+            models.course_search_table,
+            models.course_search_table.c.course_id == models.Course.id,
+        )
+        .where(document.op("@@")(tsquery))
+    )
+    if after is not None:
+        statement = statement.where(
+            or_(rank < after[0], and_(rank == after[0], models.Course.id > after[1]))
+        )
+    return (
+        statement.order_by(rank.desc(), models.Course.id).offset(skip).limit(limit)
+    )
+
+
+def course_detail_statement(course_id: int):
+    return (
+        select(models.Course)
+        .options(selectinload(models.Course.skills))
+        .where(models.Course.id == course_id)
+    )
+
+
+def courses_by_ids_statement(course_ids: List[int]):
+    return select(models.Course).where(models.Course.id.in_(course_ids))
+
+
+def order_by_ids(courses, course_ids: List[int]):
+    """Sắp xếp kết quả truy vấn `IN (...)` theo thứ tự của `course_ids`."""
+    by_id = {course.id: course for course in courses}
+    return [by_id[course_id] for course_id in course_ids if course_id in by_id]
+
+
+def course_list_page(courses, limit: int) -> Page:
+    full = len(courses) == limit
+    return Page(courses, [courses[-1].id] if full and courses else None)
+
+
+def search_page(courses, keys: List[Sequence], limit: int) -> Page:
+    """`keys`: (điểm, id) của các kết quả, theo thứ tự xếp hạng."""
+    full = len(keys) == limit
+    return Page(courses, list(keys[-1]) if full and keys else None)
+
+
+def get_course_page(
+    db: Session,
+    limit: int = 20,
+    search: str = "",
+    after: Optional[Sequence] = None,
+    skip: int = 0,
+) -> Page:
+    """
+    Một trang khóa học, hoặc kết quả tìm kiếm khi có `search`. `after` là khóa
+    lấy từ `Page.next_key` của trang trước: [id], hoặc [điểm, id] khi tìm kiếm.
+    """
+    query = SearchQuery(search)
+    if not query:
+        after_id = after[0] if after else None
+        courses = db.execute(courses_statement(skip, limit, after_id)).scalars().all()
+        return course_list_page(courses, limit)
+    index = course_search.get(db)
+    if index.in_database:
+        rows = db.execute(search_statement(query, skip, limit, after)).all()
+        return search_page(
+            [row[0] for row in rows], [(row[1], row[0].id) for row in rows], limit
+        )
+    course_ids, scores = index.search(query, skip, limit, after)
+    return search_page(
+        order_by_ids(get_courses_by_ids(db, course_ids), course_ids),
+        list(zip(scores, course_ids)),
+        limit,
+    )
 
 
 def get_courses(db: Session, skip: int = 0, limit: int = 20, search: str = ""):
-    query = db.query(models.Course)
-    if search:
-        query = query.filter(models.Course.course_name.ilike(f"%{search}%"))
-    return query.offset(skip).limit(limit).all()
+    return get_course_page(db, limit=limit, search=search, skip=skip).items
 
 
 def get_course_by_id(db: Session, course_id: int):
@@ -26,4 +128,4 @@ def get_courses_by_ids(db: Session, course_ids: List[int]):
     """
     if not course_ids:
         return []
-    return db.query(models.Course).filter(models.Course.id.in_(course_ids)).all()
+    return db.execute(courses_by_ids_statement(course_ids)).scalars().all()
@@ -0,0 +1,24 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..core.pagination import Page
+from ..db import models
+from typing import Optional
+
+
+# Kỹ năng được sắp xếp theo tên (duy nhất) nên tên là khóa keyset; câu lệnh
+# được dùng chung với crud async (async_skill.py)
+def skills_statement(limit: Optional[int] = None, after_name: Optional[str] = None):
+    statement = select(models.Skill).order_by(models.Skill.skill_name)
+    if after_name is not None:
+        statement = statement.where(models.Skill.skill_name > after_name)
+    return statement.limit(limit)
+
+
+def skill_page(skills, limit: int) -> Page:
+    full = len(skills) == limit
+    return Page(skills, [skills[-1].skill_name] if full and skills else None)
+
+
+def get_skill_page(db: Session, limit: int = 500, after_name: Optional[str] = None):
+    skills = db.execute(skills_statement(limit, after_name)).scalars().all()
+    return skill_page(skills, limit)
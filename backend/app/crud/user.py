@@ -1,5 +1,8 @@
 # Nội dung cho backend/app/crud/user.py
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session, joinedload
 from app.db import models
 from app.schemas import user as schemas
 from app.core.security import get_password_hash
@@ -10,6 +13,11 @@ def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
 
+def get_user(db: Session, user_id: int):
+    """Lấy người dùng theo khóa chính, kèm profile (LEFT JOIN)."""
+    return db.get(models.User, user_id, options=[joinedload(models.User.profile)])
+
+
 def create_user(db: Session, user: schemas.UserCreate):
     """Tạo người dùng mới."""
     hashed_password = get_password_hash(user.password)
@@ -18,3 +26,140 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.commit()
     db.refresh(db_user)
     return db_user
+
+
+def known_skill_ids_statement(user_id: int):
+    """Câu lệnh UNION cho get_known_skill_ids (dùng chung với crud async)."""
+    from_survey = select(models.user_known_skills_association.c.skill_id).where(
+        models.user_known_skills_association.c.user_id == user_id
+    )
+    from_completed = (
+        select(models.course_skills_association.c.skill_id)
+        .join(
+            models.UserCourseProgress,
+            models.UserCourseProgress.course_id
+            == models.course_skills_association.c.course_id,
+        )
+        .where(
+            models.UserCourseProgress.user_id == user_id,
+            models.UserCourseProgress.status == "completed",
+        )
+    )
+    return union(from_survey, from_completed)
+
+
+def target_skills_statement(user_id: int):
+    return (
+        select(models.Skill)
+        .join(
+            models.user_target_skills_association,
+            models.user_target_skills_association.c.skill_id == models.Skill.id,
+        )
+        .where(models.user_target_skills_association.c.user_id == user_id)
+        .distinct()
+    )
+
+
+def get_known_skill_ids(db: Session, user_id: int) -> Set[int]:
+    """
+    Lấy tập ID kỹ năng người dùng đã biết (từ khảo sát + các khóa học đã hoàn
+    thành) bằng MỘT truy vấn UNION, thay vì đi qua các relationship lazy
+    user.progress -> progress.course -> course.skills.
+    """
+    return set(db.execute(known_skill_ids_statement(user_id)).scalars())
+
+
+def get_target_skills(db: Session, user_id: int) -> List[models.Skill]:
+    """Lấy các kỹ năng mục tiêu của người dùng bằng một truy vấn."""
+    return db.execute(target_skills_statement(user_id)).scalars().all()
+
+
+# Tải dữ liệu kỹ năng của cả một lô người dùng (lộ trình theo lô) bằng ba truy
+# vấn cố định thay vì hai truy vấn cho mỗi người dùng
+def survey_users_statement(
+    user_ids: Optional[Sequence[int]] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+):
+    """
+    (user_id, learning_style) của người dùng đang hoạt động đã chọn kỹ năng mục
+    tiêu, theo id; lọc theo `user_ids` hoặc phân trang keyset bằng `after_id`.
+    """
+    target = models.user_target_skills_association.c
+    statement = (
+        select(models.User.id, models.UserProfile.learning_style)
+        .outerjoin(models.UserProfile)
+        .where(
+            models.User.is_active.is_(True),
+            models.User.id.in_(select(target.user_id)),
+        )
+        .order_by(models.User.id)
+    )
+    if user_ids is not None:
+        statement = statement.where(models.User.id.in_(user_ids))
+    if after_id is not None:
+        statement = statement.where(models.User.id > after_id)
+    return statement.limit(limit)
+
+
+def known_skill_pairs_statement(user_ids: Sequence[int]):
+    """Các cặp (user_id, skill_id) đã biết của nhiều người dùng, xem known_skill_ids_statement."""
+    known = models.user_known_skills_association.c
+    course_skill = models.course_skills_association.c
+    from_survey = select(known.user_id, known.skill_id).where(
+        known.user_id.in_(user_ids)
+    )
+    from_completed = (
+        select(models.UserCourseProgress.user_id, course_skill.skill_id)
+        .join(
+            models.UserCourseProgress,
+            models.UserCourseProgress.course_id == course_skill.course_id,
+        )
+        .where(
+            models.UserCourseProgress.user_id.in_(user_ids),
+            models.UserCourseProgress.status == "completed",
+        )
+    )
+    return union(from_survey, from_completed)
+
+
+def target_skill_pairs_statement(user_ids: Sequence[int]):
+    target = models.user_target_skills_association.c
+    return (
+        select(target.user_id, target.skill_id)
+        .where(target.user_id.in_(user_ids))
+        .distinct()
+    )
+
+
+def build_path_requests(
+    user_rows, known_pairs, target_pairs
+) -> List[schemas.PathRequest]:
+    known: Dict[int, Set[int]] = defaultdict(set)
+    for user_id, skill_id in known_pairs:
+        known[user_id].add(skill_id)
+    targets: Dict[int, Set[int]] = defaultdict(set)
+    for user_id, skill_id in target_pairs:
+        targets[user_id].add(skill_id)
+    return [
+        schemas.PathRequest(user_id, known[user_id], targets[user_id], learning_style)
+        for user_id, learning_style in user_rows
+    ]
+
+
+def get_path_requests(
+    db: Session,
+    user_ids: Optional[Sequence[int]] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[schemas.PathRequest]:
+    """Dữ liệu dựng lộ trình của một lô người dùng đã làm khảo sát (3 truy vấn)."""
+    user_rows = db.execute(survey_users_statement(user_ids, after_id, limit)).all()
+    ids = [row[0] for row in user_rows]
+    if not ids:
+        return []
+    return build_path_requests(
+        user_rows,
+        db.execute(known_skill_pairs_statement(ids)).all(),
+        db.execute(target_skill_pairs_statement(ids)).all(),
+    )
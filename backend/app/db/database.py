@@ -1,9 +1,17 @@
 import os
+from typing import Dict
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 
+from app.core import config
+from app.core.metrics import instrument_engine
+from app.db.pool_metrics import PoolMetrics, instrumented_pool_class
+
 # Tải các biến môi trường từ file .env (nếu có)
 load_dotenv()
 
@@ -13,15 +21,96 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     "DATABASE_URL", "postgresql://user:password@db:5432/elearning_db"
 )
 
+def to_async_url(url: str) -> str:
+    """
+    Đổi URL đồng bộ sang driver async tương ứng:
+    postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://.
+    URL đã chỉ định driver async thì giữ nguyên.
+    """
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+def engine_options(url: str, metrics: PoolMetrics) -> Dict:
+    """
+    Tham số create_engine/create_async_engine lấy từ config (DB_POOL_*,
+    DB_CONNECT_TIMEOUT, DB_STATEMENT_TIMEOUT_MS). Pool là lớp pool mặc định
+    của dialect, được bọc để đo thời gian checkout (xem pool_metrics.py).
+    """
+    url = make_url(url)
+    pool_class = url.get_dialect().get_pool_class(url)
+    options = {
+        "poolclass": instrumented_pool_class(pool_class, metrics),
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+    # SQLite trong bộ nhớ dùng SingletonThreadPool/StaticPool, không có các
+    # tham số kích thước/timeout của QueuePool
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+
+    driver = url.get_driver_name()
+    if driver in ("psycopg2", "psycopg"):
+        connect_args = {"connect_timeout": config.DB_CONNECT_TIMEOUT}
+        if config.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = (
+                f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}"
+            )
+        options["connect_args"] = connect_args
+    elif driver == "asyncpg":
+        connect_args = {"timeout": config.DB_CONNECT_TIMEOUT}
+        if config.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)
+            }
+        options["connect_args"] = connect_args
+    return options
+
+
+# Số liệu pool của từng engine (xem GET /api/v1/admin/db/pool)
+pool_metrics = {"sync": PoolMetrics("sync"), "async": PoolMetrics("async")}
+
 # Tạo engine kết nối tới CSDL
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    **engine_options(SQLALCHEMY_DATABASE_URL, pool_metrics["sync"]),
+)
+pool_metrics["sync"].attach(engine.pool)
+# Đếm câu lệnh và thời gian SQL theo request (xem app/core/metrics.py)
+instrument_engine(engine, "sync")
 
 # Tạo một lớp Session, các session thực tế sẽ là các instance của lớp này
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async cho các endpoint đọc nhiều (không chiếm thread của threadpool
+# trong lúc chờ CSDL). Mặc định dùng cùng CSDL với DATABASE_URL.
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL)
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, pool_metrics["async"])
+)
+pool_metrics["async"].attach(async_engine.sync_engine.pool)
+instrument_engine(async_engine.sync_engine, "async")
+
+# expire_on_commit=False: đối tượng vẫn đọc được sau commit mà không phải
+# lazy-load (AsyncSession không hỗ trợ lazy-load ngầm)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 # Đây chính là dòng bị thiếu!
 # Nó tạo ra một lớp Base mà các lớp model (Course, Skill) sẽ kế thừa.
 # Nhờ vậy, SQLAlchemy biết cách ánh xạ các lớp Python vào các bảng CSDL.
 Base = declarative_base()
 
-# Lưu ý: file này không cần hàm get_db(). Hàm đó thuộc về tầng API (endpoints.py).
+# Lưu ý: file này không cần hàm get_db(). Hàm đó thuộc về tầng API (deps.py).
@@ -1,5 +1,8 @@
 from sqlalchemy import Boolean, Column, Integer, String, Float, Text, Table, ForeignKey
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from .database import Base
 
 
@@ -22,6 +25,34 @@ user_target_skills_association = Table(
     Column("skill_id", Integer, ForeignKey("skills.id")),
 )
 
+
+class TSVector(TypeDecorator):
+    """tsvector trên PostgreSQL; Text trên các CSDL khác (chỉ để tạo được bảng)."""
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(TSVECTOR())
+        return dialect.type_descriptor(Text())
+
+
+# Văn bản tìm kiếm đã đánh trọng số của từng khóa học, chỉ được dùng trên
+# PostgreSQL (xem app/services/search.py)
+course_search_table = Table(
+    "course_search",
+    Base.metadata,
+    Column(
+        "course_id",
+        Integer,
+        ForeignKey("courses.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("document", TSVector, nullable=False),
+    Index("ix_course_search_document", "document", postgresql_using="gin"),
+)
+
 # --- CÁC MODEL CHÍNH ---
 
 
@@ -0,0 +1,127 @@
+"""
+Số liệu pool kết nối: thời gian chờ lấy kết nối (checkout), số kết nối đang
+dùng và các lần pool phải mở kết nối "overflow" vượt quá pool_size.
+
+SQLAlchemy không có event cho lúc bắt đầu chờ kết nối, nên thời gian chờ được
+đo bằng một lớp con của lớp pool mặc định của dialect (xem
+`instrumented_pool_class`); các con số còn lại lấy từ event của pool.
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+# Ngưỡng (giây) của histogram thời gian chờ checkout, theo kiểu Prometheus
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_seconds_sum = 0.0
+        self.checkout_seconds_max = 0.0
+        # Số lần checkout có thời gian chờ <= CHECKOUT_BUCKETS[i] (không cộng dồn)
+        self.checkout_buckets = [0] * (len(CHECKOUT_BUCKETS) + 1)
+        self.timeouts = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def observe_checkout(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds_sum += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+            self.checkout_buckets[bisect.bisect_left(CHECKOUT_BUCKETS, seconds)] += 1
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def attach(self, pool: Pool):
+        """Đăng ký các event của pool (được giữ lại khi pool được tạo lại)."""
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+            # QueuePool tăng bộ đếm overflow trước khi mở kết nối mới;
+            # giá trị dương nghĩa là kết nối này vượt quá pool_size
+            overflow = getattr(self.pool, "overflow", None)
+            if overflow is not None and overflow() > 0:
+                self.overflow_connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def stats(self) -> Dict:
+        pool = self.pool
+        cumulative, buckets = 0, {}
+        for bound, count in zip(CHECKOUT_BUCKETS, self.checkout_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.checkouts
+        return {
+            "pid": os.getpid(),
+            "pool_class": type(pool).__name__ if pool is not None else None,
+            "pool_size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "connects": self.connects,
+            "overflow_connects": self.overflow_connects,
+            "timeouts": self.timeouts,
+            "checkouts": self.checkouts,
+            "checkout_seconds_sum": round(self.checkout_seconds_sum, 6),
+            "checkout_seconds_max": round(self.checkout_seconds_max, 6),
+            "checkout_seconds_buckets": buckets,
+        }
+
+
+def instrumented_pool_class(
+    pool_class: Type[Pool], metrics: PoolMetrics
+) -> Type[Pool]:
+    """
+    Lớp con của `pool_class` đo thời gian của Pool.connect() (gồm cả thời gian
+    chờ khi pool đã hết kết nối). Khi pool được tạo lại (engine.dispose()),
+    SQLAlchemy dùng lại chính lớp này nên việc đo vẫn tiếp tục.
+    """
+
+    class InstrumentedPool(pool_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            metrics.pool = self
+
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.observe_timeout()
+                raise
+            metrics.observe_checkout(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    InstrumentedPool.__qualname__ = InstrumentedPool.__name__
+    # SQLAlchemy đặt tên logger của pool theo module của lớp: giữ log của pool
+    # trong "sqlalchemy.pool.*" thay vì lẫn vào log "app.*" của ứng dụng
+    InstrumentedPool.__module__ = pool_class.__module__
+    return InstrumentedPool
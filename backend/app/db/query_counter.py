@@ -0,0 +1,36 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """
+    Đếm số câu lệnh SQL được gửi tới CSDL qua các `engines` trong một khối `with`.
+    Với engine async, truyền `async_engine.sync_engine`.
+
+        with QueryCounter(engine, async_engine.sync_engine) as counter:
+            ...
+        print(counter.count, counter.statements)
+    """
+
+    def __init__(self, *engines: Engine):
+        self.engines = engines
+        self.count = 0
+        self.statements = []
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        self.count = 0
+        self.statements = []
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        return False
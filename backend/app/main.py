@@ -1,5 +1,11 @@
+import time
+
+# Đo thời gian import app.main (xem app/core/startup.py)
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 
 # Import các router
@@ -9,18 +15,23 @@ from app.api.v1 import (
     survey_endpoints,
     user_endpoints,
     graph_endpoints,
+    admin_endpoints,
 )
-from app.db.database import engine
-from app.db import models
+from app.core.log import setup_logging
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, render_prometheus
+from app.core.startup import database_reachable, lifespan, startup
+from app.services.recommendation import recommendation_service
 
-# Tạo các bảng trong CSDL
-models.Base.metadata.create_all(bind=engine)
+# Log của ứng dụng theo LOG_LEVEL (xem app/core/log.py)
+setup_logging()
 
-# Khởi tạo ứng dụng FastAPI
+# Khởi tạo ứng dụng FastAPI. Tạo bảng, tải model và dựng chỉ mục chạy trong
+# lifespan (app/core/startup.py), không phải lúc import
 app = FastAPI(
     title="E-Learning Recommender API",
     description="API for the Personalized E-Learning Path Recommender System.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Cấu hình CORS
@@ -30,8 +41,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor trang tiếp theo của các endpoint danh sách (app/api/v1/pagination.py)
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Đo độ trễ theo route, số câu lệnh SQL và thời gian CSDL của mỗi request
+# (thêm sau cùng nên bọc ngoài CORS và đo cả phần đó)
+app.add_middleware(MetricsMiddleware)
+
 # === Đăng ký các Router vào ứng dụng ===
 # Tiền tố (prefix) giúp nhóm các API lại với nhau
 # Ví dụ: /api/v1/auth/register, /api/v1/users/me
@@ -54,8 +71,46 @@ app.include_router(survey_endpoints.router, prefix="/api/v1/survey", tags=["Surv
 
 app.include_router(graph_endpoints.router, prefix="/api/v1/graph", tags=["Graph"])
 
+# API quản trị (yêu cầu header X-Admin-Token)
+app.include_router(admin_endpoints.router, prefix="/api/v1/admin", tags=["Admin"])
+
 
 # Endpoint gốc
 @app.get("/", tags=["Root"])
 async def read_root():
     return {"message": "Welcome to the E-Learning Recommender API!"}
+
+
+# Liveness: tiến trình đang chạy và event loop trả lời được
+@app.get("/healthz", tags=["Root"])
+async def healthz():
+    return {"status": "ok"}
+
+
+# Readiness: khởi động xong (bảng, model, chỉ mục) và CSDL kết nối được
+@app.get("/readyz", tags=["Root"])
+def readyz():
+    db_error = database_reachable()
+    ready = startup.ok and recommendation_service.is_loaded and db_error is None
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "not_ready",
+            "database": db_error or "ok",
+            "model_version": (
+                recommendation_service.model_version
+                if recommendation_service.is_loaded
+                else None
+            ),
+            **startup.status(),
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+# Số liệu của worker này theo định dạng Prometheus
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type=CONTENT_TYPE)
+
+
+startup.mark_imported(_import_started)
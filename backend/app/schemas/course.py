@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 # --- Schemas cho Skills ---
@@ -53,3 +53,27 @@ class CourseWithSkills(Course):
 
     class Config:
         orm_mode = True
+
+
+# --- Schemas cho gợi ý theo lô ---
+
+
+# Gợi ý Content-Based cho nhiều khóa học trong một request
+class BatchRecommendationRequest(BaseModel):
+    course_ids: List[int] = Field(..., min_length=1, max_length=100)
+    limit: int = Field(10, ge=1, le=50)
+
+
+class CourseRecommendations(BaseModel):
+    course_id: int
+    recommendations: List[Course]
+
+
+# Lộ trình cá nhân hóa của nhiều người dùng (endpoint admin)
+class BatchPathRequest(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class UserLearningPath(BaseModel):
+    user_id: int
+    courses: List[Course]
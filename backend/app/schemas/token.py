@@ -9,4 +9,6 @@ class Token(BaseModel):
 
 
 class TokenData(BaseModel):
+    # Token mới có `sub` là user id; token cũ dùng email làm `sub`
+    user_id: Optional[int] = None
     email: Optional[str] = None  # <--- SỬA LẠI Ở ĐÂY
@@ -1,6 +1,6 @@
 # Nội dung cho backend/app/schemas/user.py
 from pydantic import BaseModel, EmailStr
-from typing import Optional  # Có thể cần Optional cho các schema khác sau này
+from typing import Optional, Set  # Có thể cần Optional cho các schema khác sau này
 
 
 class UserBase(BaseModel):
@@ -17,3 +17,23 @@ class User(UserBase):
 
     class Config:
         from_attributes = True
+
+
+# Không phải schema Pydantic: lớp thường với __slots__ vì được tạo hàng loạt
+# (crud) và gửi sang pool tiến trình khi dựng lộ trình (services/learning_path.py)
+class PathRequest:
+    """Dữ liệu kỹ năng của một người dùng, đủ để dựng lộ trình."""
+
+    __slots__ = ("user_id", "known_skill_ids", "target_skill_ids", "learning_style")
+
+    def __init__(
+        self,
+        user_id: int,
+        known_skill_ids: Set[int],
+        target_skill_ids: Set[int],
+        learning_style: Optional[str],
+    ):
+        self.user_id = user_id
+        self.known_skill_ids = known_skill_ids
+        self.target_skill_ids = target_skill_ids
+        self.learning_style = learning_style
@@ -0,0 +1,202 @@
+"""
+Chỉ mục láng giềng gần đúng (ANN) kiểu IVF cho gợi ý Content-Based.
+
+Xây dựng offline (scripts/build_ann_index.py):
+  1. Giảm chiều ma trận TF-IDF bằng TruncatedSVD rồi chuẩn hóa L2, để tích vô
+     hướng xấp xỉ cosine trên không gian gốc.
+  2. Phân cụm các vector bằng MiniBatchKMeans thành `n_lists` danh sách đảo
+     (inverted lists), lưu các vector liên tiếp theo từng danh sách.
+
+Truy vấn: chấm điểm các tâm cụm, chỉ quét `n_probe` danh sách gần nhất, rồi
+(tùy chọn) chấm lại `rerank` ứng viên tốt nhất bằng cosine chính xác trên
+TF-IDF. `n_probe` và `rerank` là hai núm vặn đánh đổi recall/độ trễ.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.topk import top_k
+
+ANN = "ann"
+
+
+class IVFIndex:
+    mode = ANN
+    array_names = (
+        "ann_centroids",
+        "ann_list_offsets",
+        "ann_list_items",
+        "ann_vectors",
+    )
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        list_items: np.ndarray,
+        vectors: np.ndarray,
+        n_probe: int = 8,
+        rerank: int = 0,
+        tfidf_matrix: Optional[sparse.spmatrix] = None,
+    ):
+        # centroids: (n_lists, d); vectors: (N, d) xếp theo thứ tự danh sách
+        # list_items[p] là index khóa học của vector thứ p
+        # list_offsets[l]:list_offsets[l + 1] là đoạn của danh sách l
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_items = list_items
+        self.vectors = vectors
+        # positions[idx] là vị trí của khóa học idx trong `vectors`
+        self.positions = np.empty_like(list_items)
+        self.positions[list_items] = np.arange(list_items.size, dtype=list_items.dtype)
+        self.n_probe = n_probe
+        self.rerank = rerank
+        self.tfidf_matrix = (
+            sparse.csr_matrix(tfidf_matrix, dtype=np.float32)
+            if tfidf_matrix is not None
+            else None
+        )
+
+    @property
+    def n_items(self) -> int:
+        return self.list_items.size
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes
+            for a in (
+                self.centroids,
+                self.list_offsets,
+                self.list_items,
+                self.vectors,
+                self.positions,
+            )
+        )
+
+    def top(self, idx: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = self.vectors[self.positions[idx]]
+        return self._search(idx, query, self.centroids @ query, k)
+
+    def top_many(self, rows: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # Điểm tới các tâm của mọi truy vấn trong một phép nhân ma trận
+        queries = self.vectors[self.positions[rows]]
+        centroid_scores = queries @ self.centroids.T
+        return [
+            self._search(int(idx), query, scores, k)
+            for idx, query, scores in zip(rows, queries, centroid_scores)
+        ]
+
+    def _search(
+        self, idx: int, query: np.ndarray, centroid_scores: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # 1. Chọn n_probe danh sách có tâm gần truy vấn nhất
+        lists, _ = top_k(centroid_scores, self.n_probe)
+
+        # 2. Gom các đoạn vector của những danh sách đó
+        spans = [
+            np.arange(self.list_offsets[l], self.list_offsets[l + 1]) for l in lists
+        ]
+        candidate_positions = np.concatenate(spans)
+        candidates = self.list_items[candidate_positions]
+        scores = self.vectors[candidate_positions] @ query
+
+        # 3. Chấm lại bằng cosine chính xác trên TF-IDF (nếu được bật)
+        if self.rerank and self.tfidf_matrix is not None:
+            keep, _ = top_k(scores, self.rerank + 1)
+            candidates = candidates[keep]
+            scores = (
+                (self.tfidf_matrix[candidates] @ self.tfidf_matrix[idx].T)
+                .toarray()
+                .ravel()
+            )
+
+        self_match = np.flatnonzero(candidates == idx)
+        order, top_scores = top_k(scores, k, exclude=self_match)
+        return candidates[order].astype(np.int64), top_scores
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return dict(
+            zip(
+                self.array_names,
+                (self.centroids, self.list_offsets, self.list_items, self.vectors),
+            )
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays, **kwargs) -> "IVFIndex":
+        return cls(*(arrays[name] for name in cls.array_names), **kwargs)
+
+    def save(self, path: str):
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "IVFIndex":
+        with np.load(path) as arrays:
+            return cls.from_arrays(arrays, **kwargs)
+
+
+def build_ivf_index(
+    tfidf_matrix: sparse.spmatrix,
+    n_components: int = 64,
+    n_lists: Optional[int] = None,
+    seed: int = 42,
+    **kwargs,
+) -> IVFIndex:
+    """
+    Xây dựng chỉ mục IVF từ ma trận TF-IDF. Mặc định n_lists ≈ √N.
+    Các tham số còn lại (n_probe, rerank, tfidf_matrix) được chuyển cho IVFIndex.
+    """
+    # Import tại chỗ: scikit-learn chỉ cần khi xây dựng offline
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.preprocessing import normalize
+
+    n_items, n_terms = tfidf_matrix.shape
+    n_components = min(n_components, n_terms - 1)
+    n_lists = n_lists or max(1, int(np.sqrt(n_items)))
+
+    svd = TruncatedSVD(n_components=n_components, random_state=seed)
+    reduced = normalize(svd.fit_transform(tfidf_matrix)).astype(np.float32)
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_lists, random_state=seed, batch_size=4096, n_init=3
+    )
+    assignments = kmeans.fit_predict(reduced)
+    centroids = normalize(kmeans.cluster_centers_).astype(np.float32)
+
+    list_items = np.argsort(assignments, kind="stable").astype(np.int32)
+    counts = np.bincount(assignments, minlength=n_lists)
+    list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    return IVFIndex(
+        centroids,
+        list_offsets,
+        list_items,
+        np.ascontiguousarray(reduced[list_items]),
+        **kwargs,
+    )
+
+
+def recall_at_k(
+    index: IVFIndex, exact, queries: np.ndarray, k: int = 10
+) -> float:
+    """
+    Recall@k trung bình của `index` so với backend chính xác `exact`
+    (ví dụ SparseSimilarity) trên các index truy vấn `queries`.
+    Các láng giềng có điểm 0 bị bỏ qua vì thứ tự giữa chúng là tùy ý.
+    """
+    hits = 0
+    total = 0
+    for idx in queries:
+        truth, truth_scores = exact.top(int(idx), k)
+        truth = truth[truth_scores > 0]
+        found, _ = index.top(int(idx), k)
+        hits += np.intersect1d(truth, found).size
+        total += truth.size
+    return hits / total if total else 1.0
@@ -0,0 +1,237 @@
+"""
+Định dạng artifact dạng mảng thô (.npy) cho RecommendationService.
+
+Mỗi mảng được lưu thành một file .npy riêng và được mở bằng
+`np.load(..., mmap_mode="r")`. Các worker uvicorn/gunicorn trên cùng một máy
+vì vậy dùng chung một bản trong page cache của hệ điều hành thay vì mỗi worker
+giữ một bản riêng, và khởi động không phải unpickle hàng trăm MB.
+
+Cấu trúc thư mục:
+    manifest.json            phiên bản định dạng + dtype/shape của từng mảng
+    course_ids.npy           index -> course_id (int32 nếu vừa)
+    course_rows.npy          (tùy chọn) bảng đặc course_id -> index, -1 nếu không có
+    cosine_sim_matrix.npy    (tùy chọn) ma trận N×N cho chế độ dense
+                             (float32/float16/uint8 theo score_dtype)
+    tfidf_*.npy              (tùy chọn) ma trận CSR và chuyển vị cho chế độ sparse
+    topk_*.npy               (tùy chọn) bảng láng giềng cho chế độ topk
+    ann_*.npy                (tùy chọn) chỉ mục IVF cho chế độ ann
+    skill_nodes.json         (tùy chọn) tên các nút của đồ thị kỹ năng
+    skill_edges.npy          (tùy chọn) các cạnh (src, dst) theo thứ tự nút
+    skill_topo_rank.npy      (tùy chọn) rank tô-pô và độ sâu theo thứ tự nút
+    skill_depth.npy
+"""
+import json
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+from app.core import config
+from app.services import similarity
+from app.services.ann import IVFIndex
+from app.services.id_index import CourseIdIndex, build_row_of, course_ids_array
+from app.services.topo_rank import TopoTable
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+SKILL_NODES_FILE = "skill_nodes.json"
+
+
+def write_artifacts(
+    out_dir: str,
+    course_ids: np.ndarray,
+    cosine_sim_matrix: Optional[np.ndarray] = None,
+    tfidf_matrix: Optional[sparse.spmatrix] = None,
+    topk_table: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    skill_graph: Optional[nx.DiGraph] = None,
+    ann_index: Optional[IVFIndex] = None,
+    score_dtype: Optional[str] = None,
+) -> Dict:
+    """
+    Ghi các artifact ra thư mục `out_dir` và trả về manifest. `score_dtype`
+    (xem similarity.SCORE_DTYPES) đổi kiểu lưu của ma trận cosine và điểm
+    top-K; None giữ nguyên.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    arrays = {"course_ids": course_ids_array(course_ids)}
+    row_of = build_row_of(arrays["course_ids"])
+    if row_of is not None:
+        arrays["course_rows"] = row_of
+
+    if cosine_sim_matrix is not None:
+        if score_dtype:
+            cosine_sim_matrix = similarity.encode_scores(cosine_sim_matrix, score_dtype)
+        arrays["cosine_sim_matrix"] = cosine_sim_matrix
+    if tfidf_matrix is not None:
+        matrix = sparse.csr_matrix(tfidf_matrix, dtype=np.float32)
+        matrix_t = matrix.T.tocsr()
+        for prefix, m in (("tfidf", matrix), ("tfidf_t", matrix_t)):
+            arrays[f"{prefix}_data"] = m.data
+            arrays[f"{prefix}_indices"] = m.indices
+            arrays[f"{prefix}_indptr"] = m.indptr
+            arrays[f"{prefix}_shape"] = np.asarray(m.shape, dtype=np.int64)
+    if topk_table is not None:
+        neighbors, scores = topk_table
+        arrays["topk_neighbors"] = np.asarray(neighbors, dtype=np.int32)
+        arrays["topk_scores"] = (
+            similarity.encode_scores(scores, score_dtype) if score_dtype else scores
+        )
+    if ann_index is not None:
+        arrays.update(ann_index.to_arrays())
+
+    manifest = {"format_version": FORMAT_VERSION, "arrays": {}}
+    if skill_graph is not None:
+        nodes = list(skill_graph.nodes)
+        node_index = {node: i for i, node in enumerate(nodes)}
+        arrays["skill_edges"] = np.array(
+            [(node_index[u], node_index[v]) for u, v in skill_graph.edges],
+            dtype=np.int32,
+        ).reshape(-1, 2)
+        with open(os.path.join(out_dir, SKILL_NODES_FILE), "w", encoding="utf-8") as f:
+            json.dump(nodes, f, ensure_ascii=False)
+        manifest["skill_nodes"] = SKILL_NODES_FILE
+
+        try:
+            table = TopoTable.from_graph(skill_graph)
+            arrays["skill_topo_rank"] = np.array(
+                [table.rank_of[n] for n in nodes], dtype=np.int32
+            )
+            arrays["skill_depth"] = np.array(
+                [table.depth_of[n] for n in nodes], dtype=np.int32
+            )
+        except nx.NetworkXUnfeasible:
+            logger.warning("Đồ thị có vòng lặp, bỏ qua bảng rank tô-pô.")
+
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        np.save(os.path.join(out_dir, f"{name}.npy"), array)
+        manifest["arrays"][name] = {"dtype": str(array.dtype), "shape": array.shape}
+
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class MmapArtifacts:
+    """Đọc thư mục artifact do `write_artifacts` tạo ra, mọi mảng đều mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Phiên bản artifact không được hỗ trợ: {self.manifest.get('format_version')}"
+            )
+
+    def has(self, name: str) -> bool:
+        return name in self.manifest["arrays"]
+
+    def array(self, name: str) -> np.ndarray:
+        if not self.has(name):
+            raise FileNotFoundError(f"Artifact '{name}' không có trong {self.path}")
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def course_ids(self) -> np.ndarray:
+        return self.array("course_ids")
+
+    def _csr(self, prefix: str) -> sparse.csr_matrix:
+        shape = tuple(int(x) for x in self.array(f"{prefix}_shape"))
+        return sparse.csr_matrix(
+            (
+                self.array(f"{prefix}_data"),
+                self.array(f"{prefix}_indices"),
+                self.array(f"{prefix}_indptr"),
+            ),
+            shape=shape,
+        )
+
+    def course_index(self) -> CourseIdIndex:
+        row_of = self.array("course_rows") if self.has("course_rows") else None
+        return CourseIdIndex(self.course_ids(), row_of)
+
+    def tfidf_matrix(self) -> sparse.csr_matrix:
+        return self._csr("tfidf")
+
+    def similarity(self, mode: str):
+        """Dựng backend tương đồng của `mode` trên các mảng mmap."""
+        if mode == similarity.SPARSE:
+            return similarity.SparseSimilarity(self._csr("tfidf"), self._csr("tfidf_t"))
+        if mode == similarity.ANN:
+            return IVFIndex.from_arrays(
+                {name: self.array(name) for name in IVFIndex.array_names},
+                n_probe=config.ANN_N_PROBE,
+                rerank=config.ANN_RERANK,
+                tfidf_matrix=self._csr("tfidf") if config.ANN_RERANK else None,
+            )
+        if mode == similarity.TOPK:
+            return similarity.TopKNeighborSimilarity(
+                self.array("topk_neighbors"), self.array("topk_scores")
+            )
+        return similarity.DenseSimilarity(self.array("cosine_sim_matrix"))
+
+    def _skill_nodes(self):
+        nodes_path = os.path.join(self.path, self.manifest["skill_nodes"])
+        with open(nodes_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def topo_table(self) -> Optional[TopoTable]:
+        if not self.has("skill_topo_rank"):
+            return None
+        return TopoTable(
+            self._skill_nodes(),
+            self.array("skill_topo_rank"),
+            self.array("skill_depth"),
+        )
+
+    def skill_graph(self) -> Optional[nx.DiGraph]:
+        if not self.manifest.get("skill_nodes"):
+            return None
+        nodes = self._skill_nodes()
+        graph = nx.DiGraph()
+        graph.add_nodes_from(nodes)
+        graph.add_edges_from((nodes[u], nodes[v]) for u, v in self.array("skill_edges"))
+        return graph
+
+
+def ranking_quality(reference, candidate, rows: np.ndarray, k: int) -> Dict:
+    """
+    So sánh top-`k` của backend `candidate` (ví dụ: điểm đã lượng tử hóa) với
+    `reference` (điểm gốc) trên các hàng `rows`:
+      - recall: tỉ lệ láng giềng của reference có trong kết quả của candidate;
+      - tie_recall: tỉ lệ láng giềng của candidate có điểm gốc không thua láng
+        giềng thứ k của reference, tức đổi chỗ giữa các điểm bằng nhau không bị
+        tính là sai (điểm gốc lấy từ top-2k của reference);
+      - max_score_error: sai số điểm lớn nhất so với điểm gốc.
+    """
+    recall = tie_recall = max_error = 0.0
+    counted = 0
+    for (ref_ids, ref_scores), (ids, scores) in zip(
+        reference.top_many(rows, 2 * k), candidate.top_many(rows, k)
+    ):
+        if ref_ids.size == 0:
+            continue
+        counted += 1
+        top = min(k, ref_ids.size)
+        kth = ref_scores[top - 1]
+        recall += np.isin(ref_ids[:top], ids).sum() / top
+
+        # Điểm gốc của các láng giềng candidate (ngoài top-2k thì chắc chắn thua)
+        pos = {course: i for i, course in enumerate(ref_ids.tolist())}
+        known = np.array([course in pos for course in ids.tolist()], dtype=bool)
+        true_scores = ref_scores[[pos[c] for c in ids[known].tolist()]]
+        tie_recall += (true_scores >= kth - 1e-6).sum() / top
+        if true_scores.size:
+            error = np.abs(true_scores - scores[known].astype(np.float64)).max()
+            max_error = max(max_error, float(error))
+    counted = max(counted, 1)
+    return {
+        "recall": recall / counted,
+        "tie_recall": tie_recall / counted,
+        "max_score_error": max_error,
+    }
@@ -0,0 +1,253 @@
+"""
+Cache kết quả theo người dùng (lộ trình cá nhân hóa, phân tích skill gap).
+
+Khóa cache gồm loại kết quả + user_id + số phiên bản của người dùng + thế hệ
+toàn cục. Các endpoint ghi dữ liệu của người dùng (khảo sát, tiến độ) tăng
+phiên bản của người đó, nên các mục cũ không bao giờ được đọc lại và sẽ tự bị
+loại bỏ theo TTL/LRU. Thế hệ toàn cục được tăng khi catalog hoặc model thay
+đổi, làm mất hiệu lực toàn bộ cache một lần.
+
+Backend có thể thay thế: InMemoryLRUCache (mặc định, trong tiến trình) hoặc
+RedisCache (dùng chung giữa các worker, cần cài `redis`). Giá trị được lưu
+phải tuần tự hóa được sang JSON. Bộ đếm phiên bản/thế hệ có thể nằm ở một
+backend khác giá trị (USER_CACHE_COUNTERS=redis): giá trị ở LRU của từng
+worker nhưng lần ghi ở worker nào cũng vô hiệu hóa kết quả ở mọi worker.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core import config
+
+
+class CacheBackend:
+    """Giao diện tối thiểu mà một backend cache phải cài đặt."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """Backend không lưu gì (USER_CACHE_BACKEND=none), mọi lần đọc đều miss."""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def get_counter(self, key):
+        return 0
+
+    def incr(self, key):
+        return 0
+
+    def stats(self):
+        return {"hits": 0, "misses": self.misses, "evictions": 0, "expirations": 0}
+
+
+class InMemoryLRUCache(CacheBackend):
+    """
+    LRU trong tiến trình với TTL và giới hạn số mục. Bộ đếm phiên bản được
+    giữ riêng, không bị LRU loại bỏ, để một phiên bản cũ không thể "sống lại".
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._data),
+        }
+
+
+class RedisCache(CacheBackend):
+    """
+    Backend dùng Redis (hoặc store tương thích giao thức Redis). Việc loại bỏ
+    theo TTL/dung lượng do Redis đảm nhận (đặt maxmemory-policy allkeys-lru);
+    số mục bị loại bỏ nằm trong INFO stats của Redis, không đếm ở đây.
+    """
+
+    def __init__(self, url: str, ttl: float = 300.0, prefix: str = "elearning:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "USER_CACHE_BACKEND=redis cần thư viện 'redis' (pip install redis)."
+            ) from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(
+            self.prefix + key,
+            json.dumps(value),
+            ex=max(1, int(self.ttl if ttl is None else ttl)),
+        )
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def get_counter(self, key):
+        raw = self.client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": 0, "expirations": 0}
+
+
+class UserResultCache:
+    """Cache kết quả theo (loại, user_id) với vô hiệu hóa bằng số phiên bản."""
+
+    GENERATION_KEY = "generation"
+
+    def __init__(self, backend: CacheBackend, counters: Optional[CacheBackend] = None):
+        self.backend = backend
+        # Nơi giữ số phiên bản/thế hệ; mặc định cùng backend với giá trị
+        self.counters = counters if counters is not None else backend
+
+    def generation(self) -> int:
+        return self.counters.get_counter(self.GENERATION_KEY)
+
+    def key(self, kind: str, user_id: int, generation: Optional[int] = None) -> str:
+        """
+        Khóa hiện tại của (kind, user_id). Lấy khóa TRƯỚC khi đọc dữ liệu để
+        tính kết quả và ghi bằng chính khóa đó: nếu dữ liệu đổi trong lúc tính,
+        kết quả cũ rơi vào phiên bản cũ thay vì phiên bản mới. Job dùng một chỉ
+        mục suốt lượt chạy truyền `generation` đọc trước khi dựng chỉ mục.
+        """
+        version = self.counters.get_counter(f"user:{user_id}:version")
+        if generation is None:
+            generation = self.generation()
+        return f"{kind}:{user_id}:{version}:{generation}"
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: Any):
+        self.backend.set(key, value)
+
+    def bump_user(self, user_id: int):
+        """Gọi sau khi dữ liệu của người dùng thay đổi (khảo sát, tiến độ)."""
+        self.counters.incr(f"user:{user_id}:version")
+
+    def bump_all(self):
+        """Gọi khi catalog hoặc model thay đổi: mọi mục hiện có đều hết hiệu lực."""
+        self.counters.incr(self.GENERATION_KEY)
+
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
+
+
+def build_backend(kind: str) -> CacheBackend:
+    if kind == "none":
+        return NullCache()
+    if kind == "redis":
+        return RedisCache(config.REDIS_URL, ttl=config.USER_CACHE_TTL_SECONDS)
+    if kind == "memory":
+        return InMemoryLRUCache(
+            max_size=config.USER_CACHE_MAX_SIZE, ttl=config.USER_CACHE_TTL_SECONDS
+        )
+    raise ValueError(f"USER_CACHE_BACKEND không hợp lệ: '{kind}'")
+
+
+def build_counters(kind: str, backend: CacheBackend) -> CacheBackend:
+    if kind == "backend":
+        return backend
+    if kind == "redis":
+        return backend if isinstance(backend, RedisCache) else build_backend("redis")
+    raise ValueError(f"USER_CACHE_COUNTERS không hợp lệ: '{kind}'")
+
+
+# Cache dùng chung cho toàn bộ ứng dụng
+_backend = build_backend(config.USER_CACHE_BACKEND)
+user_cache = UserResultCache(
+    _backend, build_counters(config.USER_CACHE_COUNTERS, _backend)
+)
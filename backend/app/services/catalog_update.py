@@ -0,0 +1,367 @@
+"""
+Cập nhật catalog tăng dần cho model Content-Based, không cần huấn luyện lại.
+
+Khi chỉ mục khóa học-kỹ năng được dựng lại (catalog trong CSDL thay đổi),
+`CatalogUpdater.sync` so sánh văn bản kỹ năng của từng khóa học với văn bản
+mà model đang dùng:
+  - khóa học mới / thay đổi được biến đổi bằng TfidfVectorizer hiện có, vector
+    mới được nối thêm (hoặc thay hàng cũ) vào ma trận TF-IDF;
+  - chỉ các hàng/láng giềng bị ảnh hưởng được tính lại (xem `_update_*`);
+  - RecommendationService nhận backend mới qua một phép hoán đổi tham chiếu.
+
+Độ lệch (drift) được đo bằng tỉ lệ token ngoài từ vựng (OOV) trong các khóa
+học đã thêm/sửa kể từ lần fit gần nhất. Từ vựng TF-IDF cố định nên các token
+OOV bị bỏ qua; khi tỉ lệ này vượt CATALOG_DRIFT_OOV_THRESHOLD, hoặc một lần
+thay đổi chạm tới quá CATALOG_MAX_DELTA_FRACTION catalog, updater fit lại
+vectorizer trên toàn bộ catalog.
+"""
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services import similarity
+from app.services.ann import IVFIndex, build_ivf_index
+from app.services.skill_index import CourseSkillIndex
+from app.services.topk import top_k
+
+logger = logging.getLogger(__name__)
+
+
+def course_texts(index: CourseSkillIndex) -> List[str]:
+    """Văn bản kỹ năng của từng khóa học, giống cột skills_as_string của notebook."""
+    indptr, indices = index.course_skills.indptr, index.course_skills.indices
+    return [
+        " ".join(sorted(index.skill_names[indices[start:stop]]))
+        for start, stop in zip(indptr[:-1], indptr[1:])
+    ]
+
+
+class CatalogUpdate:
+    """Kết quả một lần đồng bộ, được RecommendationService hoán đổi vào."""
+
+    def __init__(
+        self,
+        course_ids: np.ndarray,
+        backend,
+        added: int,
+        changed: int,
+        refit: bool,
+    ):
+        self.course_ids = course_ids
+        self.backend = backend
+        self.added = added
+        self.changed = changed
+        self.refit = refit
+
+
+class CatalogUpdater:
+    def __init__(
+        self,
+        vectorizer,
+        tfidf_matrix: sparse.spmatrix,
+        course_ids: np.ndarray,
+        oov_threshold: float = 0.05,
+        max_delta_fraction: float = 0.2,
+    ):
+        self.vectorizer = vectorizer
+        self.tfidf_matrix = sparse.csr_matrix(tfidf_matrix, dtype=np.float32)
+        self.course_ids = np.asarray(course_ids, dtype=np.int64)
+        self.oov_threshold = oov_threshold
+        self.max_delta_fraction = max_delta_fraction
+        # course_id -> văn bản đã được đưa vào model; None cho tới lần sync đầu
+        self.texts: Optional[Dict[int, str]] = None
+        # Thống kê token OOV kể từ lần fit gần nhất
+        self.oov_tokens = 0
+        self.total_tokens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def drift(self) -> float:
+        """Tỉ lệ token OOV trong các khóa học đã thêm/sửa kể từ lần fit gần nhất."""
+        return self.oov_tokens / self.total_tokens if self.total_tokens else 0.0
+
+    def _count_oov(self, texts: List[str]):
+        analyzer = self.vectorizer.build_analyzer()
+        vocabulary = self.vectorizer.vocabulary_
+        for text in texts:
+            tokens = analyzer(text)
+            self.total_tokens += len(tokens)
+            self.oov_tokens += sum(1 for t in tokens if t not in vocabulary)
+
+    def _diff(self, ids: np.ndarray, texts: List[str]) -> Tuple[List[int], List[int]]:
+        """Vị trí (trong `ids`) của các khóa học mới và các khóa học đã thay đổi."""
+        rows = {cid: i for i, cid in enumerate(self.course_ids.tolist())}
+        added = [i for i, cid in enumerate(ids.tolist()) if cid not in rows]
+        if self.texts is not None:
+            changed = [
+                i
+                for i, cid in enumerate(ids.tolist())
+                if cid in rows and self.texts.get(cid) != texts[i]
+            ]
+            return added, changed
+
+        # Lần đầu: model được huấn luyện từ CSV nên chỉ có thể so sánh vector
+        known = [i for i, cid in enumerate(ids.tolist()) if cid in rows]
+        if not known:
+            return added, []
+        fresh = self.vectorizer.transform([texts[i] for i in known])
+        stored = self.tfidf_matrix[[rows[ids[i]] for i in known]]
+        delta = np.asarray(abs(fresh - stored).sum(axis=1)).ravel()
+        return added, [known[j] for j in np.flatnonzero(delta > 1e-4)]
+
+    def sync(self, index: CourseSkillIndex, backend) -> Optional[CatalogUpdate]:
+        """
+        Đưa các thay đổi của catalog (theo `index`) vào `backend`.
+        Trả về None nếu không có gì thay đổi.
+        """
+        with self._lock:
+            texts = course_texts(index)
+            ids = index.course_ids
+            added, changed = self._diff(ids, texts)
+            if not added and not changed:
+                self.texts = dict(zip(ids.tolist(), texts))
+                return None
+
+            delta_texts = [texts[i] for i in added + changed]
+            self._count_oov(delta_texts)
+            too_big = len(added) + len(changed) > self.max_delta_fraction * max(
+                1, self.course_ids.size
+            )
+            if backend is None:
+                update = self._refit(ids, texts, backend, "chưa có backend")
+            elif too_big:
+                update = self._refit(ids, texts, backend, "thay đổi quá lớn")
+            elif self.drift > self.oov_threshold:
+                update = self._refit(
+                    ids, texts, backend, f"độ lệch từ vựng {self.drift:.1%}"
+                )
+            else:
+                update = self._apply(ids[added], ids[changed], delta_texts, backend)
+            if update is None:
+                return None
+            self.texts = dict(zip(ids.tolist(), texts))
+            return update
+
+    def _apply(
+        self, added_ids: np.ndarray, changed_ids: np.ndarray, texts: List[str], backend
+    ) -> Optional[CatalogUpdate]:
+        if isinstance(backend, IVFIndex):
+            # Chỉ mục IVF không lưu phép chiếu SVD nên không thể thêm vector
+            logger.warning(
+                "Chế độ 'ann' không hỗ trợ cập nhật tăng dần; "
+                f"{added_ids.size + changed_ids.size} khóa học sẽ có trong lần fit lại tới."
+            )
+            return None
+
+        rows = {cid: i for i, cid in enumerate(self.course_ids.tolist())}
+        n_old = self.course_ids.size
+        vectors = sparse.csr_matrix(
+            self.vectorizer.transform(texts), dtype=np.float32
+        )
+        # Chọn hàng cho ma trận mới: hàng cũ giữ nguyên, hàng thay đổi lấy từ
+        # `vectors`, hàng mới nối vào cuối; khóa học giữ nguyên vị trí hàng
+        source = np.arange(n_old + added_ids.size)
+        changed_rows = np.array([rows[cid] for cid in changed_ids.tolist()], dtype=np.int64)
+        source[changed_rows] = n_old + added_ids.size + np.arange(changed_ids.size)
+        source[n_old:] = n_old + np.arange(added_ids.size)
+        # `vectors` được xếp theo thứ tự added + changed
+        tfidf = sparse.vstack([self.tfidf_matrix, vectors]).tocsr()[source]
+        course_ids = np.concatenate([self.course_ids, added_ids])
+        affected = np.concatenate([changed_rows, np.arange(n_old, course_ids.size)])
+
+        sim = similarity.SparseSimilarity(tfidf)
+        if isinstance(backend, similarity.DenseSimilarity):
+            new_backend = similarity.DenseSimilarity(
+                _update_dense(backend.matrix, sim, affected)
+            )
+        elif isinstance(backend, similarity.TopKNeighborSimilarity):
+            neighbors, scores = _update_topk(
+                backend.neighbors, similarity.decode_scores(backend.scores), sim, affected
+            )
+            # Giữ kiểu lưu điểm của backend cũ (float16/uint8 nếu đã lượng tử hóa)
+            new_backend = similarity.TopKNeighborSimilarity(
+                neighbors, similarity.encode_scores(scores, backend.scores.dtype)
+            )
+        else:
+            new_backend = sim
+
+        self.tfidf_matrix = tfidf
+        self.course_ids = course_ids
+        return CatalogUpdate(
+            course_ids, new_backend, int(added_ids.size), int(changed_ids.size), False
+        )
+
+    def _refit(
+        self, ids: np.ndarray, texts: List[str], backend, reason: str
+    ) -> CatalogUpdate:
+        """Fit lại vectorizer trên toàn bộ catalog và dựng lại backend cùng chế độ."""
+        logger.info(f"Fit lại TF-IDF trên {ids.size} khóa học ({reason}).")
+        added = int(np.isin(ids, self.course_ids, invert=True).sum())
+        # Import tại chỗ: scikit-learn chỉ cần khi fit lại (import mất ~1s lúc khởi động)
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.vectorizer = TfidfVectorizer(**self.vectorizer.get_params())
+        tfidf = sparse.csr_matrix(self.vectorizer.fit_transform(texts), dtype=np.float32)
+
+        sim = similarity.SparseSimilarity(tfidf)
+        if isinstance(backend, similarity.DenseSimilarity):
+            new_backend = similarity.DenseSimilarity(
+                similarity.encode_scores(
+                    (sim.matrix @ sim.matrix_t).toarray(), backend.matrix.dtype
+                )
+            )
+        elif isinstance(backend, similarity.TopKNeighborSimilarity):
+            k = backend.neighbors.shape[1]
+            neighbors, scores = similarity.build_topk_table(tfidf, k)
+            new_backend = similarity.TopKNeighborSimilarity(
+                neighbors, similarity.encode_scores(scores, backend.scores.dtype)
+            )
+        elif isinstance(backend, IVFIndex):
+            new_backend = build_ivf_index(
+                tfidf, n_probe=backend.n_probe, rerank=backend.rerank
+            )
+        else:
+            new_backend = sim
+
+        self.tfidf_matrix = tfidf
+        self.course_ids = np.asarray(ids, dtype=np.int64)
+        self.oov_tokens = self.total_tokens = 0
+        return CatalogUpdate(self.course_ids, new_backend, added, ids.size - added, True)
+
+
+def _update_dense(
+    matrix: np.ndarray, sim: similarity.SparseSimilarity, affected: np.ndarray
+) -> np.ndarray:
+    """
+    Ma trận cosine mới: sao chép ma trận cũ rồi ghi lại các hàng/cột bị ảnh
+    hưởng. Chi phí tính toán tỉ lệ với len(affected) × N, nhưng bản sao vẫn
+    cần bộ nhớ N'².
+    """
+    n_old, n_new = matrix.shape[0], sim.n_items
+    result = np.empty((n_new, n_new), dtype=matrix.dtype)
+    result[:n_old, :n_old] = matrix
+    # Điểm mới được ghi theo kiểu lưu của ma trận cũ (xem similarity.encode_scores)
+    result[affected, :] = similarity.encode_scores(
+        (sim.matrix[affected] @ sim.matrix_t).toarray(), matrix.dtype
+    )
+    result[:, affected] = similarity.encode_scores(_columns(sim, affected), matrix.dtype)
+    return result
+
+
+def _columns(sim: similarity.SparseSimilarity, columns: np.ndarray) -> np.ndarray:
+    """
+    Các cột cosine tới `columns`, tính theo hàng như SparseSimilarity.row để
+    điểm trùng khớp từng bit với việc tính lại toàn bộ hàng (thứ tự cộng float).
+    """
+    return (sim.matrix @ sim.matrix_t[:, columns]).toarray()
+
+
+def _update_topk(
+    neighbors: np.ndarray,
+    scores: np.ndarray,
+    sim: similarity.SparseSimilarity,
+    affected: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cập nhật bảng top-K láng giềng:
+      - hàng của khóa học bị ảnh hưởng và các hàng đang chứa chúng làm láng
+        giềng (điểm có thể giảm) được tính lại hoàn toàn;
+      - các hàng khác chỉ cần trộn danh sách hiện có với điểm tới các khóa học
+        bị ảnh hưởng, nếu có điểm nào không thua láng giềng thứ K.
+    Thứ tự hòa điểm giống build_topk_table: index nhỏ hơn đứng trước.
+    """
+    n_old, k = neighbors.shape
+    n_new = sim.n_items
+    new_neighbors = np.full((n_new, k), -1, dtype=np.int32)
+    new_scores = np.zeros((n_new, k), dtype=np.float32)
+    new_neighbors[:n_old] = neighbors
+    new_scores[:n_old] = scores
+
+    block = (sim.matrix[affected] @ sim.matrix_t).toarray()
+    stale = np.flatnonzero(np.isin(neighbors, affected).any(axis=1))
+    stale = np.setdiff1d(stale, affected)
+    for row, values in zip(affected, block):
+        _fill_row(new_neighbors, new_scores, row, values)
+    for start in range(0, stale.size, 1024):
+        rows = stale[start : start + 1024]
+        for row, values in zip(rows, (sim.matrix[rows] @ sim.matrix_t).toarray()):
+            _fill_row(new_neighbors, new_scores, row, values)
+
+    rest = np.setdiff1d(np.arange(n_old), np.concatenate([affected, stale]))
+    columns = _columns(sim, affected)[rest]
+    full = new_neighbors[rest, -1] >= 0
+    kth = np.where(full, new_scores[rest, -1], -np.inf)
+    merge = (columns >= kth[:, None]).any(axis=1)
+    rows, columns = rest[merge], columns[merge]
+    if rows.size:
+        cand_ids = np.hstack([new_neighbors[rows], np.broadcast_to(affected, columns.shape)])
+        cand_scores = np.hstack(
+            [
+                np.where(new_neighbors[rows] >= 0, new_scores[rows], -np.inf),
+                columns,
+            ]
+        )
+        # Sắp xếp ổn định theo id rồi theo điểm giảm dần = (-điểm, id)
+        order = np.argsort(cand_ids, axis=1, kind="stable")
+        cand_ids = np.take_along_axis(cand_ids, order, axis=1)
+        cand_scores = np.take_along_axis(cand_scores, order, axis=1)
+        order = np.argsort(-cand_scores, axis=1, kind="stable")[:, :k]
+        top_ids = np.take_along_axis(cand_ids, order, axis=1)
+        top_scores = np.take_along_axis(cand_scores, order, axis=1)
+        new_neighbors[rows] = np.where(np.isfinite(top_scores), top_ids, -1)
+        new_scores[rows] = np.where(np.isfinite(top_scores), top_scores, 0)
+    return new_neighbors, new_scores
+
+
+def _fill_row(neighbors: np.ndarray, scores: np.ndarray, row: int, values: np.ndarray):
+    top_indices, top_scores = top_k(values, neighbors.shape[1], exclude=(row,))
+    neighbors[row] = -1
+    scores[row] = 0
+    neighbors[row, : top_indices.size] = top_indices
+    scores[row, : top_scores.size] = top_scores
+
+
+class CatalogSync:
+    """
+    Chạy CatalogUpdater trong một luồng nền sau mỗi lần dựng lại chỉ mục, để
+    request đang kích hoạt việc dựng lại không phải chờ. Chỉ một lần đồng bộ
+    chạy tại một thời điểm; yêu cầu đến trong lúc đang chạy được gộp lại.
+    """
+
+    def __init__(
+        self,
+        updater: CatalogUpdater,
+        get_backend: Callable[[], object],
+        apply: Callable[[CatalogUpdate], None],
+    ):
+        self.updater = updater
+        self.get_backend = get_backend
+        self.apply = apply
+        self._pending: Optional[CourseSkillIndex] = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    def schedule(self, index: CourseSkillIndex):
+        with self._lock:
+            self._pending = index
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                index, self._pending = self._pending, None
+                if index is None:
+                    self._running = False
+                    return
+            try:
+                update = self.updater.sync(index, self.get_backend())
+                if update is not None:
+                    self.apply(update)
+            except Exception as e:
+                logger.error(f"Không thể cập nhật catalog cho model gợi ý: {e}")
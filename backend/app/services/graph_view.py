@@ -0,0 +1,150 @@
+"""
+Đồ thị phụ thuộc kỹ năng ở dạng sẵn sàng để trả về cho client.
+
+Trước đây mỗi request GET /graph/dependency-graph gọi node_link_data rồi đi
+qua JSON encoder của FastAPI cho toàn bộ đồ thị. `GraphView` được dựng một
+lần cho mỗi phiên bản model (cùng ModelBundle):
+  - payload node-link đầy đủ đã mã hóa JSON, nén sẵn gzip (và br nếu cài
+    `brotli`), kèm ETag theo nội dung để client gửi If-None-Match;
+  - ma trận kề dạng CSR theo cả hai chiều (kỹ năng tiên quyết -> kỹ năng sau
+    và ngược lại) để lấy đồ thị con bằng BFS giới hạn độ sâu;
+  - đoạn JSON đã mã hóa của từng nút và từng cạnh, nên đồ thị con chỉ là
+    phép nối các đoạn bytes, không dựng dict hay gọi encoder theo request.
+
+Cạnh u -> v nghĩa là u là kỹ năng tiên quyết của v.
+"""
+import gzip
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional
+
+import networkx as nx
+import numpy as np
+from networkx.readwrite import json_graph
+
+try:
+    import brotli
+except ImportError:  # nén br là tùy chọn (pip install brotli)
+    brotli = None
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class GraphView:
+    def __init__(self, graph: nx.DiGraph, version: str):
+        self.version = version
+        data = json_graph.node_link_data(graph)
+        # Tên khóa của danh sách cạnh phụ thuộc phiên bản networkx ("links"/"edges")
+        self.edges_key = next(k for k in ("edges", "links") if k in data)
+
+        self.body = _encode(data)
+        self.digest = hashlib.sha1(self.body).hexdigest()[:20]
+        self.encoded: Dict[str, bytes] = {"gzip": gzip.compress(self.body, 6)}
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(self.body, quality=9)
+
+        # Phần đầu chung của mọi payload (directed, multigraph, graph)
+        self._header = _encode(
+            {k: v for k, v in data.items() if k not in ("nodes", self.edges_key)}
+        )[:-1]
+        self.node_names: List[str] = [node["id"] for node in data["nodes"]]
+        self.position: Dict[str, int] = {
+            name: i for i, name in enumerate(self.node_names)
+        }
+        self.node_json = [_encode(node) for node in data["nodes"]]
+        self.edge_json = [_encode(edge) for edge in data[self.edges_key]]
+
+        n = len(self.node_names)
+        edges = np.array(
+            [
+                (self.position[e["source"]], self.position[e["target"]])
+                for e in data[self.edges_key]
+            ],
+            dtype=np.int32,
+        ).reshape(-1, 2)
+        edge_ids = np.arange(edges.shape[0], dtype=np.int32)
+        # CSR theo nút nguồn (kỹ năng sau) và theo nút đích (kỹ năng tiên quyết);
+        # `*_edges` giữ chỉ số cạnh để lấy lại đoạn JSON của cạnh
+        self.succ_indptr, self.succ, self.succ_edges = self._csr(
+            edges[:, 0], edges[:, 1], edge_ids, n
+        )
+        self.pred_indptr, self.pred, self.pred_edges = self._csr(
+            edges[:, 1], edges[:, 0], edge_ids, n
+        )
+
+    @staticmethod
+    def _csr(rows: np.ndarray, cols: np.ndarray, edge_ids: np.ndarray, n: int):
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, cols[order], edge_ids[order]
+
+    def positions(self, skill_names: Iterable[str]) -> np.ndarray:
+        """Vị trí nút của các kỹ năng; bỏ qua tên không có trong đồ thị."""
+        found = [self.position[s] for s in skill_names if s in self.position]
+        return np.unique(np.array(found, dtype=np.int64))
+
+    def _bfs(
+        self, start: np.ndarray, depth: Optional[int], indptr, neighbors
+    ) -> np.ndarray:
+        """Các nút đi tới được từ `start` trong tối đa `depth` bước (None: không giới hạn)."""
+        seen = np.zeros(len(self.node_names), dtype=bool)
+        seen[start] = True
+        frontier, step = start, 0
+        while frontier.size and (depth is None or step < depth):
+            reached = [neighbors[indptr[v] : indptr[v + 1]] for v in frontier.tolist()]
+            frontier = np.unique(np.concatenate(reached)) if reached else frontier[:0]
+            frontier = frontier[~seen[frontier]]
+            seen[frontier] = True
+            step += 1
+        return np.flatnonzero(seen)
+
+    def ego(self, skill: str, radius: int = 1, direction: str = "both") -> np.ndarray:
+        """Nút của đồ thị con quanh `skill`: kỹ năng tiên quyết (in), kỹ năng sau (out)."""
+        start = self.positions([skill])
+        nodes = [start]
+        if direction in ("in", "both"):
+            nodes.append(self._bfs(start, radius, self.pred_indptr, self.pred))
+        if direction in ("out", "both"):
+            nodes.append(self._bfs(start, radius, self.succ_indptr, self.succ))
+        return np.unique(np.concatenate(nodes))
+
+    def prerequisites(
+        self, skills: Iterable[str], depth: Optional[int] = None
+    ) -> np.ndarray:
+        """Các kỹ năng cùng mọi kỹ năng tiên quyết (tổ tiên) của chúng tới độ sâu `depth`."""
+        return self._bfs(self.positions(skills), depth, self.pred_indptr, self.pred)
+
+    def subgraph_json(self, nodes: np.ndarray) -> bytes:
+        """Payload node-link (cùng định dạng payload đầy đủ) của đồ thị con cảm sinh."""
+        inside = np.zeros(len(self.node_names), dtype=bool)
+        inside[nodes] = True
+        edge_ids: List[int] = []
+        for v in nodes.tolist():
+            start, stop = self.succ_indptr[v], self.succ_indptr[v + 1]
+            targets = self.succ[start:stop]
+            edge_ids.extend(self.succ_edges[start:stop][inside[targets]].tolist())
+        edge_ids.sort()
+        return b"".join(
+            (
+                self._header,
+                b',"nodes":[',
+                b",".join(self.node_json[v] for v in nodes.tolist()),
+                b'],"',
+                self.edges_key.encode(),
+                b'":[',
+                b",".join(self.edge_json[e] for e in edge_ids),
+                b"]}",
+            )
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "nodes": len(self.node_names),
+            "edges": len(self.edge_json),
+            "bytes": len(self.body),
+            **{f"bytes_{name}": len(body) for name, body in self.encoded.items()},
+        }
@@ -0,0 +1,94 @@
+"""
+Ánh xạ course_id -> hàng của model gợi ý, thay cho pd.Series.
+
+Id khóa học là khóa tự tăng của CSDL nên gần như liên tục: khi id lớn nhất
+không quá DENSE_MAX_FACTOR lần số khóa học, bảng tra là một mảng int32 đặc
+`row_of[course_id]` (-1 nếu không có), tra một id chỉ là một lần đọc mảng.
+Ngược lại (id thưa, ví dụ id ngoài), dùng mảng id đã sắp xếp + searchsorted.
+Cả hai đều là mảng numpy thuần nên lưu được thành .npy và mmap được.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Dùng bảng đặc khi max(course_id) + 1 <= DENSE_MAX_FACTOR × số khóa học
+DENSE_MAX_FACTOR = 4
+
+
+def row_id_dtype(course_ids: np.ndarray) -> np.dtype:
+    """int32 nếu mọi id vừa, nếu không giữ int64."""
+    if course_ids.size and (course_ids.min() < 0 or course_ids.max() >= 2**31):
+        return np.dtype(np.int64)
+    return np.dtype(np.int32)
+
+
+def course_ids_array(course_ids) -> np.ndarray:
+    """Mảng hàng -> course_id với kiểu nhỏ nhất (int32 nếu vừa)."""
+    course_ids = np.asarray(course_ids)
+    return course_ids.astype(row_id_dtype(course_ids), copy=False)
+
+
+def build_row_of(course_ids: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Bảng đặc id -> hàng (int32, -1 nếu không có), hoặc None nếu id quá thưa.
+    Id trùng lặp thì hàng xuất hiện đầu tiên được giữ.
+    """
+    course_ids = np.asarray(course_ids)
+    if course_ids.size == 0 or course_ids.min() < 0:
+        return None
+    size = int(course_ids.max()) + 1
+    if size > DENSE_MAX_FACTOR * course_ids.size + 1024:
+        return None
+    row_of = np.full(size, -1, dtype=np.int32)
+    # Gán ngược để hàng đầu tiên của id trùng ghi đè sau cùng
+    row_of[course_ids[::-1]] = np.arange(course_ids.size - 1, -1, -1, dtype=np.int32)
+    return row_of
+
+
+class CourseIdIndex:
+    """Tra hàng của một hoặc nhiều course_id; -1 nghĩa là không có trong model."""
+
+    def __init__(self, course_ids: np.ndarray, row_of: Optional[np.ndarray] = None):
+        course_ids = np.asarray(course_ids)
+        self.size = course_ids.size
+        self.row_of = row_of if row_of is not None else build_row_of(course_ids)
+        if self.row_of is None:
+            # id thưa: mảng id duy nhất đã sắp xếp cùng hàng đầu tiên của mỗi id
+            self.sorted_ids, first = np.unique(course_ids, return_index=True)
+            self.sorted_rows = first.astype(np.int32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        if self.row_of is not None:
+            return self.row_of.nbytes
+        return self.sorted_ids.nbytes + self.sorted_rows.nbytes
+
+    def row(self, course_id: int) -> int:
+        if self.row_of is not None:
+            if 0 <= course_id < self.row_of.size:
+                return int(self.row_of[course_id])
+            return -1
+        pos = int(np.searchsorted(self.sorted_ids, course_id))
+        if pos < self.sorted_ids.size and self.sorted_ids[pos] == course_id:
+            return int(self.sorted_rows[pos])
+        return -1
+
+    def __contains__(self, course_id: int) -> bool:
+        return self.row(course_id) >= 0
+
+    def rows(self, course_ids: Sequence[int]) -> np.ndarray:
+        """Hàng của từng id (int64), -1 với id không có."""
+        ids = np.asarray(course_ids, dtype=np.int64)
+        if self.row_of is not None:
+            inside = (ids >= 0) & (ids < self.row_of.size)
+            rows = np.full(ids.size, -1, dtype=np.int64)
+            rows[inside] = self.row_of[ids[inside]]
+            return rows
+        if self.sorted_ids.size == 0:
+            return np.full(ids.size, -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.sorted_ids, ids), self.sorted_ids.size - 1)
+        found = self.sorted_ids[pos] == ids
+        return np.where(found, self.sorted_rows[pos], -1).astype(np.int64)
@@ -0,0 +1,164 @@
+"""
+Dựng lộ trình cá nhân hóa từ chỉ mục khóa học-kỹ năng, cho một hoặc nhiều
+người dùng.
+
+`plan_path` là thuật toán của RecommendationService.get_personalized_path
+(skill gap -> ứng viên -> chấm điểm -> sắp theo rank tô-pô), tách ra thành hàm
+thuần trên CourseSkillIndex để chạy được ở tiến trình khác. `plan_paths` chạy
+nó cho một lô người dùng (email tổng hợp hằng đêm, tính sẵn trang chủ): mọi
+người dùng dùng chung một chỉ mục ứng viên; với `workers` > 1 lô được chia
+thành các phần gửi tới pool tiến trình, mỗi tiến trình nhận chỉ mục và trọng
+số một lần qua initializer thay vì theo từng phần.
+
+Module này không import app.services.recommendation để tiến trình con không
+phải tải model.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.core import config
+from app.core.metrics import span
+from app.schemas.user import PathRequest
+from app.services.path_scorer import PathScorer, ScoringWeights
+from app.services.skill_index import CourseSkillIndex
+from app.services.topk import lex_top_k
+
+# Số người dùng trong mỗi phần gửi tới một tiến trình con
+CHUNK_SIZE = 256
+
+
+def plan_path(
+    index: CourseSkillIndex,
+    scorer: PathScorer,
+    known_skill_ids: Set[int],
+    target_skill_ids: Set[int],
+    learning_style: Optional[str] = None,
+    length: int = config.PATH_LENGTH,
+) -> List[int]:
+    """ID các khóa học của lộ trình, theo thứ tự học."""
+    # 1. Skill gap: kỹ năng mục tiêu người dùng chưa biết
+    skill_gap_ids = target_skill_ids - known_skill_ids
+    if not skill_gap_ids:
+        return []
+
+    # 2. Ứng viên: khóa học dạy ít nhất một kỹ năng trong skill gap (posting list),
+    # trừ các khóa học mà người dùng đã biết TẤT CẢ kỹ năng
+    with span("path.candidates"):
+        candidate_rows = index.candidates(skill_gap_ids)
+        if candidate_rows.size:
+            keep = ~index.knows_all(candidate_rows, index.skill_mask(known_skill_ids))
+            candidate_rows = candidate_rows[keep]
+    if candidate_rows.size == 0:
+        return []
+
+    # 3. Chấm điểm toàn bộ ứng viên theo cột (xem app/services/path_scorer.py)
+    with span("path.scoring"):
+        scores = scorer.score(
+            gap_overlap=index.overlap_counts(
+                candidate_rows, index.skill_mask(skill_gap_ids)
+            ),
+            difficulty_codes=index.difficulty_codes[candidate_rows],
+            format_codes=index.format_codes[candidate_rows],
+            rating=index.rating[candidate_rows],
+            learning_style=learning_style,
+        )
+
+    # 4. Khóa học có rank tô-pô thấp hơn (chứa các skill cơ bản) đứng trước, sau
+    # đó mới đến điểm cao; không có đồ thị thì ưu tiên độ khó thấp
+    with span("path.reorder"):
+        if index.course_topo_rank is not None:
+            primary = index.course_topo_rank[candidate_rows]
+        else:
+            primary = index.difficulty_codes[candidate_rows]
+        order = lex_top_k((primary, -scores), length)
+        return index.course_ids[candidate_rows[order]].tolist()
+
+
+# Trạng thái của tiến trình con, gán một lần bởi _init_worker
+_worker_index: Optional[CourseSkillIndex] = None
+_worker_scorer: Optional[PathScorer] = None
+
+
+def _init_worker(index: CourseSkillIndex, weights: ScoringWeights):
+    global _worker_index, _worker_scorer
+    _worker_index = index
+    _worker_scorer = PathScorer(weights)
+
+
+def _plan_chunk(
+    requests: Sequence[PathRequest], length: int
+) -> List[Tuple[int, List[int]]]:
+    return [
+        (
+            request.user_id,
+            plan_path(
+                _worker_index,
+                _worker_scorer,
+                request.known_skill_ids,
+                request.target_skill_ids,
+                request.learning_style,
+                length,
+            ),
+        )
+        for request in requests
+    ]
+
+
+def path_executor(
+    index: CourseSkillIndex, scorer: PathScorer, workers: int
+) -> ProcessPoolExecutor:
+    """
+    Pool tiến trình cho plan_paths, dùng lại được qua nhiều lô. Dùng "spawn"
+    như pool băm mật khẩu vì tiến trình gọi có thể đang chạy thread nền.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(index, scorer.weights),
+    )
+
+
+def plan_paths(
+    index: CourseSkillIndex,
+    scorer: PathScorer,
+    requests: Iterable[PathRequest],
+    workers: int = 0,
+    length: int = config.PATH_LENGTH,
+    executor: Optional[ProcessPoolExecutor] = None,
+) -> Dict[int, List[int]]:
+    """
+    Lộ trình của nhiều người dùng: {user_id: [course_id, ...]}. `executor` (từ
+    path_executor, đã mang đúng `index`) được ưu tiên hơn việc tạo pool
+    `workers` tiến trình cho riêng lần gọi này.
+    """
+    requests = list(requests)
+    if executor is None and (workers <= 1 or len(requests) <= CHUNK_SIZE):
+        return {
+            request.user_id: plan_path(
+                index,
+                scorer,
+                request.known_skill_ids,
+                request.target_skill_ids,
+                request.learning_style,
+                length,
+            )
+            for request in requests
+        }
+
+    chunks = [
+        requests[start : start + CHUNK_SIZE]
+        for start in range(0, len(requests), CHUNK_SIZE)
+    ]
+    own_executor = executor is None
+    if own_executor:
+        executor = path_executor(index, scorer, min(workers, len(chunks)))
+    try:
+        paths: Dict[int, List[int]] = {}
+        for result in executor.map(_plan_chunk, chunks, [length] * len(chunks)):
+            paths.update(result)
+        return paths
+    finally:
+        if own_executor:
+            executor.shutdown()
@@ -0,0 +1,111 @@
+"""
+Registry các phiên bản model dưới MODEL_REGISTRY_DIR (mặc định /models/registry).
+
+    registry/
+      manifest.json          {"active": "...", "history": [...], "versions": {...}}
+      20261018-093000/       một thư mục artifact đầy đủ (cùng tên file như
+      20261019-101500/       /models: cosine_sim_matrix.joblib, tfidf_*, mmap/...)
+
+`history` là danh sách các phiên bản đã lần lượt được kích hoạt; phiên bản
+đang chạy là phần tử cuối. Rollback bỏ phần tử cuối và quay về phiên bản
+trước đó. Manifest được ghi bằng file tạm + os.replace nên tiến trình đọc
+không bao giờ thấy file ghi dở.
+
+Khi chưa có manifest, service dùng thẳng các file trong MODEL_DIR như trước.
+"""
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional
+
+MANIFEST_FILE = "manifest.json"
+
+
+class ModelRegistry:
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest_path = os.path.join(path, MANIFEST_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def read(self) -> Dict:
+        if not self.exists():
+            return {"active": None, "history": [], "versions": {}}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, manifest: Dict):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def active_version(self) -> Optional[str]:
+        return self.read().get("active")
+
+    def versions(self) -> List[str]:
+        return sorted(self.read()["versions"])
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.path, version)
+
+    def publish(
+        self, source_dir: str, version: Optional[str] = None, activate: bool = True
+    ) -> str:
+        """Sao chép một thư mục artifact vào registry thành phiên bản mới."""
+        version = version or time.strftime("%Y%m%d-%H%M%S")
+        manifest = self.read()
+        if version in manifest["versions"]:
+            raise ValueError(f"Phiên bản '{version}' đã tồn tại trong registry.")
+        target = self.version_dir(version)
+        # Sao chép vào thư mục tạm rồi đổi tên, để watcher không thấy phiên bản dở dang
+        staging = f"{target}.staging"
+        # Thư mục tạm còn sót lại từ một lần publish bị ngắt giữa chừng
+        if os.path.exists(staging):
+            shutil.rmtree(staging)
+        shutil.copytree(source_dir, staging, ignore=self._skip_registry)
+        os.replace(staging, target)
+
+        manifest["versions"][version] = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "source": os.path.abspath(source_dir),
+        }
+        if activate:
+            manifest["history"].append(version)
+            manifest["active"] = version
+        self._write(manifest)
+        return version
+
+    def _skip_registry(self, directory: str, names: List[str]) -> List[str]:
+        """
+        Bỏ qua chính thư mục registry khi nó nằm trong source_dir (mặc định
+        /models/registry nằm trong /models), để không tự sao chép vào chính nó.
+        """
+        registry = os.path.realpath(self.path)
+        return [
+            name
+            for name in names
+            if os.path.realpath(os.path.join(directory, name)) == registry
+        ]
+
+    def activate(self, version: str):
+        manifest = self.read()
+        if version not in manifest["versions"]:
+            raise ValueError(f"Không có phiên bản '{version}' trong registry.")
+        if manifest.get("active") != version:
+            manifest["history"].append(version)
+            manifest["active"] = version
+            self._write(manifest)
+
+    def rollback(self) -> str:
+        """Quay về phiên bản được kích hoạt trước phiên bản hiện tại."""
+        manifest = self.read()
+        if len(manifest["history"]) < 2:
+            raise ValueError("Không có phiên bản trước đó để rollback.")
+        manifest["history"].pop()
+        manifest["active"] = manifest["history"][-1]
+        self._write(manifest)
+        return manifest["active"]
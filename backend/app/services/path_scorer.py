@@ -0,0 +1,84 @@
+"""
+Bộ chấm điểm theo cột cho lộ trình cá nhân hóa.
+
+Thay vòng lặp tạo một dict cho mỗi khóa học ứng viên, các đặc trưng được giữ
+dưới dạng mảng NumPy (mã độ khó, mã định dạng, rating, số kỹ năng trùng với
+skill gap) và điểm của toàn bộ ứng viên được tính trong một lượt.
+"""
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.core import config
+
+# Mã độ khó trùng với thứ tự ưu tiên khi sắp xếp (beginner trước, advanced sau);
+# giá trị lạ được xếp cuối cùng
+DIFFICULTY_CODES = {"beginner": 0, "intermediate": 1, "mixed": 2, "advanced": 3}
+UNKNOWN_DIFFICULTY = len(DIFFICULTY_CODES)
+
+FORMAT_CODES = {"video_heavy": 0, "text_heavy": 1, "project_based": 2, "mixed": 3}
+UNKNOWN_FORMAT = len(FORMAT_CODES)
+
+# Định nghĩa các mapping giữa phong cách học và định dạng khóa học
+STYLE_FORMAT_MAPPING = {
+    "visual": "video_heavy",
+    "read_write": "text_heavy",
+    "kinesthetic": "project_based",
+}
+
+
+def encode(values: Iterable[Optional[str]], codes: dict, unknown: int) -> np.ndarray:
+    """Mã hóa một cột chuỗi thành mảng int8 theo bảng `codes`."""
+    return np.array([codes.get(v, unknown) for v in values], dtype=np.int8)
+
+
+class ScoringWeights:
+    """Trọng số chấm điểm, mặc định lấy từ biến môi trường (xem app/core/config.py)."""
+
+    def __init__(
+        self,
+        gap_skill: float = config.PATH_WEIGHT_GAP_SKILL,
+        beginner: float = config.PATH_WEIGHT_BEGINNER,
+        intermediate: float = config.PATH_WEIGHT_INTERMEDIATE,
+        rating: float = config.PATH_WEIGHT_RATING,
+        learning_style: float = config.PATH_WEIGHT_LEARNING_STYLE,
+    ):
+        self.gap_skill = gap_skill
+        self.beginner = beginner
+        self.intermediate = intermediate
+        self.rating = rating
+        self.learning_style = learning_style
+
+
+class PathScorer:
+    def __init__(self, weights: Optional[ScoringWeights] = None):
+        self.weights = weights or ScoringWeights()
+        # Bảng tra điểm thưởng theo mã độ khó
+        self.difficulty_bonus = np.zeros(UNKNOWN_DIFFICULTY + 1, dtype=np.float64)
+        self.difficulty_bonus[DIFFICULTY_CODES["beginner"]] = self.weights.beginner
+        self.difficulty_bonus[DIFFICULTY_CODES["intermediate"]] = self.weights.intermediate
+
+    def score(
+        self,
+        gap_overlap: np.ndarray,
+        difficulty_codes: np.ndarray,
+        format_codes: np.ndarray,
+        rating: np.ndarray,
+        learning_style: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Tính điểm cho tất cả ứng viên:
+          - Tiêu chí 1: số kỹ năng trong skill gap mà khóa học dạy được;
+          - Tiêu chí 2: ưu tiên khóa học "beginner", sau đó "intermediate";
+          - Tiêu chí 3 (phụ): rating của khóa học;
+          - Thưởng khi định dạng khóa học hợp với phong cách học của người dùng.
+        """
+        w = self.weights
+        scores = gap_overlap * w.gap_skill
+        scores = scores + self.difficulty_bonus[difficulty_codes]
+        scores += rating * w.rating
+
+        preferred_format = STYLE_FORMAT_MAPPING.get(learning_style)
+        if preferred_format:
+            scores += (format_codes == FORMAT_CODES[preferred_format]) * w.learning_style
+        return scores
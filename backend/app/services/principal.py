@@ -0,0 +1,89 @@
+"""
+Cache "principal" (thông tin người dùng cần cho việc xác thực) theo user id
+lấy từ claim `sub` của JWT.
+
+Khi cache hit, xác thực một request không tốn truy vấn CSDL nào. Principal là
+một đối tượng thường (không phải ORM) nên dùng chung được giữa các request và
+session; endpoint nào cần đối tượng ORM để ghi quan hệ (ví dụ khảo sát) vẫn
+tải User theo khóa chính.
+
+Mục cache bị xóa sau khi một session trong tiến trình commit thay đổi User
+hoặc UserProfile. Cache nằm trong từng worker nên thay đổi từ worker khác chỉ
+được thấy sau tối đa PRINCIPAL_CACHE_TTL_SECONDS giây; giữ TTL ngắn.
+"""
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.db import models
+from app.services.cache import InMemoryLRUCache
+
+
+class Principal:
+    """Ảnh chụp các trường của User (và profile) mà các endpoint cần."""
+
+    __slots__ = ("id", "email", "is_active", "learning_style")
+
+    def __init__(
+        self, id: int, email: str, is_active: bool, learning_style: Optional[str]
+    ):
+        self.id = id
+        self.email = email
+        self.is_active = is_active
+        self.learning_style = learning_style
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        """`user.profile` phải đã được tải (hoặc session cho phép lazy-load)."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=bool(user.is_active),
+            learning_style=user.profile.learning_style if user.profile else None,
+        )
+
+
+class PrincipalCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.backend = InMemoryLRUCache(max_size=max_size, ttl=ttl)
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        return self.backend.get(str(user_id))
+
+    def set(self, principal: Principal):
+        self.backend.set(str(principal.id), principal)
+
+    def invalidate(self, user_id: int):
+        self.invalidations += 1
+        self.backend.delete(str(user_id))
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.backend.stats(), "invalidations": self.invalidations}
+
+
+principal_cache = PrincipalCache(
+    max_size=config.PRINCIPAL_CACHE_MAX_SIZE, ttl=config.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_user_write(session, flush_context):
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, models.User):
+            session.info.setdefault("changed_user_ids", set()).add(obj.id)
+        elif isinstance(obj, models.UserProfile):
+            session.info.setdefault("changed_user_ids", set()).add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_user_commit(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_user_write(session):
+    session.info.pop("changed_user_ids", None)
@@ -1,289 +1,658 @@
 import joblib
-import pandas as pd
+import logging
+import numpy as np
 import os
-from typing import List
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from scipy import sparse
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
+from app.core import config
+from app.core.metrics import span
 from app.db import models
+from app.schemas.user import PathRequest
+from app.services import artifacts, similarity
+from app.services.ann import IVFIndex
+from app.services.cache import user_cache
+from app.services.catalog_update import CatalogSync, CatalogUpdate, CatalogUpdater
+from app.services.graph_view import GraphView
+from app.services.id_index import CourseIdIndex, course_ids_array
+from app.services.learning_path import plan_path, plan_paths
+from app.services.model_registry import ModelRegistry
+from app.services.path_scorer import PathScorer
+from app.services.skill_index import CourseSkillIndex, SkillIndexManager, register
+from app.services.topo_rank import TopoTable
 import networkx as nx
 
+logger = logging.getLogger(__name__)
+
+
+class ModelBundle:
+    """
+    Một phiên bản model đã tải đầy đủ. Bundle không bị sửa sau khi tạo: nạp
+    phiên bản mới hay cập nhật catalog đều tạo bundle mới rồi hoán đổi tham
+    chiếu `RecommendationService._model`, nên một request đã lấy bundle sẽ chạy
+    trọn vẹn trên phiên bản đó.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        similarity,
+        course_ids: Optional[np.ndarray],
+        skill_graph: Optional[nx.DiGraph],
+        topo_table: Optional[TopoTable],
+        catalog_updater: Optional[CatalogUpdater] = None,
+        graph_view: Optional[GraphView] = None,
+        course_index: Optional[CourseIdIndex] = None,
+    ):
+        self.version = version
+        self.similarity = similarity
+        # Mảng index -> course_id (int32 nếu vừa) và bảng tra course_id -> index
+        if course_ids is not None:
+            course_ids = course_ids_array(course_ids)
+        self.course_ids = course_ids
+        if course_index is None:
+            course_index = CourseIdIndex(
+                course_ids if course_ids is not None else np.empty(0, dtype=np.int32)
+            )
+        self.course_index = course_index
+        self.skill_graph = skill_graph
+        self.topo_table = topo_table
+        # Payload JSON/nén và ma trận kề của đồ thị, dựng một lần cho phiên bản này
+        if graph_view is None and skill_graph:
+            graph_view = GraphView(skill_graph, version)
+        self.graph_view = graph_view
+        self.catalog_updater = catalog_updater
+        self.catalog_sync: Optional[CatalogSync] = None
+
+    def with_catalog_update(self, update: CatalogUpdate) -> "ModelBundle":
+        """Bundle mới cùng phiên bản, mang backend và course_ids đã cập nhật."""
+        bundle = ModelBundle(
+            self.version,
+            update.backend,
+            update.course_ids,
+            self.skill_graph,
+            self.topo_table,
+            self.catalog_updater,
+            self.graph_view,
+        )
+        bundle.catalog_sync = self.catalog_sync
+        return bundle
 
-class RecommendationService:
-    def __init__(self):
+
+class ModelLoader:
+    """Tải các artifact trong một thư mục model thành một ModelBundle."""
+
+    def __init__(self, model_dir: str, mmap_dir: str):
         # Đường dẫn tới các file model BÊN TRONG container
         # Nhớ rằng chúng ta đã mount 'ml/models' vào '/models' trong docker-compose
-        self.model_dir = "/models"
+        self.model_dir = model_dir
+        self.mmap_dir = mmap_dir
         self.cosine_sim_path = os.path.join(self.model_dir, "cosine_sim_matrix.joblib")
+        self.tfidf_matrix_path = os.path.join(self.model_dir, "tfidf_matrix.npz")
+        self.topk_neighbors_path = os.path.join(self.model_dir, "topk_neighbors.npz")
+        self.ann_index_path = os.path.join(self.model_dir, "ann_index.npz")
         self.course_data_path = os.path.join(
             self.model_dir, "course_data_for_recommendation.csv"
         )
-
-        # Tải model và dữ liệu
-        self.cosine_sim_matrix = self._load_model(self.cosine_sim_path)
-        self.course_data = self._load_data(self.course_data_path)
         self.skill_graph_path = os.path.join(
             self.model_dir, "skill_dependency_graph.joblib"
         )
-        self.skill_graph = self._load_model(self.skill_graph_path)
-        if self.skill_graph:
-            print("Đồ thị Phụ thuộc Kỹ năng đã được tải thành công.")
+        self.vectorizer_path = os.path.join(self.model_dir, "tfidf_vectorizer.joblib")
 
-        # Tạo một series để mapping từ course_id -> index của DataFrame
-        self.indices = pd.Series(
-            self.course_data.index, index=self.course_data["id"]
-        ).drop_duplicates()
+    def load(self, version: str) -> ModelBundle:
+        # Tải model và dữ liệu
+        self.similarity = None
+        self.course_ids = None
+        self.course_index = None
+        self.skill_graph = None
+        self.topo_table = None
+        self.vectorizer = None
+        # Thời gian tải (giây) của từng artifact
+        self.timings: Dict[str, float] = {}
+        if config.ARTIFACT_FORMAT == "mmap":
+            self._timed("mmap", lambda: self._load_mmap_artifacts(self.mmap_dir))
+        else:
+            # Các file độc lập với nhau được đọc song song (joblib/numpy nhả GIL
+            # khi đọc đĩa và giải nén)
+            tasks = {
+                "similarity": lambda: self._load_similarity(config.SIMILARITY_MODE),
+                "course_data": lambda: self._load_data(self.course_data_path),
+                "skill_graph": lambda: self._load_model(self.skill_graph_path),
+            }
+            if config.CATALOG_SYNC_ENABLED:
+                tasks["vectorizer"] = lambda: self._load_model(self.vectorizer_path)
+            results = self._load_parallel(tasks)
+            self.similarity = results["similarity"]
+            course_data = results["course_data"]
+            # Mảng index -> course_id, dùng để trả kết quả trực tiếp từ mảng
+            self.course_ids = (
+                course_data["id"].to_numpy() if course_data is not None else None
+            )
+            self.skill_graph = results["skill_graph"]
+            self.vectorizer = results.get("vectorizer")
+        if self.skill_graph:
+            logger.info("Đồ thị Phụ thuộc Kỹ năng đã được tải thành công.")
+        if self.topo_table is None:
+            self.topo_table = self._timed("topo_table", self._load_topo_table)
+
+        return ModelBundle(
+            version,
+            self.similarity,
+            self.course_ids,
+            self.skill_graph,
+            self.topo_table,
+            # Đưa khóa học mới/thay đổi vào model gợi ý mà không cần huấn luyện lại
+            (
+                self._timed("catalog_updater", self._load_catalog_updater)
+                if config.CATALOG_SYNC_ENABLED
+                else None
+            ),
+            course_index=self.course_index,
+        )
 
-        print("RecommendationService đã được khởi tạo và tải model thành công.")
+    def _timed(self, name: str, load: Callable):
+        start = time.perf_counter()
+        try:
+            return load()
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def _load_parallel(self, tasks: Dict[str, Callable]) -> Dict:
+        """Chạy các hàm tải trên MODEL_LOAD_WORKERS luồng; lỗi được ném lại."""
+        workers = min(config.MODEL_LOAD_WORKERS, len(tasks))
+        if workers <= 1:
+            return {name: self._timed(name, load) for name, load in tasks.items()}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-load") as pool:
+            futures = {
+                name: pool.submit(self._timed, name, load) for name, load in tasks.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
 
     def _load_model(self, path):
         """Tải file joblib."""
         try:
             return joblib.load(path)
         except FileNotFoundError:
-            print(
-                f"LỖI: Không tìm thấy file model tại '{path}'. Hãy chắc chắn bạn đã mount volume đúng."
+            logger.error(
+                f"Không tìm thấy file model tại '{path}'. Hãy chắc chắn bạn đã mount volume đúng."
             )
             return None
 
+    def _load_mmap_artifacts(self, path: str):
+        """Mở các artifact .npy bằng mmap (xem app/services/artifacts.py)."""
+        try:
+            store = artifacts.MmapArtifacts(path)
+            self.course_ids = store.course_ids()
+            self.course_index = store.course_index()
+            self.similarity = store.similarity(config.SIMILARITY_MODE)
+            self.skill_graph = store.skill_graph()
+            self.topo_table = store.topo_table()
+        except FileNotFoundError as e:
+            logger.error(f"Không tìm thấy artifact mmap: {e}")
+            return
+        logger.info(f"Đã mở artifact mmap tại '{path}' ({self.similarity.mode}).")
+
+    def _load_catalog_updater(self) -> Optional[CatalogUpdater]:
+        """Cần vectorizer và ma trận TF-IDF đã huấn luyện; thiếu thì bỏ qua."""
+        if self.course_ids is None:
+            return None
+        vectorizer = self.vectorizer or self._load_model(self.vectorizer_path)
+        if vectorizer is None:
+            return None
+        try:
+            if isinstance(self.similarity, similarity.SparseSimilarity):
+                tfidf_matrix = self.similarity.matrix
+            elif config.ARTIFACT_FORMAT == "mmap":
+                tfidf_matrix = artifacts.MmapArtifacts(self.mmap_dir).tfidf_matrix()
+            else:
+                tfidf_matrix = sparse.load_npz(self.tfidf_matrix_path)
+        except FileNotFoundError as e:
+            logger.warning(f"Không có ma trận TF-IDF, tắt cập nhật catalog: {e}")
+            return None
+        expected = (len(self.course_ids), len(vectorizer.vocabulary_))
+        if tfidf_matrix.shape != expected:
+            logger.warning(
+                f"Ma trận TF-IDF {tfidf_matrix.shape} không khớp với "
+                f"vectorizer/dữ liệu khóa học {expected}, tắt cập nhật catalog."
+            )
+            return None
+        return CatalogUpdater(
+            vectorizer,
+            tfidf_matrix,
+            self.course_ids,
+            oov_threshold=config.CATALOG_DRIFT_OOV_THRESHOLD,
+            max_delta_fraction=config.CATALOG_MAX_DELTA_FRACTION,
+        )
+
+    def _load_topo_table(self):
+        """
+        Tính bảng rank tô-pô từ đồ thị kỹ năng vừa tải (cùng cách với
+        write_artifacts cho định dạng mmap). Trả về None nếu không có đồ thị.
+        """
+        if not self.skill_graph:
+            return None
+        try:
+            return TopoTable.from_graph(self.skill_graph)
+        except nx.NetworkXUnfeasible:
+            logger.warning(
+                "Không thể sắp xếp tô-pô (có thể có vòng lặp trong đồ thị). Bỏ qua bước này."
+            )
+            return None
+
+    def _load_similarity(self, mode: str):
+        """Tải backend tính độ tương đồng theo chế độ được cấu hình."""
+        if mode not in similarity.MODES:
+            raise ValueError(
+                f"SIMILARITY_MODE không hợp lệ: '{mode}'. Chọn một trong {similarity.MODES}."
+            )
+
+        try:
+            if mode == similarity.SPARSE:
+                backend = similarity.SparseSimilarity(
+                    sparse.load_npz(self.tfidf_matrix_path)
+                )
+            elif mode == similarity.ANN:
+                backend = IVFIndex.load(
+                    self.ann_index_path,
+                    n_probe=config.ANN_N_PROBE,
+                    rerank=config.ANN_RERANK,
+                    tfidf_matrix=(
+                        sparse.load_npz(self.tfidf_matrix_path)
+                        if config.ANN_RERANK
+                        else None
+                    ),
+                )
+            elif mode == similarity.TOPK:
+                with np.load(self.topk_neighbors_path) as table:
+                    scores = table["scores"]
+                    if config.SCORE_DTYPE:
+                        scores = similarity.encode_scores(scores, config.SCORE_DTYPE)
+                    backend = similarity.TopKNeighborSimilarity(
+                        table["neighbors"].astype(np.int32, copy=False), scores
+                    )
+            else:
+                matrix = self._load_model(self.cosine_sim_path)
+                if matrix is None:
+                    return None
+                if config.SCORE_DTYPE:
+                    matrix = similarity.encode_scores(matrix, config.SCORE_DTYPE)
+                backend = similarity.DenseSimilarity(matrix)
+        except FileNotFoundError as e:
+            logger.error(f"Không tìm thấy file model cho chế độ '{mode}': {e}")
+            return None
+
+        logger.info(
+            f"Chế độ tương đồng '{mode}': {backend.n_items} khóa học, "
+            f"{backend.nbytes / 1024 ** 2:.1f} MB."
+        )
+        return backend
+
     def _load_data(self, path):
         """Tải file CSV dữ liệu khóa học."""
+        # Import tại chỗ: pandas chỉ cần khi tải model (luồng nền lúc khởi động)
+        import pandas as pd
+
         try:
             return pd.read_csv(path)
         except FileNotFoundError:
-            print(f"LỖI: Không tìm thấy file dữ liệu khóa học tại '{path}'.")
+            logger.error(f"Không tìm thấy file dữ liệu khóa học tại '{path}'.")
             return None
 
-    def get_recommendations(
-        self, course_id: int, num_recommendations: int = 10
-    ) -> List[int]:
-        """
-        Lấy danh sách các ID khóa học tương tự.
-        """
-        if self.cosine_sim_matrix is None or self.course_data is None:
-            return []
 
-        if course_id not in self.indices:
-            # Nếu course_id không có trong dữ liệu huấn luyện, không thể gợi ý
-            return []
+class RecommendationService:
+    def __init__(self):
+        # Registry phiên bản model; nếu chưa có manifest thì dùng thẳng MODEL_DIR
+        self.registry = ModelRegistry(config.MODEL_REGISTRY_DIR)
+        self._swap_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self.model_stats: Dict = {
+            "loads": 0,
+            "failed_loads": 0,
+            "last_load_seconds": None,
+            "loaded_at": None,
+            "last_error": None,
+            "failed_version": None,
+            "artifact_seconds": {},
+        }
+
+        # Model được tải khi gọi load() (lifespan của app, xem app/core/startup.py)
+        # hoặc ở lần truy cập đầu tiên, không phải lúc import module
+        self._bundle: Optional[ModelBundle] = None
+        self._load_lock = threading.Lock()
+
+        # Chỉ mục khóa học-kỹ năng dùng cho lộ trình cá nhân hóa, dựng từ CSDL;
+        # bảng rank tô-pô được gán khi model tải xong (_swap)
+        self.skill_index = register(
+            SkillIndexManager(
+                refresh_seconds=config.SKILL_INDEX_REFRESH_SECONDS,
+                wait_for_model=lambda: self._model,
+            )
+        )
+        # Catalog đổi thì mọi lộ trình đã cache đều cũ
+        self.skill_index.on_rebuild.append(lambda index: user_cache.bump_all())
+        self.skill_index.on_rebuild.append(self._schedule_catalog_sync)
+        self.path_scorer = PathScorer()
 
-        # 1. Lấy index của DataFrame tương ứng với course_id
-        idx = self.indices[course_id]
+    def load(self) -> ModelBundle:
+        """
+        Tải phiên bản model active (một lần). Các luồng gọi đồng thời chờ lần
+        tải đang chạy thay vì tải lại.
+        """
+        with self._load_lock:
+            if self._bundle is None:
+                version = (
+                    self.registry.active_version() if self.registry.exists() else None
+                )
+                self._swap(self._load_bundle(version))
+                logger.info("RecommendationService đã tải model thành công.")
+            return self._bundle
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._bundle is not None
+
+    @property
+    def _model(self) -> ModelBundle:
+        """Bundle đang chạy; nếu chưa tải thì tải (hoặc chờ lần tải đang chạy)."""
+        bundle = self._bundle
+        return bundle if bundle is not None else self.load()
+
+    # Các thuộc tính của phiên bản model đang chạy
+    @property
+    def model_version(self) -> str:
+        return self._model.version
+
+    @property
+    def similarity(self):
+        return self._model.similarity
+
+    @property
+    def course_ids(self) -> Optional[np.ndarray]:
+        return self._model.course_ids
+
+    @property
+    def course_index(self) -> CourseIdIndex:
+        return self._model.course_index
+
+    @property
+    def skill_graph(self) -> Optional[nx.DiGraph]:
+        return self._model.skill_graph
+
+    @property
+    def graph_view(self) -> Optional[GraphView]:
+        return self._model.graph_view
+
+    @property
+    def topo_table(self) -> Optional[TopoTable]:
+        return self._model.topo_table
+
+    def _load_bundle(self, version: Optional[str]) -> ModelBundle:
+        """Tải một phiên bản trong registry (hoặc MODEL_DIR nếu version là None)."""
+        start = time.perf_counter()
+        if version is None:
+            loader = ModelLoader(config.MODEL_DIR, config.MMAP_ARTIFACT_DIR)
+        else:
+            version_dir = self.registry.version_dir(version)
+            loader = ModelLoader(version_dir, os.path.join(version_dir, "mmap"))
+        bundle = loader.load(version or "base")
+        if bundle.catalog_updater is not None:
+            sync = CatalogSync(
+                bundle.catalog_updater,
+                lambda: self._model.similarity,
+                lambda update: self._apply_catalog_update(sync, update),
+            )
+            bundle.catalog_sync = sync
+        self.model_stats["loads"] += 1
+        self.model_stats["last_load_seconds"] = round(time.perf_counter() - start, 3)
+        self.model_stats["artifact_seconds"] = loader.timings
+        self.model_stats["loaded_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return bundle
+
+    def _swap(self, bundle: ModelBundle):
+        """Hoán đổi tham chiếu; request đang chạy vẫn giữ bundle cũ tới khi xong."""
+        with self._swap_lock:
+            self._bundle = bundle
+        # Đồ thị/bảng rank có thể đã đổi; việc dựng lại chỉ mục cũng vô hiệu hóa
+        # cache lộ trình và đồng bộ catalog cho bundle mới
+        self.skill_index.set_topo_table(bundle.topo_table)
+        logger.info(f"Đang dùng model phiên bản '{bundle.version}'.")
+
+    def reload(self, version: Optional[str] = None, background: bool = True) -> bool:
+        """
+        Tải phiên bản `version` (mặc định: phiên bản active trong manifest) rồi
+        hoán đổi vào. Trả về False nếu đang có một lần tải khác chạy.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
 
-        # 2. Lấy điểm tương đồng của khóa học này với tất cả các khóa học khác
-        sim_scores = list(enumerate(self.cosine_sim_matrix[idx]))
+        def run():
+            target = version
+            try:
+                target = target or self.registry.active_version()
+                if target is None:
+                    raise ValueError("Registry chưa có phiên bản active.")
+                bundle = self._load_bundle(target)
+                if bundle.similarity is None or bundle.course_ids is None:
+                    raise ValueError(f"Phiên bản '{target}' thiếu artifact bắt buộc.")
+                self._swap(bundle)
+                self.model_stats["last_error"] = None
+                self.model_stats["failed_version"] = None
+            except Exception as e:
+                # Giữ nguyên phiên bản đang chạy nếu phiên bản mới lỗi
+                self.model_stats["failed_loads"] += 1
+                self.model_stats["last_error"] = str(e)
+                self.model_stats["failed_version"] = target
+                logger.error(f"Không thể tải model phiên bản '{target}': {e}")
+            finally:
+                self._reload_lock.release()
+
+        if background:
+            threading.Thread(target=run, daemon=True).start()
+        else:
+            run()
+        return True
+
+    def start_watcher(self, interval: float):
+        """Định kỳ đọc manifest và tải phiên bản active mới khi nó thay đổi."""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    active = self.registry.active_version()
+                except (OSError, ValueError) as e:
+                    logger.error(f"Không đọc được manifest model: {e}")
+                    continue
+                # Không thử lại một phiên bản vừa nạp lỗi cho tới khi manifest đổi
+                if active not in (
+                    None,
+                    self._model.version,
+                    self.model_stats["failed_version"],
+                ):
+                    self.reload(active, background=False)
+
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+
+    def model_info(self) -> Dict:
+        model = self._model
+        return {
+            "active_version": model.version,
+            "registry_active_version": (
+                self.registry.active_version() if self.registry.exists() else None
+            ),
+            "similarity_mode": model.similarity.mode if model.similarity else None,
+            "n_courses": len(model.course_ids) if model.course_ids is not None else 0,
+            **self.model_stats,
+        }
+
+    def _schedule_catalog_sync(self, index):
+        sync = self._model.catalog_sync
+        if sync is not None:
+            sync.schedule(index)
+
+    def _apply_catalog_update(self, sync: CatalogSync, update: CatalogUpdate):
+        """
+        Hoán đổi bundle mang backend và course_ids mới vào service. Kết quả bị
+        bỏ qua nếu trong lúc đồng bộ đã có phiên bản model khác được nạp.
+        """
+        with self._swap_lock:
+            if self._bundle.catalog_sync is not sync:
+                return
+            self._bundle = self._bundle.with_catalog_update(update)
+        if update.refit:
+            logger.info(
+                f"Đã thay model gợi ý sau khi fit lại: {len(update.course_ids)} "
+                f"khóa học (+{update.added} mới)."
+            )
+        else:
+            logger.info(
+                f"Đã cập nhật model gợi ý: +{update.added} khóa học mới, "
+                f"{update.changed} khóa học thay đổi."
+            )
 
-        # 3. Sắp xếp các khóa học dựa trên điểm tương đồng (giảm dần)
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+    def get_similar_courses(
+        self, course_id: int, num_recommendations: int = 10
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lấy các khóa học tương tự dưới dạng mảng (course_ids, scores),
+        đã sắp xếp giảm dần theo điểm tương đồng.
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        # Lấy bundle một lần: cả request dùng cùng một phiên bản model
+        model = self._model
+        if model.similarity is None or model.course_ids is None:
+            return empty
+
+        # 1. Lấy index (hàng của model) tương ứng với course_id
+        idx = model.course_index.row(course_id)
+        if idx < 0:
+            # Nếu course_id không có trong dữ liệu huấn luyện, không thể gợi ý
+            return empty
 
-        # 4. Lấy điểm của top N khóa học tương tự nhất
-        # Bắt đầu từ 1 để bỏ qua chính nó (vì một khóa học luôn tương tự nhất với chính nó)
-        sim_scores = sim_scores[1 : num_recommendations + 1]
+        # 2. Chọn top-N láng giềng, loại chính nó theo index
+        top_indices, top_scores = model.similarity.top(idx, num_recommendations)
 
-        # 5. Lấy index của các khóa học được gợi ý
-        course_indices = [i[0] for i in sim_scores]
+        # 3. Ánh xạ index -> course_id trực tiếp trên mảng
+        return model.course_ids[top_indices], top_scores
 
-        # 6. Trả về list các `id` của các khóa học đó
-        recommended_course_ids = self.course_data["id"].iloc[course_indices].tolist()
+    def get_similar_courses_many(
+        self, course_ids: Sequence[int], num_recommendations: int = 10
+    ) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Phiên bản theo lô của get_similar_courses: các hàng của mọi khóa học
+        được chấm trong cùng một phép toán ma trận của backend tương đồng.
+        Khóa học không có trong dữ liệu huấn luyện bị bỏ qua trong kết quả.
+        """
+        model = self._model
+        if model.similarity is None or model.course_ids is None:
+            return {}
+
+        wanted = np.asarray(list(dict.fromkeys(course_ids)), dtype=np.int64)
+        rows = model.course_index.rows(wanted)
+        found = rows >= 0
+        if not found.any():
+            return {}
+        results = model.similarity.top_many(rows[found], num_recommendations)
+        return {
+            int(course_id): (model.course_ids[top_indices], top_scores)
+            for course_id, (top_indices, top_scores) in zip(wanted[found], results)
+        }
 
-        return recommended_course_ids
+    def get_recommendations(
+        self, course_id: int, num_recommendations: int = 10
+    ) -> List[int]:
+        """
+        Lấy danh sách các ID khóa học tương tự.
+        """
+        course_ids, _ = self.get_similar_courses(course_id, num_recommendations)
+        return course_ids.tolist()
 
     def get_personalized_path(
-        self, user: models.User, known_skill_ids: set, db: Session
+        self,
+        user: models.User,
+        known_skill_ids: set,
+        db: Optional[Session] = None,
+        target_skill_ids: Optional[set] = None,
+        index: Optional[CourseSkillIndex] = None,
+        learning_style: Optional[str] = None,
     ) -> List[int]:
         """
         Tạo một lộ trình học tập cá nhân hóa dựa trên skill gap của người dùng.
+        `user` có thể là User hoặc Principal. `target_skill_ids` và
+        `learning_style` được truyền sẵn từ UserSkillContext; nếu thiếu
+        `target_skill_ids` thì lazy-load user.target_skills (cần User ORM).
+        Endpoint async truyền sẵn `index` (lấy qua deps.get_skill_index)
+        thay cho `db`.
         """
-        print(f"Bắt đầu tạo lộ trình cá nhân hóa cho user: {user.email}")
-
         # 1. Lấy danh sách ID kỹ năng của người dùng từ CSDL
         # Sử dụng set để tính toán hiệu quả hơn
-        target_skill_ids = {skill.id for skill in user.target_skills}
-
-        print(f"Kỹ năng đã biết: {len(known_skill_ids)} skills")
-        print(f"Kỹ năng mục tiêu: {len(target_skill_ids)} skills")
+        if target_skill_ids is None:
+            target_skill_ids = {skill.id for skill in user.target_skills}
 
         # 2. Tính toán Skill Gap
         skill_gap_ids = target_skill_ids - known_skill_ids
 
         if not skill_gap_ids:
-            print("Không có skill gap. Người dùng đã biết tất cả kỹ năng mục tiêu.")
+            logger.debug(
+                "User %s: không có skill gap (%d kỹ năng mục tiêu đã biết hết).",
+                user.id,
+                len(target_skill_ids),
+            )
             return []
 
-        print(f"Skill gap tìm thấy: {len(skill_gap_ids)} skills")
-
-        # 3. Tìm tất cả các khóa học "ứng viên" có chứa ít nhất một kỹ năng trong skill_gap
-        # .c là một cách để truy cập các cột của bảng trung gian trong join
-        candidate_courses_query = (
-            db.query(models.Course)
-            .join(models.course_skills_association)
-            .filter(models.course_skills_association.c.skill_id.in_(skill_gap_ids))
-            .distinct()
+        # 3. Sinh ứng viên từ chỉ mục trong bộ nhớ (posting list skill -> khóa
+        # học, không truy vấn CSDL), chấm điểm theo cột rồi sắp xếp lại theo
+        # đồ thị phụ thuộc (xem app/services/learning_path.py). Các span
+        # "path.candidates", "path.scoring", "path.reorder" được đo trong plan_path
+        if index is None:
+            with span("path.index"):
+                index = self.skill_index.get(db)
+        recommended_ids = plan_path(
+            index,
+            self.path_scorer,
+            known_skill_ids,
+            target_skill_ids,
+            learning_style,
         )
 
-        candidate_courses = candidate_courses_query.all()
-
-        if not candidate_courses:
-            print("Không tìm thấy khóa học nào phù hợp với skill gap.")
-            return []
-
-        print(f"Tìm thấy {len(candidate_courses)} khóa học ứng viên.")
-
-        # 4. Chấm điểm và sắp xếp các khóa học ứng viên
-        scored_courses = []
-
-        # 4.5: Thưởng điểm dựa trên Phong cách học
-        user_learning_style = user.profile.learning_style if user.profile else None
-
-        if user_learning_style:
-            print(f"Áp dụng bộ lọc Phong cách học: {user_learning_style}")
-
-            # Định nghĩa các mapping giữa phong cách học và định dạng khóa học
-            style_format_mapping = {
-                "visual": "video_heavy",
-                "read_write": "text_heavy",
-                "kinesthetic": "project_based",
-            }
-
-            preferred_format = style_format_mapping.get(user_learning_style)
-
-            for course_score_dict in scored_courses:
-                course_id = course_score_dict["id"]
-                # Tìm format của khóa học này (cần một cách truy cập nhanh, có thể thêm vào dict)
-                # Tạm thời ta sẽ giả sử 'difficulty' key cũng chứa 'format'
-                #
-                # Sửa đổi: Ta sẽ cập nhật vòng lặp chấm điểm ban đầu để đưa format vào
-                if (
-                    preferred_format
-                    and course_score_dict.get("format") == preferred_format
-                ):
-                    course_score_dict["score"] += 15  # Thưởng điểm lớn
-
-        for course in candidate_courses:
-            score = 0
-            course_skill_ids = {skill.id for skill in course.skills}
-
-            # Tiêu chí 1: Số lượng kỹ năng trong "skill gap" mà khóa học này dạy được
-            matching_skills_count = len(course_skill_ids.intersection(skill_gap_ids))
-            score += matching_skills_count * 10
-
-            # Tiêu chí 2: Ưu tiên các khóa học "Beginner" để bắt đầu
-            if course.difficulty_level == "beginner":
-                score += 5
-            elif course.difficulty_level == "intermediate":
-                score += 2
-
-            # Tiêu chí 3 (phụ): Thưởng nhẹ cho các khóa học có rating cao
-            score += course.course_rating
-
-            # Loại bỏ các khóa học mà người dùng đã biết TẤT CẢ kỹ năng của nó
-            if known_skill_ids.issuperset(course_skill_ids):
-                continue
-
-            scored_courses.append(
-                {
-                    "id": course.id,
-                    "score": score,
-                    "difficulty": course.difficulty_level,
-                    "format": course.course_format,
-                }
-            )
-
-        # 5. Sắp xếp lại các khóa học dựa trên Đồ thị Phụ thuộc (Topological Sort)
-        # Đây là một bước sắp xếp tinh vi hơn.
-
-        print("Bắt đầu sắp xếp lại lộ trình dựa trên đồ thị phụ thuộc...")
-
-        if self.skill_graph and scored_courses:
-            # Lấy set tất cả các kỹ năng có trong các khóa học được đề xuất
-            all_relevant_skills = set()
-            # Tạo map: course_id -> set of skill names
-            course_id_to_skills_map = {}
-            # Cần truy vấn lại để lấy tên skill
-            candidate_courses = (
-                db.query(models.Course)
-                .filter(models.Course.id.in_([c["id"] for c in scored_courses]))
-                .all()
-            )
-            for course in candidate_courses:
-                course_skills_set = {skill.skill_name for skill in course.skills}
-                all_relevant_skills.update(course_skills_set)
-                course_id_to_skills_map[course.id] = course_skills_set
-
-            # Tạo một đồ thị con chỉ chứa các kỹ năng liên quan
-            sub_graph = self.skill_graph.subgraph(all_relevant_skills)
-
-            # Thực hiện sắp xếp tô-pô
-            try:
-                # Sắp xếp các kỹ năng theo thứ tự logic
-                topo_sorted_skills = list(nx.topological_sort(sub_graph))
-                print(
-                    f"Thứ tự kỹ năng logic (sắp xếp tô-pô): {topo_sorted_skills[:10]}..."
-                )
-
-                # Tạo map: skill_name -> rank (thứ hạng)
-                skill_rank_map = {
-                    skill: i for i, skill in enumerate(topo_sorted_skills)
-                }
-
-                # Bây giờ, tính "rank" trung bình cho mỗi khóa học
-                # Khóa học có rank thấp hơn (chứa các skill cơ bản) sẽ được ưu tiên
-                for course_dict in scored_courses:
-                    course_skills = course_id_to_skills_map.get(
-                        course_dict["id"], set()
-                    )
-                    if not course_skills:
-                        course_dict["topo_rank"] = float("inf")
-                        continue
-
-                    # Tính rank trung bình của các kỹ năng trong khóa học
-                    ranks = [
-                        skill_rank_map.get(skill, float("inf"))
-                        for skill in course_skills
-                    ]
-                    course_dict["topo_rank"] = sum(ranks) / len(ranks)
-
-                # Sắp xếp lại scored_courses một lần cuối: ưu tiên rank thấp trước, sau đó mới đến điểm cao
-                scored_courses.sort(
-                    key=lambda x: (x.get("topo_rank", float("inf")), -x["score"])
-                )
-
-            except nx.NetworkXUnfeasible:
-                print(
-                    "CẢNH BÁO: Không thể sắp xếp tô-pô (có thể có vòng lặp trong đồ thị con). Bỏ qua bước này."
-                )
-                # Nếu lỗi, vẫn dùng cách sắp xếp cũ
-                difficulty_order = {
-                    "beginner": 0,
-                    "intermediate": 1,
-                    "mixed": 2,
-                    "advanced": 3,
-                }
-                scored_courses.sort(
-                    key=lambda x: (
-                        difficulty_order.get(x["difficulty"], 99),
-                        -x["score"],
-                    )
-                )
-
-        else:
-            # Fallback nếu không có đồ thị
-            difficulty_order = {
-                "beginner": 0,
-                "intermediate": 1,
-                "mixed": 2,
-                "advanced": 3,
-            }
-            scored_courses.sort(
-                key=lambda x: (difficulty_order.get(x["difficulty"], 99), -x["score"])
-            )
-
-        # 6. Lấy ID của các khóa học đã sắp xếp, giới hạn số lượng
-        recommended_ids = [course["id"] for course in scored_courses]
+        logger.debug(
+            "User %s: %d kỹ năng đã biết, %d mục tiêu, gap %d -> lộ trình %d khóa học.",
+            user.id,
+            len(known_skill_ids),
+            len(target_skill_ids),
+            len(skill_gap_ids),
+            len(recommended_ids),
+        )
 
-        print(f"Đã tạo lộ trình với {len(recommended_ids)} khóa học.")
+        return recommended_ids
 
-        return recommended_ids[:20]
+    def get_personalized_paths(
+        self,
+        requests: Iterable[PathRequest],
+        db: Optional[Session] = None,
+        index: Optional[CourseSkillIndex] = None,
+        workers: int = 0,
+        executor: Optional[Executor] = None,
+    ) -> Dict[int, List[int]]:
+        """
+        Lộ trình của nhiều người dùng trên cùng một chỉ mục ứng viên (job
+        offline, endpoint admin). `workers` > 1 chia lô cho pool tiến trình;
+        job chạy nhiều lô truyền `executor` tạo bằng learning_path.path_executor.
+        """
+        if index is None:
+            index = self.skill_index.get(db)
+        return plan_paths(
+            index, self.path_scorer, requests, workers=workers, executor=executor
+        )
 
 
 # Tạo một instance duy nhất của service để toàn bộ ứng dụng sử dụng (Singleton pattern)
-# App sẽ chỉ tải model một lần duy nhất lúc khởi động, rất hiệu quả.
+# Model chỉ được tải một lần: trong lifespan của app hoặc ở lần dùng đầu tiên.
 recommendation_service = RecommendationService()
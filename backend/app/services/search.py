@@ -0,0 +1,352 @@
+"""
+Tìm kiếm khóa học toàn văn theo tên, kỹ năng và mô tả.
+
+Thay cho `course_name ILIKE '%term%'` (quét toàn bảng và chỉ khớp tên), có hai
+backend dùng chung cách tách từ và ngữ nghĩa truy vấn:
+  - PostgreSQL: bảng course_search giữ tsvector của từng khóa học (tên trọng
+    số A, kỹ năng B, mô tả C) với chỉ mục GIN; truy vấn dùng `@@` và xếp hạng
+    bằng ts_rank (xem `search_statement` trong app/crud/course.py);
+  - các CSDL khác (SQLite khi phát triển): chỉ mục đảo ngược trong bộ nhớ tiến
+    trình, xếp hạng bằng BM25 với tần suất được nhân trọng số theo trường.
+
+Mọi từ của truy vấn đều phải khớp; từ cuối được hiểu là tiền tố vì người dùng
+có thể chưa gõ xong ("python da" khớp "python data ..."). Cả hai backend được
+`CourseSearchManager` làm mới khi catalog thay đổi, cùng cơ chế với chỉ mục
+khóa học-kỹ năng (app/services/skill_index.py): việc làm mới chạy ở luồng nền,
+request trong lúc đó vẫn tìm trên bảng/chỉ mục hiện có.
+"""
+import bisect
+import logging
+import re
+import time
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.db import models
+from app.services.skill_index import CatalogIndexManager, catalog_signature, register
+from app.services.topk import top_k
+
+logger = logging.getLogger(__name__)
+
+# Cấu hình text search của PostgreSQL: 'simple' chỉ chuyển chữ thường, không
+# bỏ stopword hay đưa về từ gốc, nên khớp với `tokenize` bên dưới
+TS_CONFIG = "simple"
+# Chuỗi chữ/số liên tiếp (không gồm "_"), giống cách parser của PostgreSQL tách từ
+TOKEN_RE = re.compile(r"[^\W_]+")
+# Trọng số của các trường (tên, kỹ năng, mô tả) khi đếm tần suất từ
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_QUERY_TERMS = 8
+
+REFRESH_DOCUMENTS_SQL = text(
+    f"""
+    INSERT INTO course_search (course_id, document)
+    SELECT c.id,
+           setweight(to_tsvector('{TS_CONFIG}', coalesce(c.course_name, '')), 'A')
+           || setweight(to_tsvector('{TS_CONFIG}', coalesce(s.names, '')), 'B')
+           || setweight(to_tsvector('{TS_CONFIG}', coalesce(c.course_description, '')), 'C')
+    FROM courses c
+    LEFT JOIN (
+        SELECT cs.course_id, string_agg(sk.skill_name, ' ') AS names
+        FROM course_skills cs JOIN skills sk ON sk.id = cs.skill_id
+        GROUP BY cs.course_id
+    ) s ON s.course_id = c.id
+    ON CONFLICT (course_id) DO UPDATE SET document = EXCLUDED.document
+    WHERE course_search.document IS DISTINCT FROM EXCLUDED.document
+    """
+)
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(value.lower()) if value else []
+
+
+class SearchIndexNotReady(Exception):
+    """Chỉ mục tìm kiếm trong bộ nhớ chưa được dựng (worker vừa khởi động)."""
+
+
+class SearchQuery:
+    """Các từ của một truy vấn; từ cuối là tiền tố."""
+
+    def __init__(self, value: Optional[str]):
+        self.terms = tokenize(value)[:MAX_QUERY_TERMS]
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def tsquery(self) -> str:
+        """Biểu thức cho to_tsquery; các từ chỉ gồm chữ/số nên không cần escape."""
+        return " & ".join(self.terms[:-1] + [self.terms[-1] + ":*"])
+
+
+class DatabaseSearchIndex:
+    """Văn bản tìm kiếm nằm trong bảng course_search của PostgreSQL."""
+
+    in_database = True
+
+    def __init__(self, signature=()):
+        self.signature = signature
+
+
+class InvertedIndex:
+    """
+    Chỉ mục đảo ngược dạng CSR: từ vựng đã sắp xếp (để mở rộng tiền tố bằng
+    tìm kiếm nhị phân) và với mỗi từ, posting list gồm hàng khóa học cùng điểm
+    BM25 đã tính sẵn (độ dài văn bản không đổi sau khi dựng).
+    """
+
+    in_database = False
+
+    def __init__(
+        self,
+        course_ids: np.ndarray,
+        terms: List[str],
+        indptr: np.ndarray,
+        rows: np.ndarray,
+        weights: np.ndarray,
+        signature=(),
+        max_expansions: int = 50,
+    ):
+        self.course_ids = course_ids
+        self.terms = terms
+        self.indptr = indptr
+        self.rows = rows
+        self.weights = weights
+        self.doc_freq = np.diff(indptr)
+        self.signature = signature
+        self.max_expansions = max_expansions
+
+    @classmethod
+    def from_documents(
+        cls,
+        course_ids: np.ndarray,
+        documents: Iterable[Sequence[Optional[str]]],
+        signature=(),
+        max_expansions: int = 50,
+    ) -> "InvertedIndex":
+        """`documents`: mỗi khóa học một bộ (tên, kỹ năng, mô tả), theo thứ tự course_ids."""
+        documents = list(documents)
+        n_docs = len(course_ids)
+        term_ids: Dict[str, int] = {}
+        doc_parts, term_parts, weight_parts = [], [], []
+        # Tách từ theo từng trường cho cả catalog rồi gộp bằng NumPy, thay vì
+        # đếm từng từ trong vòng lặp Python
+        for field, weight in enumerate(FIELD_WEIGHTS):
+            tokens = [tokenize(document[field]) for document in documents]
+            flat = list(chain.from_iterable(tokens))
+            term_parts.append(
+                np.array(
+                    [term_ids.setdefault(t, len(term_ids)) for t in flat],
+                    dtype=np.int64,
+                )
+            )
+            doc_parts.append(
+                np.repeat(
+                    np.arange(n_docs, dtype=np.int64),
+                    np.fromiter(map(len, tokens), dtype=np.int64, count=n_docs),
+                )
+            )
+            weight_parts.append(np.full(len(flat), weight, dtype=np.float32))
+        docs = np.concatenate(doc_parts)
+        token_weights = np.concatenate(weight_parts)
+        lengths = np.bincount(docs, weights=token_weights, minlength=n_docs)
+
+        # Đánh số lại từ vựng theo thứ tự chữ cái (để mở rộng tiền tố bằng tìm
+        # kiếm nhị phân); khóa (từ, hàng) đã sắp xếp chính là thứ tự CSR
+        terms = sorted(term_ids)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[[term_ids[t] for t in terms]] = np.arange(len(terms))
+        keys, inverse = np.unique(
+            rank[np.concatenate(term_parts)] * max(1, n_docs) + docs,
+            return_inverse=True,
+        )
+        tf = np.bincount(inverse, weights=token_weights).astype(np.float32)
+        term_of = keys // max(1, n_docs)
+        rows = (keys % max(1, n_docs)).astype(np.int32)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_of, minlength=len(terms)), out=indptr[1:])
+
+        doc_freq = np.diff(indptr).astype(np.float32)
+        idf = np.log1p((max(1, n_docs) - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_length = float(lengths.mean()) if lengths.size and lengths.mean() > 0 else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rows] / avg_length)
+        weights = (idf[term_of] * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+        return cls(
+            np.asarray(course_ids, dtype=np.int64),
+            terms,
+            indptr,
+            rows,
+            weights,
+            signature=signature,
+            max_expansions=max_expansions,
+        )
+
+    @classmethod
+    def build(cls, db: Session, max_expansions: int = 50) -> "InvertedIndex":
+        """Dựng từ CSDL bằng hai truy vấn (khóa học, tên kỹ năng theo khóa học)."""
+        course_rows = (
+            db.query(
+                models.Course.id,
+                models.Course.course_name,
+                models.Course.course_description,
+            )
+            .order_by(models.Course.id)
+            .all()
+        )
+        link = models.course_skills_association.c
+        skill_names: Dict[int, List[str]] = {}
+        for course_id, skill_name in (
+            db.query(link.course_id, models.Skill.skill_name)
+            .join(models.Skill, models.Skill.id == link.skill_id)
+            .all()
+        ):
+            skill_names.setdefault(course_id, []).append(skill_name)
+
+        return cls.from_documents(
+            np.array([r[0] for r in course_rows], dtype=np.int64),
+            (
+                (r[1], " ".join(skill_names.get(r[0], ())), r[2])
+                for r in course_rows
+            ),
+            signature=catalog_signature(db),
+            max_expansions=max_expansions,
+        )
+
+    @property
+    def n_postings(self) -> int:
+        return int(self.rows.size)
+
+    def _exact(self, term: str) -> np.ndarray:
+        pos = bisect.bisect_left(self.terms, term)
+        if pos < len(self.terms) and self.terms[pos] == term:
+            return np.array([pos])
+        return np.empty(0, dtype=np.int64)
+
+    def _prefixed(self, prefix: str) -> np.ndarray:
+        """Các từ bắt đầu bằng `prefix`; quá max_expansions thì giữ các từ phổ biến nhất."""
+        start = bisect.bisect_left(self.terms, prefix)
+        stop = bisect.bisect_left(self.terms, prefix + "\U0010ffff", lo=start)
+        positions = np.arange(start, stop)
+        if positions.size > self.max_expansions:
+            keep = np.argpartition(
+                -self.doc_freq[positions], self.max_expansions - 1
+            )[: self.max_expansions]
+            positions = positions[keep]
+        return positions
+
+    def search(
+        self,
+        query: SearchQuery,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> Tuple[List[int], List[float]]:
+        """
+        (course_id, điểm BM25) của các khóa học khớp mọi từ, xếp theo điểm giảm
+        dần rồi id tăng dần. `after` là (điểm, id) của kết quả cuối trang trước
+        (phân trang keyset, xem app/core/pagination.py).
+        """
+        if not query or limit <= 0:
+            return [], []
+        n_docs = self.course_ids.size
+        scores = np.zeros(n_docs, dtype=np.float32)
+        hits = np.zeros(n_docs, dtype=np.int16)
+        last = len(query.terms) - 1
+        for position, term in enumerate(query.terms):
+            positions = self._prefixed(term) if position == last else self._exact(term)
+            if positions.size == 0:
+                return [], []
+            matched = np.zeros(n_docs, dtype=bool)
+            for t in positions.tolist():
+                start, stop = self.indptr[t], self.indptr[t + 1]
+                rows = self.rows[start:stop]
+                scores[rows] += self.weights[start:stop]
+                matched[rows] = True
+            hits += matched
+
+        candidates = np.flatnonzero(hits == len(query.terms))
+        if after is not None:
+            score, course_id = after
+            candidate_scores = scores[candidates]
+            candidates = candidates[
+                (candidate_scores < score)
+                | (
+                    (candidate_scores == score)
+                    & (self.course_ids[candidates] > course_id)
+                )
+            ]
+        top, top_scores = top_k(scores[candidates], skip + limit)
+        rows = candidates[top[skip:]]
+        return self.course_ids[rows].tolist(), top_scores[skip:].tolist()
+
+
+def refresh_documents(db: Session):
+    """
+    Cập nhật bảng course_search theo catalog hiện tại (PostgreSQL). Chỉ các
+    hàng có văn bản thay đổi được ghi; khóa học bị xóa đã được ON DELETE
+    CASCADE dọn. Advisory lock tránh để nhiều worker làm mới cùng lúc.
+    """
+    with db.get_bind().begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('course_search'))"))
+        connection.execute(REFRESH_DOCUMENTS_SQL)
+
+
+class CourseSearchManager(CatalogIndexManager):
+    def __init__(
+        self, backend: str = "auto", refresh_seconds: float = 60.0, max_expansions: int = 50
+    ):
+        super().__init__(refresh_seconds)
+        self.backend = backend
+        self.max_expansions = max_expansions
+        self.last_build_seconds: Optional[float] = None
+
+    def uses_database(self, db) -> bool:
+        """`db` là Session hoặc AsyncSession."""
+        return self.backend != "memory" and db.get_bind().dialect.name == "postgresql"
+
+    def current_for(self, db):
+        """
+        Chỉ mục cho request, không làm mới trên luồng gọi (xem `current`).
+        Trên PostgreSQL, khi lần làm mới đầu tiên chưa xong, bảng course_search
+        của lần chạy trước vẫn dùng được; chỉ mục trong bộ nhớ thì chưa có.
+        """
+        index = self.current()
+        if index is not None:
+            return index
+        if self.uses_database(db):
+            return DatabaseSearchIndex()
+        raise SearchIndexNotReady()
+
+    def _build(self, db: Session):
+        start = time.perf_counter()
+        if self.uses_database(db):
+            refresh_documents(db)
+            index = DatabaseSearchIndex(catalog_signature(db))
+            described = "bảng course_search (PostgreSQL)"
+        else:
+            index = InvertedIndex.build(db, max_expansions=self.max_expansions)
+            described = (
+                f"chỉ mục trong bộ nhớ: {index.course_ids.size} khóa học, "
+                f"{len(index.terms)} từ, {index.n_postings} posting"
+            )
+        self.last_build_seconds = time.perf_counter() - start
+        logger.info(
+            f"Đã làm mới tìm kiếm khóa học ({described}) "
+            f"trong {self.last_build_seconds:.2f}s."
+        )
+        return index
+
+
+course_search = register(
+    CourseSearchManager(
+        backend=config.SEARCH_BACKEND,
+        refresh_seconds=config.SKILL_INDEX_REFRESH_SECONDS,
+        max_expansions=config.SEARCH_PREFIX_EXPANSIONS,
+    )
+)
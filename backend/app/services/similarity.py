@@ -0,0 +1,187 @@
+import numpy as np
+from scipy import sparse
+from typing import List, Optional, Tuple
+
+from app.services.ann import ANN
+from app.services.topk import top_k, top_k_rows
+
+# Các chế độ tính độ tương đồng, chọn qua biến môi trường SIMILARITY_MODE
+DENSE = "dense"
+SPARSE = "sparse"
+TOPK = "topk"
+MODES = (DENSE, SPARSE, TOPK, ANN)
+
+# Số hàng cosine được tính trong một phép nhân ma trận khi truy vấn theo lô
+BATCH_BLOCK_SIZE = 256
+
+# Kiểu lưu điểm tương đồng của chế độ dense/topk. uint8 lượng tử hóa tuyến
+# tính cosine trong [0, 1] (TF-IDF không âm) thành 0..255
+SCORE_DTYPES = ("float64", "float32", "float16", "uint8")
+UINT8_LEVELS = 255
+
+
+def encode_scores(values: np.ndarray, dtype) -> np.ndarray:
+    """Đổi điểm cosine sang kiểu lưu `dtype` (xem SCORE_DTYPES)."""
+    dtype = np.dtype(dtype)
+    if dtype.name not in SCORE_DTYPES:
+        raise ValueError(f"Kiểu điểm không hợp lệ: '{dtype}'. Chọn một trong {SCORE_DTYPES}.")
+    values = np.asarray(values)
+    if dtype == np.uint8:
+        return np.rint(np.clip(values, 0, 1) * UINT8_LEVELS).astype(np.uint8)
+    return values.astype(dtype, copy=False)
+
+
+def decode_scores(values: np.ndarray) -> np.ndarray:
+    """
+    Điểm cosine từ kiểu lưu: float16/uint8 được đổi sang float32 (NumPy tính
+    trên float16 chậm), float32/float64 giữ nguyên không sao chép.
+    """
+    if values.dtype == np.uint8:
+        return values.astype(np.float32) / np.float32(UINT8_LEVELS)
+    if values.dtype == np.float16:
+        return values.astype(np.float32)
+    return values
+
+
+class DenseSimilarity:
+    """
+    Ma trận cosine N×N tính sẵn (cách làm ban đầu).
+    Bộ nhớ tăng theo N², chỉ phù hợp với catalog nhỏ; ma trận có thể lưu
+    bằng float32/float16/uint8 (encode_scores) để giảm 2-8 lần so với float64.
+    """
+
+    mode = DENSE
+
+    def __init__(self, cosine_sim_matrix: np.ndarray):
+        self.matrix = cosine_sim_matrix
+
+    @property
+    def n_items(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    def top(self, idx: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return top_k(decode_scores(self.matrix[idx]), k, exclude=(idx,))
+
+    def top_many(self, rows: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        return top_k_rows(decode_scores(self.matrix[rows]), k, rows)
+
+
+class SparseSimilarity:
+    """
+    Chỉ giữ ma trận TF-IDF thưa (đã chuẩn hóa L2) và tính một hàng cosine
+    khi cần bằng phép nhân hàng thưa × ma trận thưa.
+    Bộ nhớ tăng theo số phần tử khác 0, không phải N².
+    """
+
+    mode = SPARSE
+
+    def __init__(
+        self,
+        tfidf_matrix: sparse.spmatrix,
+        tfidf_matrix_t: Optional[sparse.spmatrix] = None,
+    ):
+        # TfidfVectorizer mặc định chuẩn hóa L2 nên tích vô hướng chính là cosine
+        self.matrix = sparse.csr_matrix(tfidf_matrix, dtype=np.float32)
+        # Ma trận chuyển vị có thể được truyền sẵn (ví dụ: mmap từ đĩa)
+        # để không phải dựng lại một bản riêng trong mỗi worker
+        if tfidf_matrix_t is None:
+            tfidf_matrix_t = self.matrix.T
+        self.matrix_t = sparse.csr_matrix(tfidf_matrix_t, dtype=np.float32)
+
+    @property
+    def n_items(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+            for m in (self.matrix, self.matrix_t)
+        )
+
+    def row(self, idx: int) -> np.ndarray:
+        return (self.matrix[idx] @ self.matrix_t).toarray().ravel()
+
+    def top(self, idx: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return top_k(self.row(idx), k, exclude=(idx,))
+
+    def top_many(self, rows: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Láng giềng của nhiều khóa học: mỗi khối BATCH_BLOCK_SIZE truy vấn là một
+        phép nhân ma trận thưa × ma trận dày (các hàng truy vấn đã trải dày),
+        nhanh hơn nhiều so với nhân thưa × thưa rồi chuyển sang mảng dày. Bộ
+        nhớ đỉnh tỉ lệ với kích thước khối × (N + số từ).
+        """
+        results = []
+        for start in range(0, rows.size, BATCH_BLOCK_SIZE):
+            chunk = rows[start : start + BATCH_BLOCK_SIZE]
+            queries = self.matrix[chunk].T.toarray()
+            block = np.ascontiguousarray((self.matrix @ queries).T)
+            results.extend(top_k_rows(block, k, chunk))
+        return results
+
+
+class TopKNeighborSimilarity:
+    """
+    Bảng láng giềng đã được cắt tỉa: với mỗi khóa học chỉ lưu K láng giềng
+    gần nhất (int32) và điểm tương ứng (float32, hoặc float16/uint8 qua
+    encode_scores), đã sắp xếp giảm dần. Truy vấn chỉ là một phép cắt mảng;
+    thứ tự nằm trong `neighbors` nên lượng tử hóa điểm không đổi xếp hạng.
+    """
+
+    mode = TOPK
+
+    def __init__(self, neighbors: np.ndarray, scores: np.ndarray):
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @property
+    def n_items(self) -> int:
+        return self.neighbors.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.neighbors.nbytes + self.scores.nbytes
+
+    def top(self, idx: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        row_ids = self.neighbors[idx]
+        # Các ô trống (ít hơn K láng giềng) được đánh dấu -1; bỏ luôn chính nó
+        keep = (row_ids >= 0) & (row_ids != idx)
+        return (
+            row_ids[keep][:k].astype(np.int64),
+            decode_scores(self.scores[idx][keep][:k]),
+        )
+
+    def top_many(self, rows: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # Cắt cả khối hàng một lần rồi lọc ô trống theo từng hàng
+        neighbors, scores = self.neighbors[rows], decode_scores(self.scores[rows])
+        keep = (neighbors >= 0) & (neighbors != rows[:, None])
+        return [
+            (row_ids[mask][:k].astype(np.int64), row_scores[mask][:k])
+            for row_ids, row_scores, mask in zip(neighbors, scores, keep)
+        ]
+
+
+def build_topk_table(
+    tfidf_matrix: sparse.spmatrix, k: int, block_size: int = 1024
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tính bảng top-K láng giềng từ ma trận TF-IDF theo từng khối hàng,
+    để bộ nhớ đỉnh chỉ tỉ lệ với block_size × N thay vì N².
+    """
+    sim = SparseSimilarity(tfidf_matrix)
+    n = sim.n_items
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+
+    for start in range(0, n, block_size):
+        rows = np.arange(start, min(start + block_size, n))
+        for idx, (top_indices, top_scores) in zip(rows, sim.top_many(rows, k)):
+            neighbors[idx, : top_indices.size] = top_indices
+            scores[idx, : top_scores.size] = top_scores
+
+    return neighbors, scores
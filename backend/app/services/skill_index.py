@@ -0,0 +1,405 @@
+"""
+Chỉ mục khóa học ↔ kỹ năng trong bộ nhớ tiến trình.
+
+Thay cho việc JOIN bảng course_skills và lazy-load `course.skills` cho từng
+khóa học ứng viên, chỉ mục giữ:
+  - `course_skills`: ma trận thưa N_khóa_học × N_kỹ_năng dạng CSR, mỗi hàng là
+    bitset kỹ năng của một khóa học (chỉ lưu các bit 1);
+  - `skill_courses`: ma trận chuyển vị, mỗi hàng là posting list
+    skill → các khóa học dạy kỹ năng đó;
+  - các cột thuộc tính khóa học cần cho việc chấm điểm.
+
+Sinh ứng viên, đếm số kỹ năng trùng với skill gap và lọc "đã biết hết" đều là
+phép toán trên mảng NumPy, không cần truy vấn CSDL.
+
+`SkillIndexManager` dựng chỉ mục lần đầu khi cần (hoặc lúc khởi động), đánh dấu
+cũ khi một session trong tiến trình ghi Course/Skill, và định kỳ so sánh
+chữ ký catalog trong CSDL để bắt các thay đổi từ tiến trình khác (ví dụ seed).
+Cơ chế này nằm trong `CatalogIndexManager` để các chỉ mục khác dựng từ catalog
+(ví dụ chỉ mục tìm kiếm, app/services/search.py) dùng lại. Endpoint async lấy
+chỉ mục qua `current()`: việc dựng lại chạy ở luồng nền, không trên event loop.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import BigInteger, case, cast, event, func
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services import path_scorer
+from app.services.topo_rank import TopoTable
+
+logger = logging.getLogger(__name__)
+
+
+class CourseSkillIndex:
+    def __init__(
+        self,
+        course_ids: np.ndarray,
+        skill_ids: np.ndarray,
+        skill_names: np.ndarray,
+        course_skills: sparse.csr_matrix,
+        difficulty_codes: np.ndarray,
+        format_codes: np.ndarray,
+        rating: np.ndarray,
+        topo_table: Optional[TopoTable] = None,
+        signature: Tuple = (),
+    ):
+        # course_ids và skill_ids đã được sắp xếp tăng dần để tra cứu bằng searchsorted
+        self.course_ids = course_ids
+        self.skill_ids = skill_ids
+        self.skill_names = skill_names
+        self.course_skills = course_skills
+        self.skill_courses = course_skills.T.tocsr()
+        # Số kỹ năng của từng khóa học (popcount của bitset)
+        self.skill_counts = np.diff(course_skills.indptr)
+        # Các cột đặc trưng cho PathScorer (xem app/services/path_scorer.py)
+        self.difficulty_codes = difficulty_codes
+        self.format_codes = format_codes
+        self.rating = rating
+        # Rank tô-pô trung bình của các kỹ năng trong mỗi khóa học (None nếu không có đồ thị)
+        self.course_topo_rank = (
+            self._course_topo_rank(topo_table) if topo_table is not None else None
+        )
+        self.signature = signature
+
+    @property
+    def n_courses(self) -> int:
+        return self.course_ids.size
+
+    @classmethod
+    def build(
+        cls, db: Session, topo_table: Optional[TopoTable] = None
+    ) -> "CourseSkillIndex":
+        """Dựng chỉ mục từ CSDL bằng ba truy vấn (courses, skills, course_skills)."""
+        course_rows = (
+            db.query(
+                models.Course.id,
+                models.Course.difficulty_level,
+                models.Course.course_format,
+                models.Course.course_rating,
+            )
+            .order_by(models.Course.id)
+            .all()
+        )
+        skill_rows = (
+            db.query(models.Skill.id, models.Skill.skill_name)
+            .order_by(models.Skill.id)
+            .all()
+        )
+        link_rows = db.query(
+            models.course_skills_association.c.course_id,
+            models.course_skills_association.c.skill_id,
+        ).all()
+
+        course_ids = np.array([r[0] for r in course_rows], dtype=np.int64)
+        skill_ids = np.array([r[0] for r in skill_rows], dtype=np.int64)
+        links = np.array(link_rows, dtype=np.int64).reshape(-1, 2)
+
+        course_skills = sparse.csr_matrix(
+            (
+                np.ones(len(links), dtype=np.int8),
+                (
+                    np.searchsorted(course_ids, links[:, 0]),
+                    np.searchsorted(skill_ids, links[:, 1]),
+                ),
+            ),
+            shape=(course_ids.size, skill_ids.size),
+        )
+
+        return cls(
+            course_ids=course_ids,
+            skill_ids=skill_ids,
+            skill_names=np.array([r[1] for r in skill_rows], dtype=object),
+            course_skills=course_skills,
+            difficulty_codes=path_scorer.encode(
+                (r[1] for r in course_rows),
+                path_scorer.DIFFICULTY_CODES,
+                path_scorer.UNKNOWN_DIFFICULTY,
+            ),
+            format_codes=path_scorer.encode(
+                (r[2] for r in course_rows),
+                path_scorer.FORMAT_CODES,
+                path_scorer.UNKNOWN_FORMAT,
+            ),
+            rating=np.array(
+                [r[3] if r[3] is not None else 0.0 for r in course_rows],
+                dtype=np.float64,
+            ),
+            topo_table=topo_table,
+            signature=catalog_signature(db),
+        )
+
+    def _course_topo_rank(self, topo_table: TopoTable) -> np.ndarray:
+        """
+        Rank trung bình của các kỹ năng trong từng khóa học. Khóa học không có
+        kỹ năng, hoặc có kỹ năng nằm ngoài đồ thị, nhận rank vô cùng.
+        """
+        skill_rank = np.array(
+            [topo_table.rank_of.get(name, -1) for name in self.skill_names],
+            dtype=np.float64,
+        )
+        missing = (skill_rank < 0).astype(np.int32)
+        skill_rank[skill_rank < 0] = 0
+
+        counts = self.skill_counts
+        totals = self.course_skills @ skill_rank
+        ranks = np.full(self.n_courses, np.inf)
+        valid = (counts > 0) & ((self.course_skills @ missing) == 0)
+        ranks[valid] = totals[valid] / counts[valid]
+        return ranks
+
+    def skill_positions(self, skill_ids: Iterable[int]) -> np.ndarray:
+        """Chuyển skill_id sang vị trí cột; bỏ qua các id không có trong catalog."""
+        ids = np.fromiter(skill_ids, dtype=np.int64)
+        pos = np.searchsorted(self.skill_ids, ids)
+        valid = pos < self.skill_ids.size
+        pos, ids = pos[valid], ids[valid]
+        return pos[self.skill_ids[pos] == ids]
+
+    def skill_mask(self, skill_ids: Iterable[int]) -> np.ndarray:
+        mask = np.zeros(self.skill_ids.size, dtype=np.int32)
+        mask[self.skill_positions(skill_ids)] = 1
+        return mask
+
+    def candidates(self, skill_ids: Iterable[int]) -> np.ndarray:
+        """Hợp các posting list: các hàng khóa học dạy ít nhất một kỹ năng."""
+        postings = self.skill_courses[self.skill_positions(skill_ids)]
+        return np.unique(postings.indices)
+
+    def overlap_counts(self, rows: np.ndarray, skill_mask: np.ndarray) -> np.ndarray:
+        """Số kỹ năng của mỗi khóa học (theo hàng) nằm trong `skill_mask`."""
+        return self.course_skills[rows] @ skill_mask
+
+    def knows_all(self, rows: np.ndarray, known_mask: np.ndarray) -> np.ndarray:
+        """True nếu người dùng đã biết TẤT CẢ kỹ năng của khóa học."""
+        return self.overlap_counts(rows, known_mask) == self.skill_counts[rows]
+
+    def course_skill_names(self, row: int) -> List[str]:
+        start, stop = self.course_skills.indptr[row : row + 2]
+        return self.skill_names[self.course_skills.indices[start:stop]].tolist()
+
+
+def _text_fingerprint(db: Session, column):
+    """
+    Số đại diện cho nội dung một cột chuỗi: hashtext trên PostgreSQL (như
+    advisory lock trong search.py); CSDL khác (SQLite khi phát triển) chỉ có độ
+    dài chuỗi, nên sửa thành chuỗi khác cùng độ dài không bị phát hiện.
+    """
+    value = func.coalesce(column, "")
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.hashtext(value), BigInteger)
+    return func.length(value)
+
+
+def catalog_signature(db: Session) -> Tuple:
+    """
+    Chữ ký rẻ của catalog để phát hiện thay đổi từ tiến trình khác: số lượng
+    và id lớn nhất, cộng tổng có trọng số theo id của các cột được chấm điểm
+    hoặc đưa vào chỉ mục (độ khó, định dạng, rating, văn bản, tên kỹ năng, cặp
+    khóa học-kỹ năng), để bắt cả thao tác sửa hoặc đổi liên kết. Mỗi bảng một
+    truy vấn tổng hợp; các tổng đều là số nguyên nên không dao động theo thứ
+    tự cộng.
+    """
+    course, skill = models.Course, models.Skill
+    link = models.course_skills_association.c
+    course_id = cast(course.id, BigInteger)
+    courses = db.query(
+        func.count(course.id),
+        func.max(course.id),
+        func.sum(
+            course_id
+            * case(
+                path_scorer.DIFFICULTY_CODES,
+                value=course.difficulty_level,
+                else_=path_scorer.UNKNOWN_DIFFICULTY,
+            )
+        ),
+        func.sum(
+            course_id
+            * case(
+                path_scorer.FORMAT_CODES,
+                value=course.course_format,
+                else_=path_scorer.UNKNOWN_FORMAT,
+            )
+        ),
+        func.sum(
+            course_id
+            * cast(func.round(func.coalesce(course.course_rating, 0) * 100), BigInteger)
+        ),
+        func.sum(course_id * _text_fingerprint(db, course.course_name)),
+        func.sum(course_id * _text_fingerprint(db, course.course_description)),
+    ).one()
+    skills = db.query(
+        func.count(skill.id),
+        func.max(skill.id),
+        func.sum(cast(skill.id, BigInteger) * _text_fingerprint(db, skill.skill_name)),
+    ).one()
+    links = (
+        db.query(
+            func.count(),
+            func.max(link.course_id),
+            func.max(link.skill_id),
+            func.sum(cast(link.course_id, BigInteger) * link.skill_id),
+            func.sum(link.skill_id),
+        )
+        .select_from(models.course_skills_association)
+        .one()
+    )
+    return tuple(courses) + tuple(skills) + tuple(links)
+
+
+class CatalogIndexManager:
+    """
+    Giữ một chỉ mục dựng từ catalog trong CSDL: dựng lần đầu khi cần, dựng
+    lại khi bị đánh dấu cũ hoặc khi chữ ký catalog đổi. Lớp con cài đặt
+    `_build(db)`, trả về đối tượng có thuộc tính `signature`.
+    """
+
+    def __init__(self, refresh_seconds: float = 60.0):
+        self.refresh_seconds = refresh_seconds
+        self._index = None
+        self._stale = True
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Giữ trong lúc một luồng nền đang dựng lại (xem `current`)
+        self._refreshing = threading.Lock()
+        # Hàm nhận chỉ mục mới, được gọi sau mỗi lần dựng lại (ví dụ: vô hiệu
+        # hóa cache kết quả, đồng bộ catalog cho model gợi ý)
+        self.on_rebuild: List[Callable] = []
+
+    def mark_stale(self):
+        self._stale = True
+
+    def get(self, db: Session):
+        """Trả về chỉ mục hiện tại, dựng lại nếu catalog đã thay đổi."""
+        index = self._index
+        if index is not None and not self._stale:
+            if time.monotonic() - self._checked_at < self.refresh_seconds:
+                return index
+
+        with self._lock:
+            if self._index is None or self._stale:
+                self._rebuild(db)
+            elif time.monotonic() - self._checked_at >= self.refresh_seconds:
+                self._checked_at = time.monotonic()
+                if catalog_signature(db) != self._index.signature:
+                    self._rebuild(db)
+            return self._index
+
+    def current(self):
+        """
+        Chỉ mục cho đường xử lý request: không truy vấn CSDL, không dựng và
+        không chờ khóa trên luồng gọi (event loop). Khi chỉ mục cũ hoặc đến hạn
+        so chữ ký, việc dựng lại chạy ở luồng nền trong lúc bản hiện tại vẫn
+        được phục vụ. Trả về None khi chưa có chỉ mục (đang khởi động).
+        """
+        index = self._index
+        if (
+            index is None
+            or self._stale
+            or time.monotonic() - self._checked_at >= self.refresh_seconds
+        ):
+            self.refresh_in_background()
+        return index
+
+    def refresh_in_background(self):
+        """Chạy `get` ở luồng nền với Session riêng; bỏ qua nếu đang có luồng chạy."""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            threading.Thread(
+                target=self._refresh,
+                name=f"{type(self).__name__}-refresh",
+                daemon=True,
+            ).start()
+        except Exception:
+            self._refreshing.release()
+            raise
+
+    def _refresh(self):
+        # Import tại chỗ để import module này không tạo engine CSDL
+        from app.db.database import SessionLocal
+
+        try:
+            with SessionLocal() as db:
+                self.get(db)
+        except Exception:
+            logger.exception(f"Dựng lại {type(self).__name__} ở nền thất bại.")
+        finally:
+            self._refreshing.release()
+
+    def _build(self, db: Session):
+        raise NotImplementedError
+
+    def _rebuild(self, db: Session):
+        self._stale = False
+        self._index = self._build(db)
+        self._checked_at = time.monotonic()
+        for callback in self.on_rebuild:
+            callback(self._index)
+
+
+class SkillIndexManager(CatalogIndexManager):
+    def __init__(
+        self,
+        refresh_seconds: float = 60.0,
+        topo_table: Optional[TopoTable] = None,
+        wait_for_model: Optional[Callable] = None,
+    ):
+        super().__init__(refresh_seconds)
+        self.topo_table = topo_table
+        # Bảng rank tô-pô đến từ model gợi ý, được tải sau khi import: hàm này
+        # tải (hoặc chờ) model trước khi dựng để chỉ mục không thiếu rank
+        self.wait_for_model = wait_for_model
+
+    def get(self, db: Session):
+        if self.wait_for_model is not None:
+            self.wait_for_model()
+        return super().get(db)
+
+    def set_topo_table(self, topo_table: Optional[TopoTable]):
+        """Đổi bảng rank tô-pô (ví dụ khi tải đồ thị mới); chỉ mục sẽ được dựng lại."""
+        self.topo_table = topo_table
+        self.mark_stale()
+
+    def _build(self, db: Session) -> CourseSkillIndex:
+        index = CourseSkillIndex.build(db, topo_table=self.topo_table)
+        logger.info(
+            f"Đã dựng chỉ mục khóa học-kỹ năng: {index.n_courses} khóa học, "
+            f"{index.skill_ids.size} kỹ năng."
+        )
+        return index
+
+
+_managers: List[CatalogIndexManager] = []
+
+
+def register(manager: CatalogIndexManager) -> CatalogIndexManager:
+    """Đăng ký để manager bị đánh dấu cũ khi catalog đổi trong tiến trình này."""
+    _managers.append(manager)
+    return manager
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_write(session, flush_context):
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(obj, (models.Course, models.Skill)) for obj in changed):
+        session.info["catalog_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_stale_on_catalog_commit(session):
+    # Chỉ đánh dấu sau khi commit để lần dựng lại không đọc dữ liệu chưa commit
+    if session.info.pop("catalog_changed", False):
+        for manager in _managers:
+            manager.mark_stale()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_catalog_write(session):
+    session.info.pop("catalog_changed", None)
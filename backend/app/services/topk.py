@@ -0,0 +1,137 @@
+import numpy as np
+from typing import Iterable, List, Sequence, Tuple
+
+
+def top_k(
+    scores: np.ndarray, k: int, exclude: Iterable[int] = ()
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Chọn K phần tử có điểm cao nhất trong một vector điểm bằng NumPy.
+
+    - Dùng argpartition (O(N)) rồi chỉ sắp xếp K phần tử được chọn, thay vì
+      sắp xếp toàn bộ hàng.
+    - Các index trong `exclude` (ví dụ: chính khóa học đang xem) bị loại bỏ
+      theo index, không dựa vào vị trí trong kết quả đã sắp xếp.
+    - Khi điểm bằng nhau, index nhỏ hơn luôn đứng trước nên kết quả ổn định
+      giữa các lần gọi.
+
+    Trả về (indices, scores) dưới dạng mảng, đã sắp xếp giảm dần theo điểm.
+    """
+    scores = np.asarray(scores)
+    exclude = np.unique(np.fromiter(exclude, dtype=np.int64))
+    n = scores.shape[0]
+
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+
+    # Lấy dư số phần tử bị loại trừ để sau khi lọc vẫn còn đủ K phần tử
+    want = min(k + exclude.size, n)
+    candidates = _select(scores, want)
+
+    if exclude.size:
+        candidates = candidates[~np.isin(candidates, exclude)]
+
+    # Sắp xếp nhỏ trên K ứng viên: điểm giảm dần, index tăng dần khi hòa
+    order = np.lexsort((candidates, -scores[candidates]))
+    top_indices = candidates[order][:k]
+    return top_indices, scores[top_indices]
+
+
+def _select(scores: np.ndarray, want: int) -> np.ndarray:
+    """
+    Trả về index của `want` phần tử lớn nhất (chưa sắp xếp).
+
+    argpartition chọn tùy ý giữa các phần tử bằng nhau ở ranh giới, nên ta lấy
+    ngưỡng từ argpartition rồi chọn lại một cách xác định: mọi phần tử lớn hơn
+    ngưỡng, cộng thêm các phần tử bằng ngưỡng có index nhỏ nhất.
+    """
+    n = scores.shape[0]
+    if want >= n:
+        return np.arange(n)
+
+    partitioned = np.argpartition(-scores, want - 1)[:want]
+    threshold = scores[partitioned].min()
+
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[: want - above.size]
+    return np.concatenate((above, ties))
+
+
+def lex_top_k(keys: Sequence[np.ndarray], k: int) -> np.ndarray:
+    """
+    Trả về index của K phần tử NHỎ nhất theo thứ tự từ điển của `keys`
+    (keys[0] là khóa chính), hòa thì index nhỏ hơn đứng trước.
+
+    Dùng np.partition trên khóa chính để lấy các phần tử chắc chắn lọt vào
+    top-K; nhóm bằng ngưỡng được chọn tiếp bằng khóa kế tiếp. Chỉ tập cuối
+    cùng (tối đa K phần tử) mới được lexsort.
+    """
+    keys = [np.asarray(key) for key in keys]
+    n = keys[0].shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    rows = _lex_select(keys, k, np.arange(n))
+    # np.lexsort coi khóa CUỐI là khóa chính
+    order = np.lexsort((rows,) + tuple(key[rows] for key in reversed(keys)))
+    return rows[order][:k]
+
+
+def _lex_select(keys: Sequence[np.ndarray], k: int, rows: np.ndarray) -> np.ndarray:
+    """Chọn (chưa sắp xếp) K hàng nhỏ nhất trong `rows` theo thứ tự từ điển."""
+    if k >= rows.size:
+        return rows
+
+    primary = keys[0][rows]
+    threshold = np.partition(primary, k - 1)[k - 1]
+    below = rows[primary < threshold]
+    tied = rows[primary == threshold]
+    if len(keys) > 1:
+        tied = _lex_select(keys[1:], k - below.size, tied)
+    else:
+        tied = tied[: k - below.size]
+    return np.concatenate((below, tied))
+
+
+def top_k_rows(
+    block: np.ndarray, k: int, exclude: np.ndarray
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    top_k cho từng hàng của một khối điểm số thực (m × N), hàng i loại index
+    exclude[i]; kết quả giống hệt m lần gọi top_k. `block` bị ghi đè.
+
+    argpartition chạy một lần trên cả khối. Hàng nào có phần tử bằng ngưỡng
+    nằm ngoài phần được chọn (argpartition chọn tùy ý giữa chúng) thì tính lại
+    bằng top_k để giữ quy tắc "hòa thì index nhỏ hơn đứng trước".
+    """
+    m, n = block.shape
+    exclude = np.asarray(exclude, dtype=np.int64)
+    want = min(k, n - 1)
+    if m == 0 or want <= 0:
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=block.dtype))
+        return [empty] * m
+
+    rows = np.arange(m)
+    original = block[rows, exclude]
+    block[rows, exclude] = -np.inf
+    candidates = np.argpartition(-block, want - 1, axis=1)[:, :want]
+    values = block[rows[:, None], candidates]
+    threshold = values.min(axis=1)
+    # Số phần tử bằng ngưỡng trên cả hàng so với trong phần được chọn
+    ambiguous = (block == threshold[:, None]).sum(axis=1) > (
+        values == threshold[:, None]
+    ).sum(axis=1)
+    ambiguous |= np.isneginf(threshold)
+
+    order = np.lexsort((candidates, -values), axis=1)
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+
+    results = []
+    for i in rows.tolist():
+        if ambiguous[i]:
+            block[i, exclude[i]] = original[i]
+            results.append(top_k(block[i], k, exclude=(exclude[i],)))
+        else:
+            results.append((candidates[i], values[i]))
+    return results
@@ -0,0 +1,47 @@
+"""
+Bảng thứ hạng tô-pô tính sẵn cho đồ thị phụ thuộc kỹ năng.
+
+Đồ thị đã được kiểm tra không có vòng lặp khi xây dựng
+(ml/src/build_dependency_graph.py). Một thứ tự tô-pô của toàn bộ đồ thị, khi
+giới hạn trên một tập con kỹ năng bất kỳ, vẫn là một thứ tự tô-pô hợp lệ của
+tập con đó. Vì vậy chỉ cần tính một lần:
+  - rank: vị trí của kỹ năng trong thứ tự tô-pô toàn cục;
+  - depth: độ sâu (số cạnh trên đường dài nhất từ một kỹ năng gốc).
+
+Bảng được tính từ đồ thị lúc tải model (hoặc lưu sẵn trong artifact mmap, xem
+app/services/artifacts.py), không có file riêng.
+"""
+from typing import Dict
+
+import networkx as nx
+import numpy as np
+
+
+class TopoTable:
+    def __init__(self, skill_names, rank: np.ndarray, depth: np.ndarray):
+        self.skill_names = list(skill_names)
+        self.rank = np.asarray(rank, dtype=np.int32)
+        self.depth = np.asarray(depth, dtype=np.int32)
+        self.rank_of: Dict[str, int] = dict(zip(self.skill_names, self.rank.tolist()))
+        self.depth_of: Dict[str, int] = dict(
+            zip(self.skill_names, self.depth.tolist())
+        )
+
+    def __len__(self) -> int:
+        return len(self.skill_names)
+
+    @classmethod
+    def from_graph(cls, graph: nx.DiGraph) -> "TopoTable":
+        """Tính bảng từ đồ thị; ném NetworkXUnfeasible nếu đồ thị có vòng lặp."""
+        # Thứ tự từ điển giúp kết quả giống nhau giữa các lần xây dựng
+        order = list(nx.lexicographical_topological_sort(graph))
+        depth_of = {}
+        for skill in order:
+            depth_of[skill] = max(
+                (depth_of[p] + 1 for p in graph.predecessors(skill)), default=0
+            )
+        return cls(
+            order,
+            np.arange(len(order)),
+            np.array([depth_of[s] for s in order]),
+        )
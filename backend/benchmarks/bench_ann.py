@@ -0,0 +1,66 @@
+"""
+Độ trễ và recall@10 của chỉ mục ANN (IVF) trên catalog tổng hợp lớn,
+so với cosine chính xác (SparseSimilarity).
+
+Chạy: python benchmarks/bench_ann.py [--sizes 100000 300000] [--probes 2 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.services.ann import build_ivf_index, recall_at_k
+from app.services.similarity import SparseSimilarity
+from bench_similarity import random_tfidf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000])
+    parser.add_argument("--terms", type=int, default=5000)
+    parser.add_argument("--components", type=int, default=64)
+    parser.add_argument("--probes", type=int, nargs="+", default=[2, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(
+        f"{'courses':>9} {'n_probe':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+        f"{'exact p50':>10} {'recall@10':>10}"
+    )
+    for n in args.sizes:
+        tfidf = random_tfidf(n, args.terms, terms_per_course=8)
+        start = time.perf_counter()
+        index = build_ivf_index(tfidf, n_components=args.components)
+        print(f"# {n} khóa học: xây dựng chỉ mục trong {time.perf_counter() - start:.1f}s")
+
+        exact = SparseSimilarity(tfidf)
+        queries = np.random.default_rng(1).integers(n, size=args.queries)
+        exact_timings = []
+        for idx in queries[:50]:
+            t = time.perf_counter()
+            exact.top(int(idx), 10)
+            exact_timings.append((time.perf_counter() - t) * 1000)
+
+        for n_probe in args.probes:
+            index.n_probe = n_probe
+            timings = []
+            for idx in queries:
+                t = time.perf_counter()
+                index.top(int(idx), 10)
+                timings.append((time.perf_counter() - t) * 1000)
+            recall = recall_at_k(index, exact, queries)
+            print(
+                f"{n:>9} {n_probe:>8} {np.median(timings):>9.3f} "
+                f"{np.percentile(timings, 99):>9.3f} {np.median(exact_timings):>10.3f} "
+                f"{recall:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+So sánh thời gian khởi động và RSS của RecommendationService giữa định dạng
+artifact joblib và mmap (xem scripts/convert_artifacts.py).
+
+Mỗi cấu hình chạy trong một tiến trình con mới để đo cold start. RSS được tách
+thành RssAnon (bộ nhớ riêng của worker) và RssFile (trang file, dùng chung qua
+page cache giữa các worker) từ /proc/self/status, nên chỉ chạy được trên Linux.
+
+Chạy: python benchmarks/bench_artifact_load.py [--modes dense sparse topk]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CHILD_CODE = """
+import json, time
+start = time.perf_counter()
+from app.services.recommendation import RecommendationService
+service = RecommendationService()
+elapsed = time.perf_counter() - start
+# Chạm vào một hàng để tính cả chi phí trang được nạp khi truy vấn đầu tiên
+service.get_recommendations(int(service.course_ids[0]))
+status = {}
+with open("/proc/self/status") as f:
+    for line in f:
+        key, _, value = line.partition(":")
+        if key in ("VmRSS", "RssAnon", "RssFile"):
+            status[key] = int(value.split()[0]) / 1024
+print("RESULT " + json.dumps({"startup_s": elapsed, **status}))
+"""
+
+
+def run(artifact_format: str, mode: str) -> dict:
+    env = dict(os.environ, ARTIFACT_FORMAT=artifact_format, SIMILARITY_MODE=mode)
+    # Backend không cần CSDL để khởi tạo service, nhưng app.db vẫn đọc biến này
+    env.setdefault("DATABASE_URL", "sqlite://")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    line = next(l for l in output.splitlines() if l.startswith("RESULT "))
+    return json.loads(line[len("RESULT ") :])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", default=["dense", "sparse", "topk"])
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':>7} {'format':>7} {'startup (s)':>12} "
+        f"{'RSS (MB)':>9} {'anon (MB)':>10} {'file (MB)':>10}"
+    )
+    for mode in args.modes:
+        for artifact_format in ("joblib", "mmap"):
+            try:
+                r = run(artifact_format, mode)
+            except subprocess.CalledProcessError as e:
+                print(f"{mode:>7} {artifact_format:>7} FAILED: {e.stderr.strip()[-200:]}")
+                continue
+            print(
+                f"{mode:>7} {artifact_format:>7} {r['startup_s']:>12.3f} "
+                f"{r['VmRSS']:>9.1f} {r['RssAnon']:>10.1f} {r['RssFile']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
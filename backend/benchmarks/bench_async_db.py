@@ -0,0 +1,244 @@
+"""
+So sánh thông lượng (requests/s) của các endpoint đọc chạy async (AsyncSession)
+với cách cũ: handler `def` đồng bộ dùng SessionLocal trong threadpool.
+
+Script tạo một CSDL SQLite tạm với catalog tổng hợp (hoặc dùng --database-url,
+ví dụ PostgreSQL đã seed sẵn người dùng bench@example.com/pw), chạy uvicorn
+một worker trong tiến trình con rồi gọi mỗi endpoint với --concurrency client
+đồng thời. Các handler đồng bộ để so sánh được gắn dưới tiền tố /sync và gọi
+đúng các hàm crud/deps đồng bộ mà endpoint dùng trước đây.
+
+Lưu ý: aiosqlite chạy mỗi kết nối trong một thread riêng nên trên SQLite chênh
+lệch nhỏ hơn nhiều so với asyncpg trên PostgreSQL.
+
+Chạy: python benchmarks/bench_async_db.py [--concurrency 50 200] [--duration 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+EMAIL, PASSWORD = "bench@example.com", "pw"
+
+# (tên, đường dẫn async, đường dẫn sync tương ứng, cần token)
+ENDPOINTS = [
+    ("course list", "/api/v1/courses?limit=20", "/sync/courses?limit=20", False),
+    ("course detail", "/api/v1/courses/{id}", "/sync/courses/{id}", False),
+    ("users/me", "/api/v1/users/me", "/sync/users/me", True),
+]
+
+
+def build_app():
+    """App thật + các handler đồng bộ kiểu cũ dưới /sync."""
+    from typing import List
+
+    from fastapi import APIRouter, Depends, HTTPException
+    from sqlalchemy.orm import Session
+
+    from app.api.v1.deps import get_current_active_user, get_db
+    from app.crud import course as crud_course
+    from app.db import models
+    from app.main import app
+    from app.schemas import course as course_schema, user as user_schema
+
+    sync_router = APIRouter()
+
+    @sync_router.get("/courses", response_model=List[course_schema.Course])
+    def read_courses(
+        search: str = "", skip: int = 0, limit: int = 20, db: Session = Depends(get_db)
+    ):
+        return crud_course.get_courses(db, skip=skip, limit=limit, search=search)
+
+    @sync_router.get(
+        "/courses/{course_id}", response_model=course_schema.CourseWithSkills
+    )
+    def read_course_detail(course_id: int, db: Session = Depends(get_db)):
+        db_course = crud_course.get_course_by_id(db, course_id=course_id)
+        if db_course is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return db_course
+
+    @sync_router.get("/users/me", response_model=user_schema.User)
+    def read_users_me(current_user: models.User = Depends(get_current_active_user)):
+        return current_user
+
+    app.include_router(sync_router, prefix="/sync")
+    return app
+
+
+def seed(n_courses: int, n_skills: int):
+    from app.crud import user as crud_user
+    from app.db import models
+    from app.db.database import SessionLocal, engine
+    from app.schemas import user as user_schema
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    rng = random.Random(0)
+    skills = [models.Skill(skill_name=f"skill {i}") for i in range(n_skills)]
+    db.add_all(skills)
+    for i in range(n_courses):
+        course = models.Course(
+            course_name=f"Course {i}",
+            difficulty_level=rng.choice(["beginner", "intermediate", "advanced"]),
+            course_rating=round(rng.uniform(3, 5), 2),
+        )
+        course.skills = rng.sample(skills, rng.randint(1, 5))
+        db.add(course)
+    db.commit()
+    crud_user.create_user(db, user_schema.UserCreate(email=EMAIL, password=PASSWORD))
+    db.close()
+
+
+def serve(port: int):
+    import uvicorn
+
+    uvicorn.run(build_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+async def wait_ready(base_url: str, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError("Server không khởi động kịp.")
+
+
+async def run_load(base_url, path, headers, duration, concurrency, n_courses):
+    """
+    `concurrency` client gọi liên tục trong `duration` giây. Trả về (số request
+    thành công mỗi giây, số lỗi, số request còn treo khi hết giờ).
+    """
+    rng = random.Random(1)
+    ok = errors = in_flight = 0
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=duration
+    ) as client:
+
+        async def worker():
+            nonlocal ok, errors, in_flight
+            while True:
+                in_flight += 1
+                try:
+                    response = await client.get(
+                        path.format(id=rng.randint(1, n_courses))
+                    )
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                finally:
+                    in_flight -= 1
+                if response.status_code == 200:
+                    ok += 1
+                else:
+                    errors += 1
+
+        tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        await asyncio.sleep(duration)
+        stalled = in_flight
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return ok / duration, errors, stalled
+
+
+async def login(base_url: str) -> dict:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post(
+            "/api/v1/auth/login/token", data={"username": EMAIL, "password": PASSWORD}
+        )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def measure(args, env, path, needs_auth, concurrency):
+    """
+    Đo một endpoint trên một server mới: khi stack đồng bộ bị nghẽn, các
+    request còn xếp hàng trong server sẽ làm sai lệch các lần đo sau.
+    """
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(args.port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_ready(base_url)
+        headers = await login(base_url) if needs_auth else {}
+        # Khởi động để kết nối trong pool được mở sẵn
+        await run_load(base_url, path, headers, 2, concurrency, args.courses)
+        return await run_load(
+            base_url, path, headers, args.duration, concurrency, args.courses
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def bench(args, env):
+    print(
+        f"{'endpoint':<14} {'clients':>8} {'sync req/s':>11} {'async req/s':>12} "
+        f"{'speedup':>8}  lỗi/treo (sync, async)"
+    )
+    for name, async_path, sync_path, needs_auth in ENDPOINTS:
+        for concurrency in args.concurrency:
+            sync_rps, sync_errors, sync_stalled = await measure(
+                args, env, sync_path, needs_auth, concurrency
+            )
+            async_rps, async_errors, async_stalled = await measure(
+                args, env, async_path, needs_auth, concurrency
+            )
+            speedup = f"{async_rps / sync_rps:>7.2f}x" if sync_rps else f"{'-':>8}"
+            print(
+                f"{name:<14} {concurrency:>8} {sync_rps:>11.0f} {async_rps:>12.0f} "
+                f"{speedup}  {sync_errors}/{sync_stalled}, "
+                f"{async_errors}/{async_stalled}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--duration", type=float, default=20.0, help="giây mỗi lần đo")
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", help="Dùng CSDL có sẵn thay vì SQLite tạm")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    env = dict(os.environ)
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        db_file = os.path.join(tempfile.mkdtemp(), "bench_async.db")
+        env["DATABASE_URL"] = os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+        seed(args.courses, args.skills)
+
+    asyncio.run(bench(args, env))
+
+
+if __name__ == "__main__":
+    main()
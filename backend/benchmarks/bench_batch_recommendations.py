@@ -0,0 +1,148 @@
+"""
+So sánh gợi ý từng phần tử với gợi ý theo lô.
+
+1. Content-Based: lấy láng giềng cho B khóa học bằng B lần `top` (một request
+   cho mỗi khóa học như /recommendations/content-based/{id}) so với một lần
+   `top_many` (POST /recommendations/content-based/batch), với các backend
+   sparse / topk / dense trên TF-IDF tổng hợp.
+2. Lộ trình cá nhân hóa: plan_paths cho U người dùng trên một chỉ mục ứng
+   viên dùng chung, trong tiến trình so với pool --workers tiến trình.
+
+Chạy: python benchmarks/bench_batch_recommendations.py [--courses 50000]
+    [--batch 100 1000] [--users 20000] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.schemas.user import PathRequest
+from app.services.learning_path import plan_paths
+from app.services.path_scorer import PathScorer
+from app.services.similarity import (
+    DenseSimilarity,
+    SparseSimilarity,
+    TopKNeighborSimilarity,
+    build_topk_table,
+)
+from app.services.skill_index import CourseSkillIndex
+
+
+def synthetic_tfidf(n_courses: int, n_terms: int = 20000, terms_per_course: int = 40):
+    rng = np.random.default_rng(0)
+    rows = np.repeat(np.arange(n_courses), terms_per_course)
+    # Phân bố Zipf cho từ để các khóa học có từ chung như văn bản thật
+    cols = np.minimum(rng.zipf(1.3, rows.size) - 1, n_terms - 1)
+    matrix = sparse.csr_matrix(
+        (rng.random(rows.size, dtype=np.float32), (rows, cols)),
+        shape=(n_courses, n_terms),
+    )
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A.ravel()
+    return sparse.diags(1 / np.maximum(norms, 1e-12)) @ matrix
+
+
+def bench_similarity(name, backend, batch_sizes, k):
+    rng = np.random.default_rng(1)
+    for batch in batch_sizes:
+        rows = rng.choice(backend.n_items, size=batch, replace=False)
+        start = time.perf_counter()
+        singles = [backend.top(int(idx), k) for idx in rows]
+        single_s = time.perf_counter() - start
+        start = time.perf_counter()
+        many = backend.top_many(rows, k)
+        batch_s = time.perf_counter() - start
+        same = all(
+            np.array_equal(a[0], b[0]) and np.allclose(a[1], b[1])
+            for a, b in zip(singles, many)
+        )
+        print(
+            f"{name:<8} {batch:>6} {1000 * single_s:>11.1f} {1000 * batch_s:>10.1f} "
+            f"{single_s / batch_s:>7.1f}x {'ok' if same else 'KHÁC'}"
+        )
+
+
+def synthetic_index(n_courses: int, n_skills: int, skills_per_course: int = 5):
+    rng = np.random.default_rng(2)
+    rows = np.repeat(np.arange(n_courses), skills_per_course)
+    cols = rng.integers(0, n_skills, rows.size)
+    course_skills = sparse.csr_matrix(
+        (np.ones(rows.size, dtype=np.int8), (rows, cols)), shape=(n_courses, n_skills)
+    )
+    course_skills.data[:] = 1
+    index = CourseSkillIndex(
+        course_ids=np.arange(1, n_courses + 1, dtype=np.int64),
+        skill_ids=np.arange(1, n_skills + 1, dtype=np.int64),
+        skill_names=np.array([f"skill {i}" for i in range(n_skills)], dtype=object),
+        course_skills=course_skills,
+        difficulty_codes=rng.integers(0, 5, n_courses).astype(np.int8),
+        format_codes=rng.integers(0, 5, n_courses).astype(np.int8),
+        rating=rng.uniform(3, 5, n_courses),
+    )
+    # Rank tô-pô tổng hợp thay cho TopoTable
+    index.course_topo_rank = rng.uniform(0, 50, n_courses)
+    return index
+
+
+def synthetic_requests(n_users: int, n_skills: int):
+    rng = np.random.default_rng(3)
+    styles = ["visual", "read_write", "kinesthetic", "auditory", None]
+    return [
+        PathRequest(
+            user_id,
+            set(rng.integers(1, n_skills + 1, 10).tolist()),
+            set(rng.integers(1, n_skills + 1, 6).tolist()),
+            styles[user_id % len(styles)],
+        )
+        for user_id in range(n_users)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=50000)
+    parser.add_argument("--dense-courses", type=int, default=10000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'batch':>6} {'single ms':>11} {'batch ms':>10} {'speedup':>8}")
+    tfidf = synthetic_tfidf(args.courses)
+    bench_similarity("sparse", SparseSimilarity(tfidf), args.batch, args.k)
+    neighbors, scores = build_topk_table(tfidf, 50)
+    bench_similarity("topk", TopKNeighborSimilarity(neighbors, scores), args.batch, args.k)
+    small = SparseSimilarity(tfidf[: args.dense_courses])
+    dense = DenseSimilarity((small.matrix @ small.matrix_t).toarray())
+    bench_similarity("dense", dense, [b for b in args.batch if b <= args.dense_courses], args.k)
+
+    index = synthetic_index(args.courses, args.skills)
+    scorer = PathScorer()
+    requests = synthetic_requests(args.users, args.skills)
+    print(f"\nLộ trình: {args.users} người dùng, {args.courses} khóa học, {args.skills} kỹ năng")
+    start = time.perf_counter()
+    in_process = plan_paths(index, scorer, requests)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  trong tiến trình  {elapsed:>7.2f}s ({args.users / elapsed:.0f} người dùng/s)"
+    )
+    if args.workers > 1:
+        start = time.perf_counter()
+        pooled = plan_paths(index, scorer, requests, workers=args.workers)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {args.workers} tiến trình      {elapsed:>7.2f}s "
+            f"({args.users / elapsed:.0f} người dùng/s, "
+            f"{'khớp' if pooled == in_process else 'KHÁC'})"
+        )
+
+if __name__ == "__main__":
+    main()
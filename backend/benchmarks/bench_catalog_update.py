@@ -0,0 +1,123 @@
+"""
+So sánh cập nhật catalog tăng dần (CatalogUpdater) với việc tính lại toàn bộ.
+
+Catalog tổng hợp gồm N khóa học; sau khi "huấn luyện", thêm --added khóa học
+mới và sửa kỹ năng của --changed khóa học cũ rồi đồng bộ cho từng chế độ
+tương đồng. Kết quả tăng dần được so với việc tính lại toàn bộ trên cùng ma
+trận TF-IDF mà updater đang giữ (phải trùng khớp; so với fit_transform mới thì
+các điểm có thể lệch ở chữ số float32 cuối cùng).
+
+Chạy: python benchmarks/bench_catalog_update.py [--sizes 2000 10000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# skill_index import app.db; benchmark không truy cập CSDL nên SQLite trong bộ nhớ là đủ
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.services import similarity
+from app.services.catalog_update import CatalogUpdater, course_texts
+from app.services.skill_index import CourseSkillIndex
+
+
+def synthetic_index(skill_lists, skill_names, course_ids) -> CourseSkillIndex:
+    rows = np.repeat(np.arange(len(skill_lists)), [len(s) for s in skill_lists])
+    cols = np.concatenate(skill_lists)
+    course_skills = sparse.csr_matrix(
+        (np.ones(cols.size, dtype=np.int8), (rows, cols)),
+        shape=(len(skill_lists), len(skill_names)),
+    )
+    n = len(skill_lists)
+    return CourseSkillIndex(
+        course_ids=np.asarray(course_ids, dtype=np.int64),
+        skill_ids=np.arange(1, len(skill_names) + 1, dtype=np.int64),
+        skill_names=np.asarray(skill_names, dtype=object),
+        course_skills=course_skills,
+        difficulty_codes=np.zeros(n, dtype=np.int8),
+        format_codes=np.zeros(n, dtype=np.int8),
+        rating=np.zeros(n),
+    )
+
+
+def random_skill_lists(rng, n, n_skills):
+    return [
+        np.unique(np.minimum(rng.zipf(1.3, rng.integers(1, 9)), n_skills) - 1)
+        for _ in range(n)
+    ]
+
+
+def build_backend(mode, tfidf, k):
+    sim = similarity.SparseSimilarity(tfidf)
+    if mode == similarity.DENSE:
+        return similarity.DenseSimilarity((sim.matrix @ sim.matrix_t).toarray())
+    if mode == similarity.TOPK:
+        return similarity.TopKNeighborSimilarity(*similarity.build_topk_table(tfidf, k))
+    return sim
+
+
+def same_result(a, b) -> bool:
+    if isinstance(a, similarity.DenseSimilarity):
+        return np.allclose(a.matrix, b.matrix, atol=1e-5)
+    if isinstance(a, similarity.TopKNeighborSimilarity):
+        return np.allclose(a.scores, b.scores, atol=1e-5) and (
+            (a.neighbors == b.neighbors).mean() > 0.999
+        )
+    return abs(a.matrix - b.matrix).max() < 1e-5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--skills", type=int, default=3000)
+    parser.add_argument("--added", type=int, default=20)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--k", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    skill_names = [f"skill{i} topic{i % 97}" for i in range(args.skills)]
+    print(f"{'courses':>8} {'mode':>7} {'incremental (s)':>16} {'full (s)':>9} {'match':>6}")
+    for n in args.sizes:
+        skill_lists = random_skill_lists(rng, n, args.skills)
+        base = synthetic_index(skill_lists, skill_names, np.arange(1, n + 1))
+        vectorizer = TfidfVectorizer(stop_words="english")
+        tfidf = vectorizer.fit_transform(course_texts(base))
+
+        updated_lists = list(skill_lists) + random_skill_lists(rng, args.added, args.skills)
+        for row in rng.choice(n, args.changed, replace=False):
+            updated_lists[row] = random_skill_lists(rng, 1, args.skills)[0]
+        updated = synthetic_index(
+            updated_lists, skill_names, np.arange(1, n + args.added + 1)
+        )
+
+        for mode in (similarity.DENSE, similarity.SPARSE, similarity.TOPK):
+            backend = build_backend(mode, tfidf, args.k)
+            updater = CatalogUpdater(
+                vectorizer, tfidf, base.course_ids, oov_threshold=1.0
+            )
+            updater.sync(base, backend)
+
+            start = time.perf_counter()
+            update = updater.sync(updated, backend)
+            incremental = time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = build_backend(mode, updater.tfidf_matrix, args.k)
+            full = time.perf_counter() - start
+
+            match = same_result(update.backend, expected)
+            print(f"{n:>8} {mode:>7} {incremental:>16.3f} {full:>9.3f} {str(match):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Đo cold start của API: khởi động uvicorn trong tiến trình con mới rồi đo thời
+gian tới khi
+  - live:  cổng mở và /healthz trả 200 (bản cũ không có /healthz: dùng "/");
+  - ready: /readyz trả 200 (bản cũ: trùng với live, vì startup event chạy
+           xong trước khi uvicorn nhận kết nối);
+  - first: request gợi ý đầu tiên trả về.
+Kèm hồ sơ import (python -X importtime) của app.main: các module tốn nhiều
+thời gian import nhất.
+
+--app-dir cho phép đo một bản khác của backend, ví dụ bản trước thay đổi:
+    git worktree add /tmp/before <commit>
+    python benchmarks/bench_cold_start.py --app-dir /tmp/before/backend
+
+Chạy: python benchmarks/bench_cold_start.py [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return 0
+
+
+def wait_for(url: str, start: float, timeout: float, accept=(200,)) -> tuple:
+    while time.perf_counter() - start < timeout:
+        status = get_status(url)
+        if status in accept:
+            return time.perf_counter() - start, status
+        time.sleep(0.01)
+    raise TimeoutError(url)
+
+
+def cold_start(app_dir: str, env: dict, course_id: int, timeout: float) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=app_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        live, status = wait_for(f"{base}/healthz", start, timeout, accept=(200, 404))
+        if status == 404:
+            live, _ = wait_for(f"{base}/", start, timeout)
+        ready, status = wait_for(f"{base}/readyz", start, timeout, accept=(200, 404))
+        if status == 404:
+            ready = live
+        first, _ = wait_for(
+            f"{base}/api/v1/recommendations/content-based/{course_id}", start, timeout
+        )
+        return {"live": live, "ready": ready, "first": first}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def import_profile(app_dir: str, env: dict, top: int):
+    """Các module có thời gian import tích lũy lớn nhất và tổng thời gian import."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=app_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        # Tên được thụt 2 khoảng trắng cho mỗi cấp import lồng nhau
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        # Chỉ giữ module được import trực tiếp (cấp 0) và các module của app
+        if level == 0 or name == "app" or name.startswith("app."):
+            rows.append((int(cumulative), int(own), name))
+    rows.sort(reverse=True)
+    return wall, rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--app-dir", default=BACKEND_DIR)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--course-id", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:////tmp/bench_cold_start.db")
+
+    wall, modules = import_profile(args.app_dir, env, args.top)
+    print(f"import app.main: {wall:.2f}s (cả khởi động trình thông dịch)")
+    print(f"  {'tích lũy (ms)':>14} {'riêng (ms)':>11}  module")
+    for cumulative, own, name in modules:
+        print(f"  {cumulative / 1000:>14.1f} {own / 1000:>11.1f}  {name}")
+
+    runs = [cold_start(args.app_dir, env, args.course_id, args.timeout) for _ in range(args.runs)]
+    print(f"\nCold start uvicorn ({args.runs} lần, trung vị):")
+    for key in ("live", "ready", "first"):
+        values = [run[key] for run in runs]
+        print(f"  {key:<6} {statistics.median(values):>6.2f}s  ({', '.join(f'{v:.2f}' for v in values)})")
+
+
+if __name__ == "__main__":
+    main()
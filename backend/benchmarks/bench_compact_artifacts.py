@@ -0,0 +1,136 @@
+"""
+Bộ nhớ, độ trễ và chất lượng xếp hạng của artifact gọn (float32/float16/uint8,
+int32 id) so với cách làm trước đây.
+
+1. Tra id: pd.Series course_id -> hàng (`id in indices`, `indices[id]`) và
+   `course_data["id"].iloc[...]` cho chiều ngược lại, so với CourseIdIndex
+   (bảng đặc int32) và mảng hàng -> id int32.
+2. Điểm tương đồng: ma trận cosine dense và bảng top-K với từng kiểu lưu:
+   dung lượng, thời gian một lần `top` và recall@k so với float64
+   (app/services/artifacts.py: ranking_quality).
+
+Chạy: python benchmarks/bench_compact_artifacts.py [--courses 8000] [--k 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.services.artifacts import ranking_quality
+from app.services.id_index import CourseIdIndex, course_ids_array
+from app.services.similarity import (
+    DenseSimilarity,
+    SparseSimilarity,
+    TopKNeighborSimilarity,
+    build_topk_table,
+    encode_scores,
+)
+from bench_batch_recommendations import synthetic_tfidf
+
+
+def per_call_us(fn, args) -> float:
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return 1e6 * (time.perf_counter() - start) / len(args)
+
+
+def bench_ids(n_courses: int, n_lookups: int):
+    rng = np.random.default_rng(0)
+    # Id tự tăng có lỗ hổng (khóa học đã xóa), như trong CSDL
+    course_ids = np.sort(rng.choice(int(n_courses * 1.2), n_courses, replace=False)) + 1
+    course_data = pd.DataFrame({"id": course_ids, "course_name": "x"})
+    indices = pd.Series(np.arange(n_courses), index=course_ids).drop_duplicates()
+    queries = rng.choice(course_ids, n_lookups).tolist()
+    top_rows = rng.integers(0, n_courses, (n_lookups, 10))
+
+    def pandas_lookup(course_id):
+        if course_id in indices:
+            idx = indices[course_id]
+            return course_data["id"].iloc[top_rows[idx % n_lookups]].tolist()
+
+    index = CourseIdIndex(course_ids)
+    row_ids = course_ids_array(course_ids)
+
+    def array_lookup(course_id):
+        idx = index.row(course_id)
+        if idx >= 0:
+            return row_ids[top_rows[idx % n_lookups]].tolist()
+
+    assert all(pandas_lookup(c) == array_lookup(c) for c in queries[:1000])
+    pandas_mb = (
+        indices.memory_usage(index=True, deep=True)
+        + course_data["id"].memory_usage(index=True, deep=True)
+    ) / 2**20
+    array_mb = (index.nbytes + row_ids.nbytes) / 2**20
+    pandas_us = per_call_us(pandas_lookup, queries)
+    array_us = per_call_us(array_lookup, queries)
+    print(f"Tra id ({n_courses} khóa học, {n_lookups} lần tra, id -> hàng -> 10 id):")
+    print(f"  pandas Series + iloc      {pandas_us:>7.2f} µs/lần  {pandas_mb:>7.2f} MB")
+    print(
+        f"  CourseIdIndex + int32     {array_us:>7.2f} µs/lần  {array_mb:>7.2f} MB"
+        f"  ({pandas_us / array_us:.0f}x nhanh hơn)"
+    )
+
+
+def bench_scores(name, make_backend, reference, dtypes, rows, k):
+    for dtype in dtypes:
+        backend = make_backend(dtype)
+        latency = per_call_us(lambda idx: backend.top(int(idx), k), rows)
+        quality = ranking_quality(reference, backend, rows, k)
+        print(
+            f"  {name:<6} {dtype:<8} {backend.nbytes / 2**20:>8.1f} MB "
+            f"{latency:>9.1f} µs  recall@{k} {quality['recall']:.4f}  "
+            f"tie_recall {quality['tie_recall']:.4f}  "
+            f"sai số {quality['max_score_error']:.4f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=8000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--topk", type=int, default=50)
+    parser.add_argument("--sample", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    bench_ids(args.courses, args.lookups)
+
+    tfidf = synthetic_tfidf(args.courses)
+    sim = SparseSimilarity(tfidf)
+    cosine = (sim.matrix @ sim.matrix_t).toarray().astype(np.float64)
+    rows = np.random.default_rng(1).choice(args.courses, args.sample, replace=False)
+    dtypes = ["float64", "float32", "float16", "uint8"]
+
+    print(f"\nĐiểm tương đồng ({args.courses} khóa học, mẫu {args.sample} hàng):")
+    print(f"  {'chế độ':<6} {'kiểu':<8} {'bộ nhớ':>11} {'top()':>12}")
+    reference = DenseSimilarity(cosine)
+    bench_scores(
+        "dense",
+        lambda dtype: DenseSimilarity(encode_scores(cosine, dtype)),
+        reference,
+        dtypes,
+        rows,
+        args.k,
+    )
+    neighbors, scores = build_topk_table(tfidf, args.topk)
+    bench_scores(
+        "topk",
+        lambda dtype: TopKNeighborSimilarity(neighbors, encode_scores(scores, dtype)),
+        reference,
+        dtypes[1:],
+        rows,
+        args.k,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+So sánh cách trả đồ thị phụ thuộc kỹ năng cũ và mới qua ASGI (TestClient).
+
+Trên một DAG tổng hợp (mặc định 20k kỹ năng, 40k cạnh) đo trung vị độ trễ:
+  - old: node_link_data + JSON encoder của FastAPI cho mỗi request (cách cũ);
+  - new: bytes đã mã hóa sẵn của GraphView (identity và gzip);
+  - 304: client gửi lại ETag qua If-None-Match;
+  - ego / prerequisites: nx.ego_graph / nx.ancestors + node_link_data so với
+    BFS trên mảng CSR và nối các đoạn JSON đã mã hóa sẵn.
+Kèm kích thước payload (thô, gzip, br nếu có).
+
+Chạy: python benchmarks/bench_graph_endpoint.py [--nodes 20000] [--edges 40000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+import networkx as nx
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from networkx.readwrite import json_graph
+
+
+def synthetic_graph(n_nodes: int, n_edges: int) -> nx.DiGraph:
+    """DAG ngẫu nhiên: cạnh luôn đi từ kỹ năng có chỉ số nhỏ tới chỉ số lớn."""
+    rng = random.Random(0)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(f"skill {i}" for i in range(n_nodes))
+    while graph.number_of_edges() < n_edges:
+        u, v = sorted(rng.sample(range(n_nodes), 2))
+        graph.add_edge(f"skill {u}", f"skill {v}")
+    return graph
+
+
+def build_app(graph: nx.DiGraph, view) -> FastAPI:
+    from app.api.v1 import graph_endpoints
+
+    app = FastAPI()
+
+    @app.get("/old/dependency-graph")
+    def old_graph():
+        return json_graph.node_link_data(graph)
+
+    @app.get("/old/ego")
+    def old_ego(skill: str, radius: int = 1):
+        # Cùng ngữ nghĩa direction=both: kỹ năng sau và kỹ năng tiên quyết trong `radius` bước
+        nodes = set(nx.single_source_shortest_path_length(graph, skill, radius))
+        nodes |= set(
+            nx.single_source_shortest_path_length(graph.reverse(copy=False), skill, radius)
+        )
+        return json_graph.node_link_data(graph.subgraph(nodes))
+
+    @app.get("/old/prerequisites")
+    def old_prerequisites(skill: str):
+        nodes = nx.ancestors(graph, skill) | {skill}
+        return json_graph.node_link_data(graph.subgraph(nodes))
+
+    @app.get("/new/dependency-graph")
+    def new_graph(request: Request):
+        return graph_endpoints._graph_response(
+            request, view.body, view.digest, view.encoded
+        )
+
+    @app.get("/new/ego")
+    def new_ego(request: Request, skill: str, radius: int = 1):
+        nodes = view.ego(skill, radius, "both")
+        return graph_endpoints._subgraph_response(
+            request, view, nodes, f"ego|{skill}|{radius}|both"
+        )
+
+    @app.get("/new/prerequisites")
+    def new_prerequisites(request: Request, skill: str):
+        nodes = view.prerequisites([skill])
+        return graph_endpoints._subgraph_response(
+            request, view, nodes, f"prerequisites|{skill}|None"
+        )
+
+    return app
+
+
+def timed(client: TestClient, url: str, repeat: int, **kwargs):
+    """Trung vị (ms) và số byte nhận được của `repeat` request GET."""
+    samples, size = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, **kwargs)
+        samples.append(time.perf_counter() - start)
+        size = int(response.headers.get("content-length", len(response.content)))
+    return 1000 * statistics.median(samples), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--edges", type=int, default=40000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from app.services.graph_view import GraphView
+
+    graph = synthetic_graph(args.nodes, args.edges)
+    start = time.perf_counter()
+    view = GraphView(graph, "bench")
+    build_s = time.perf_counter() - start
+    stats = view.stats()
+    print(
+        f"{stats['nodes']} nút, {stats['edges']} cạnh; dựng GraphView {build_s:.2f}s; "
+        + ", ".join(f"{k}={v}" for k, v in stats.items() if k.startswith("bytes"))
+    )
+
+    # Kỹ năng có nhiều tổ tiên nhất trong một mẫu để đồ thị tiên quyết không tầm thường
+    sample = random.Random(1).sample(list(graph.nodes), 50)
+    skill = max(sample, key=lambda s: len(nx.ancestors(graph, s)))
+    identity = {"accept-encoding": "identity"}
+    gzip_only = {"accept-encoding": "gzip"}
+    client = TestClient(build_app(graph, view))
+    etag = client.get("/new/dependency-graph", headers=identity).headers["etag"]
+
+    cases = [
+        ("full old", "/old/dependency-graph", {}, identity),
+        ("full new", "/new/dependency-graph", {}, identity),
+        ("full new gzip", "/new/dependency-graph", {}, gzip_only),
+        ("full 304", "/new/dependency-graph", {}, {"if-none-match": etag}),
+        ("ego old", "/old/ego", {"skill": skill, "radius": 2}, identity),
+        ("ego new", "/new/ego", {"skill": skill, "radius": 2}, identity),
+        ("prereq old", "/old/prerequisites", {"skill": skill}, identity),
+        ("prereq new", "/new/prerequisites", {"skill": skill}, identity),
+    ]
+    print(f"Kỹ năng mẫu: {skill} ({len(nx.ancestors(graph, skill))} tổ tiên)")
+    print(f"\n{'case':<14} {'p50 ms':>9} {'bytes':>10}")
+    for name, url, params, headers in cases:
+        ms, size = timed(client, url, args.repeat, params=params, headers=headers)
+        print(f"{name:<14} {ms:>9.2f} {size:>10}")
+
+
+if __name__ == "__main__":
+    main()
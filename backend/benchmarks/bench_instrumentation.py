@@ -0,0 +1,145 @@
+"""
+Chi phí của việc đo đạc (app/core/metrics.py) và của log trên đường nóng.
+
+1. Lộ trình cá nhân hóa: plan_path cho U người dùng trên chỉ mục tổng hợp,
+   METRICS_ENABLED bật (3 span mỗi lộ trình) so với tắt.
+2. Log: 6 lệnh print() cũ của get_personalized_path (ghi stdout đồng bộ, ở đây
+   chuyển vào một file) so với logger.debug(...) khi cấp log là INFO/OFF.
+3. Middleware: một request ASGI tới endpoint rỗng, có và không có
+   MetricsMiddleware.
+
+Chạy: python benchmarks/bench_instrumentation.py [--users 20000] [--requests 20000]
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from bench_batch_recommendations import synthetic_index, synthetic_requests
+
+from app.core import config
+from app.core.metrics import SPAN_SECONDS, MetricsMiddleware
+from app.services.learning_path import plan_path
+from app.services.path_scorer import PathScorer
+
+
+def bench_spans(users: int, courses: int, skills: int):
+    index = synthetic_index(courses, skills)
+    scorer = PathScorer()
+    requests = synthetic_requests(users, skills)
+
+    def run():
+        start = time.perf_counter()
+        paths = [
+            plan_path(index, scorer, r.known_skill_ids, r.target_skill_ids, r.learning_style)
+            for r in requests
+        ]
+        return time.perf_counter() - start, paths
+
+    results = {}
+    for enabled in (False, True, False, True):
+        config.METRICS_ENABLED = enabled
+        elapsed, paths = run()
+        results.setdefault(enabled, []).append((elapsed, paths))
+    off = min(e for e, _ in results[False])
+    on = min(e for e, _ in results[True])
+    same = results[False][0][1] == results[True][0][1]
+    print(f"plan_path × {users} ({courses} khóa học)")
+    print(f"  không đo   {1e6 * off / users:>8.1f} µs/lộ trình")
+    print(
+        f"  có span    {1e6 * on / users:>8.1f} µs/lộ trình "
+        f"(+{100 * (on - off) / off:.1f}%, {'khớp' if same else 'KHÁC'})"
+    )
+    counts = {labels[0]: sum(c) for labels, (c, _) in SPAN_SECONDS.snapshot().items()}
+    print(f"  số mẫu span: {counts}")
+
+
+def bench_logging(n: int):
+    user_email, known, target, gap, path = "u@x.com", set(range(10)), set(range(6)), set(range(4)), list(range(20))
+
+    def with_print(out):
+        # Đúng các lệnh print cũ của get_personalized_path
+        print(f"Bắt đầu tạo lộ trình cá nhân hóa cho user: {user_email}", file=out)
+        print(f"Kỹ năng đã biết: {len(known)} skills", file=out)
+        print(f"Kỹ năng mục tiêu: {len(target)} skills", file=out)
+        print(f"Skill gap tìm thấy: {len(gap)} skills", file=out)
+        print(f"Đã tạo lộ trình với {len(path)} khóa học.", file=out)
+        out.flush()
+
+    logger = logging.getLogger("app.bench")
+    logger.addHandler(logging.StreamHandler(io.StringIO()))
+    logger.propagate = False
+
+    def with_logger():
+        logger.debug(
+            "User %s: %d kỹ năng đã biết, %d mục tiêu, gap %d -> lộ trình %d khóa học.",
+            1, len(known), len(target), len(gap), len(path),
+        )
+
+    with tempfile.TemporaryFile("w") as out:
+        start = time.perf_counter()
+        for _ in range(n):
+            with_print(out)
+        print_us = 1e6 * (time.perf_counter() - start) / n
+    print(f"\nLog trên đường nóng ({n} lần)")
+    print(f"  print() vào file          {print_us:>7.2f} µs/request")
+    for level, name in ((logging.INFO, "INFO"), (logging.CRITICAL + 1, "OFF")):
+        logger.setLevel(level)
+        start = time.perf_counter()
+        for _ in range(n):
+            with_logger()
+        print(f"  logger.debug, cấp {name:<5}   {1e6 * (time.perf_counter() - start) / n:>7.2f} µs/request")
+
+
+async def _empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _drive(app, n: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def bench_middleware(n: int):
+    config.METRICS_ENABLED = True
+    bare = asyncio.run(_drive(_empty_app, n))
+    wrapped = asyncio.run(_drive(MetricsMiddleware(_empty_app), n))
+    print(f"\nMiddleware ({n} request ASGI tới endpoint rỗng)")
+    print(f"  không middleware   {1e6 * bare / n:>7.2f} µs/request")
+    print(f"  MetricsMiddleware  {1e6 * wrapped / n:>7.2f} µs/request (+{1e6 * (wrapped - bare) / n:.2f} µs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--courses", type=int, default=50000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    bench_spans(args.users, args.courses, args.skills)
+    bench_logging(args.requests)
+    bench_middleware(args.requests)
+
+
+if __name__ == "__main__":
+    main()
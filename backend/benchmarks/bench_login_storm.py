@@ -0,0 +1,232 @@
+"""
+Đo ảnh hưởng của một "cơn bão" đăng nhập lên phần còn lại của API.
+
+bcrypt cố ý tốn CPU (~0.2-0.6 giây mỗi lần với cost 12). Trước đây endpoint
+đăng nhập là handler `def` đồng bộ nên mỗi lần verify chiếm một thread của
+threadpool; khi nhiều người đăng nhập cùng lúc, threadpool (và CPU) bị chiếm
+hết và các endpoint nhẹ cũng chậm theo. Endpoint mới chuyển bcrypt sang
+password_hasher: một pool tiến trình có giới hạn, trả 503 khi đầy.
+
+Script chạy uvicorn một worker, cho --storm client đăng nhập liên tục (qua
+route cũ dưới /legacy hoặc route mới) và đồng thời một client đo độ trễ của
+GET /api/v1/courses. Dòng "idle" là độ trễ khi không có ai đăng nhập.
+
+Chạy: python benchmarks/bench_login_storm.py [--storm 8 32] [--duration 15] \
+          [--hash-workers 1] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+# --------------------------------------------------------------------
+
+EMAIL, PASSWORD = "bench@example.com", "pw"
+LOGIN_PATHS = {
+    "legacy": "/legacy/login/token",
+    "pooled": "/api/v1/auth/login/token",
+}
+PROBE_PATH = "/api/v1/courses?limit=20"
+
+
+def build_app():
+    """App thật + route đăng nhập đồng bộ kiểu cũ dưới /legacy."""
+    from fastapi import APIRouter, Depends, HTTPException
+    from fastapi.security import OAuth2PasswordRequestForm
+    from sqlalchemy.orm import Session
+
+    from app.api.v1.deps import get_db
+    from app.core.security import create_access_token, verify_password
+    from app.crud import user as crud_user
+    from app.main import app
+
+    legacy_router = APIRouter()
+
+    @legacy_router.post("/login/token")
+    def legacy_login(
+        form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    ):
+        user = crud_user.get_user_by_email(db, email=form_data.username)
+        if not user or not verify_password(form_data.password, user.hashed_password):
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        access_token = create_access_token(
+            data={"sub": str(user.id), "email": user.email}
+        )
+        return {"access_token": access_token, "token_type": "bearer"}
+
+    app.include_router(legacy_router, prefix="/legacy")
+    return app
+
+
+def seed():
+    from app.crud import user as crud_user
+    from app.db import models
+    from app.db.database import SessionLocal, engine
+    from app.schemas import user as user_schema
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all(
+        models.Course(course_name=f"Course {i}", course_rating=4.0) for i in range(200)
+    )
+    db.commit()
+    crud_user.create_user(db, user_schema.UserCreate(email=EMAIL, password=PASSWORD))
+    db.close()
+
+
+def start_server(args, env) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "--factory",
+            "benchmarks.bench_login_storm:build_app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", "1", "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 180.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError("Server không khởi động kịp.")
+
+
+async def run_storm(base_url, login_path, storm, duration):
+    """
+    `storm` client đăng nhập liên tục, song song với một client đo độ trễ
+    PROBE_PATH. Trả về (số lần đăng nhập thành công, số 503, độ trễ probe).
+    """
+    logins = rejected = 0
+    probe_latencies = []
+    limits = httpx.Limits(max_connections=storm + 1, max_keepalive_connections=storm + 1)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=duration + 30
+    ) as client:
+
+        async def login_client():
+            nonlocal logins, rejected
+            form = {"username": EMAIL, "password": PASSWORD}
+            while True:
+                try:
+                    response = await client.post(login_path, data=form)
+                except httpx.HTTPError:
+                    continue
+                if response.status_code == 200:
+                    logins += 1
+                elif response.status_code == 503:
+                    # Client tôn trọng Retry-After như một client thật
+                    rejected += 1
+                    await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+        async def probe_client():
+            while True:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(PROBE_PATH)
+                except httpx.HTTPError:
+                    continue
+                if response.status_code == 200:
+                    probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        tasks = [asyncio.create_task(login_client()) for _ in range(storm)]
+        tasks.append(asyncio.create_task(probe_client()))
+        await asyncio.sleep(duration)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return logins, rejected, probe_latencies
+
+
+def percentile_ms(values, q: int) -> float:
+    if len(values) < 2:
+        return 1000 * values[0] if values else float("nan")
+    return 1000 * statistics.quantiles(values, n=100)[q - 1]
+
+
+async def measure(args, env, mode, storm):
+    """Mỗi lần đo dùng một server mới để request còn treo không ảnh hưởng lần sau."""
+    server = start_server(args, env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_ready(base_url)
+        login_path = LOGIN_PATHS.get(mode, LOGIN_PATHS["pooled"])
+        return await run_storm(base_url, login_path, storm, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def bench(args, env):
+    print(
+        f"bcrypt rounds={args.rounds} hash workers={args.hash_workers} "
+        f"max pending={args.max_pending} cpu={os.cpu_count()}"
+    )
+    print(
+        f"{'mode':<7} {'storm':>5} {'logins/s':>9} {'503/s':>6} "
+        f"{'probe p50 ms':>13} {'probe p95 ms':>13} {'probe n':>8}"
+    )
+    runs = [("idle", 0)] + [
+        (mode, storm) for storm in args.storm for mode in ("legacy", "pooled")
+    ]
+    for mode, storm in runs:
+        logins, rejected, probe = await measure(args, env, mode, storm)
+        print(
+            f"{mode:<7} {storm:>5} {logins / args.duration:>9.1f} "
+            f"{rejected / args.duration:>6.1f} {percentile_ms(probe, 50):>13.1f} "
+            f"{percentile_ms(probe, 95):>13.1f} {len(probe):>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--storm", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--duration", type=float, default=15.0, help="giây mỗi lần đo")
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS")
+    parser.add_argument("--hash-workers", type=int, default=1)
+    parser.add_argument("--max-pending", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--database-url", help="Dùng CSDL có sẵn thay vì SQLite tạm")
+    args = parser.parse_args()
+
+    # Đặt trước khi import app để seed() băm mật khẩu với đúng cost
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        PASSWORD_HASH_WORKERS=str(args.hash_workers),
+        PASSWORD_HASH_MAX_PENDING=str(args.max_pending),
+        MODEL_WATCH_INTERVAL_SECONDS="0",
+    )
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        db_file = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+        env["DATABASE_URL"] = os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+        seed()
+
+    asyncio.run(bench(args, env))
+
+
+if __name__ == "__main__":
+    main()
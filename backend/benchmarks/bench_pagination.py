@@ -0,0 +1,166 @@
+"""
+So sánh độ trễ phân trang OFFSET với phân trang keyset (cursor) theo độ sâu.
+
+Script tạo catalog tổng hợp (mặc định 100k khóa học) trong SQLite tạm hoặc
+--database-url, rồi với mỗi độ sâu (số hàng đứng trước trang) đo:
+  - offset: get_course_page(skip=độ sâu), cách cũ của /courses;
+  - keyset: get_course_page(after=khóa của hàng ngay trước trang);
+cho cả danh sách khóa học và kết quả tìm kiếm một từ phổ biến. Cuối cùng đo
+thông lượng xuất toàn bộ catalog qua iter_courses (endpoint /courses/export).
+
+Chạy: python benchmarks/bench_pagination.py [--courses 100000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+WORDS = [
+    "python", "data", "machine", "learning", "web", "design", "cloud", "security",
+    "network", "mobile", "analytics", "statistics", "finance", "marketing", "java",
+]
+
+
+def seed(n_courses: int):
+    from sqlalchemy import insert
+
+    from app.db import models
+    from app.db.database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    db = SessionLocal()
+    for start in range(0, n_courses, 10000):
+        db.execute(
+            insert(models.Course),
+            [
+                {
+                    "course_name": " ".join(rng.choices(WORDS, k=4)).title(),
+                    "course_description": " ".join(rng.choices(WORDS, k=20)),
+                    "course_rating": round(rng.uniform(3, 5), 2),
+                }
+                for _ in range(start, min(n_courses, start + 10000))
+            ],
+        )
+    db.commit()
+    db.close()
+
+
+def timed(fn, repeat: int) -> float:
+    """Trung vị (ms) của `repeat` lần gọi."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return 1000 * statistics.median(samples)
+
+
+def walk_keys(get_page, depths, limit):
+    """Khóa keyset ngay trước mỗi độ sâu, lấy bằng cách đi hết danh sách theo cursor."""
+    keys, after, seen = {0: None}, None, 0
+    targets = sorted(d for d in depths if d > 0)
+    while targets:
+        page = get_page(limit=limit, after=after)
+        if not page.items:
+            break
+        seen += len(page.items)
+        after = page.next_key
+        while targets and targets[0] <= seen:
+            # Độ sâu là bội số của `limit` nên trang kết thúc đúng tại đó
+            keys[targets.pop(0)] = after
+        if after is None:
+            break
+    return keys
+
+
+def bench_listing(name, get_page, depths, limit, repeat):
+    keys = walk_keys(get_page, depths, limit)
+    for depth in depths:
+        if depth not in keys:
+            continue
+        offset_ms = timed(lambda: get_page(limit=limit, skip=depth), repeat)
+        keyset_ms = timed(lambda: get_page(limit=limit, after=keys[depth]), repeat)
+        print(f"{name:<8} {depth:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+
+async def bench_export():
+    from app.crud import async_course as async_crud_course
+    from app.db.database import AsyncSessionLocal
+    from app.schemas import course as schemas
+
+    rows = 0
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        async for batch in async_crud_course.iter_courses(db):
+            for course in batch:
+                schemas.Course.model_validate(
+                    course, from_attributes=True
+                ).model_dump_json()
+            rows += len(batch)
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nExport NDJSON: {rows} khóa học trong {elapsed:.1f}s "
+        f"({rows / elapsed:.0f} hàng/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[0, 1000, 10000, 50000, 99000]
+    )
+    parser.add_argument("--database-url", help="CSDL trống để seed thay vì SQLite tạm")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        db_file = os.path.join(tempfile.mkdtemp(), "bench_pagination.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+    from app.crud import course as crud_course
+    from app.db.database import SessionLocal
+
+    seed(args.courses)
+    db = SessionLocal()
+
+    def course_page(**kwargs):
+        return crud_course.get_course_page(db, **kwargs)
+
+    def search_page(**kwargs):
+        return crud_course.get_course_page(db, search="python", **kwargs)
+
+    n_matches = len(
+        crud_course.get_course_page(db, limit=10**9, search="python").items
+    )
+    print(
+        f"{args.courses} khóa học; 'python' khớp {n_matches}; "
+        f"mỗi trang {args.limit} hàng"
+    )
+    print(f"\n{'listing':<8} {'depth':>8} {'offset ms':>10} {'keyset ms':>10}")
+    bench_listing("courses", course_page, args.depths, args.limit, args.repeat)
+    bench_listing(
+        "search",
+        search_page,
+        [d for d in args.depths if d < n_matches],
+        args.limit,
+        args.repeat,
+    )
+    db.close()
+    asyncio.run(bench_export())
+
+
+if __name__ == "__main__":
+    main()
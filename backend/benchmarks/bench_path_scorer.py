@@ -0,0 +1,85 @@
+"""
+Micro-benchmark cho bước chấm điểm của get_personalized_path.
+
+So sánh vòng lặp cũ (một dict cho mỗi ứng viên + sort toàn bộ) với PathScorer
+(chấm điểm theo cột) + lex_top_k trên số lượng ứng viên khác nhau.
+
+Chạy: python benchmarks/bench_path_scorer.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.services.path_scorer import DIFFICULTY_CODES, FORMAT_CODES, PathScorer
+from app.services.topk import lex_top_k
+
+DIFFICULTIES = list(DIFFICULTY_CODES)
+FORMATS = list(FORMAT_CODES)
+
+
+def legacy_score(courses, k: int):
+    """Vòng lặp chấm điểm cũ, giữ lại để so sánh."""
+    difficulty_order = {"beginner": 0, "intermediate": 1, "mixed": 2, "advanced": 3}
+    scored = []
+    for course in courses:
+        score = course["matching"] * 10
+        if course["difficulty"] == "beginner":
+            score += 5
+        elif course["difficulty"] == "intermediate":
+            score += 2
+        score += course["rating"]
+        scored.append(
+            {"id": course["id"], "score": score, "difficulty": course["difficulty"]}
+        )
+    scored.sort(key=lambda x: (difficulty_order.get(x["difficulty"], 99), -x["score"]))
+    return [c["id"] for c in scored[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scorer = PathScorer()
+    print(f"{'candidates':>11} {'legacy (ms)':>12} {'columnar (ms)':>14}")
+    for n in args.sizes:
+        overlap = rng.integers(1, 4, n)
+        difficulty = rng.integers(0, len(DIFFICULTIES), n).astype(np.int8)
+        formats = rng.integers(0, len(FORMATS), n).astype(np.int8)
+        rating = rng.uniform(3, 5, n)
+        courses = [
+            {
+                "id": i,
+                "matching": int(overlap[i]),
+                "difficulty": DIFFICULTIES[difficulty[i]],
+                "rating": float(rating[i]),
+            }
+            for i in range(n)
+        ]
+
+        start = time.perf_counter()
+        for _ in range(max(1, args.repeat // 5)):
+            legacy_score(courses, args.k)
+        legacy_ms = (time.perf_counter() - start) * 1000 / max(1, args.repeat // 5)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            scores = scorer.score(overlap, difficulty, formats, rating, "visual")
+            lex_top_k((difficulty, -scores), args.k)
+        fast_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+        print(f"{n:>11} {legacy_ms:>12.2f} {fast_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Load test cho pool kết nối: tìm số client đồng thời mà tại đó pool bão hòa,
+với số worker uvicorn khác nhau.
+
+Mỗi request tới endpoint /bench/hold giữ một kết nối trong --hold-ms ms (giả
+lập một truy vấn chậm), nên sức chứa lý thuyết của server là
+workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW) request cùng lúc và
+capacity / hold giây request mỗi giây. Khi số client vượt sức chứa, thông
+lượng đi ngang, thời gian chờ checkout (đọc từ GET /api/v1/admin/db/pool của
+từng worker) tăng vọt và cuối cùng xuất hiện lỗi timeout của pool.
+
+Chạy: python benchmarks/bench_pool_saturation.py [--workers 1 2] \
+          [--concurrency 5 10 20 40 80] [--pool-size 2] [--max-overflow 2]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+# --------------------------------------------------------------------
+
+ADMIN_TOKEN = "bench-pool"
+
+
+def build_app():
+    """App thật + endpoint giữ kết nối CSDL trong `ms` mili giây."""
+    from sqlalchemy import text
+
+    from app.db.database import AsyncSessionLocal
+    from app.main import app
+
+    @app.get("/bench/hold")
+    async def hold_connection(ms: float = 50):
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+            await asyncio.sleep(ms / 1000)
+        return {"ok": True}
+
+    return app
+
+
+def start_server(args, workers: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        ADMIN_TOKEN=ADMIN_TOKEN,
+        DB_POOL_SIZE=str(args.pool_size),
+        DB_MAX_OVERFLOW=str(args.max_overflow),
+        DB_POOL_TIMEOUT=str(args.pool_timeout),
+        MODEL_WATCH_INTERVAL_SECONDS="0",
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "--factory",
+            "benchmarks.bench_pool_saturation:build_app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 180.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/bench/hold?ms=0")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError("Server không khởi động kịp.")
+
+
+async def pool_stats(base_url: str, workers: int) -> dict:
+    """
+    Số liệu pool async của từng worker, theo pid. Mỗi request mở kết nối mới
+    để được phân phối tới các worker khác nhau.
+    """
+    stats = {}
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"X-Admin-Token": ADMIN_TOKEN}, limits=limits
+    ) as client:
+        for _ in range(20 * workers):
+            data = (await client.get("/api/v1/admin/db/pool")).json()["async"]
+            stats[data["pid"]] = data
+            if len(stats) == workers:
+                break
+    return stats
+
+
+def delta(before: dict, after: dict, key: str) -> float:
+    return sum(after[pid][key] - before.get(pid, {}).get(key, 0) for pid in after)
+
+
+async def run_load(base_url, hold_ms, duration, concurrency):
+    """`concurrency` client gọi liên tục trong `duration` giây."""
+    latencies, errors = [], 0
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=duration
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            while True:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(f"/bench/hold?ms={hold_ms}")
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        await asyncio.sleep(duration)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return latencies, errors
+
+
+async def bench(args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    per_worker = args.pool_size + args.max_overflow
+    print(
+        f"pool_size={args.pool_size} max_overflow={args.max_overflow} "
+        f"hold={args.hold_ms}ms"
+    )
+    print(
+        f"{'workers':>7} {'clients':>7} {'capacity':>8} {'max req/s':>9} "
+        f"{'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'wait ms':>8} "
+        f"{'overflow':>8} {'errors':>6}"
+    )
+    for workers in args.workers:
+        capacity = workers * per_worker
+        server = start_server(args, workers)
+        try:
+            await wait_ready(base_url)
+            for concurrency in args.concurrency:
+                before = await pool_stats(base_url, workers)
+                latencies, errors = await run_load(
+                    base_url, args.hold_ms, args.duration, concurrency
+                )
+                # Chờ các request còn treo trả kết nối trước khi đọc số liệu
+                await asyncio.sleep(args.hold_ms / 1000 + 0.5)
+                after = await pool_stats(base_url, workers)
+                checkouts = delta(before, after, "checkouts")
+                wait_ms = (
+                    1000 * delta(before, after, "checkout_seconds_sum") / checkouts
+                    if checkouts
+                    else 0.0
+                )
+                errors += int(delta(before, after, "timeouts"))
+                if latencies:
+                    p50 = 1000 * statistics.median(latencies)
+                    p95 = 1000 * statistics.quantiles(latencies, n=20)[-1]
+                else:
+                    p50 = p95 = float("nan")
+                print(
+                    f"{workers:>7} {concurrency:>7} {capacity:>8} "
+                    f"{capacity * 1000 / args.hold_ms:>9.0f} "
+                    f"{len(latencies) / args.duration:>7.0f} {p50:>7.0f} {p95:>7.0f} "
+                    f"{wait_ms:>8.1f} {int(delta(before, after, 'overflow_connects')):>8} "
+                    f"{errors:>6}"
+                    + ("" if len(after) == workers else f"  ({len(after)} worker)")
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[2, 4, 8, 16, 32, 64]
+    )
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--max-overflow", type=int, default=2)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--hold-ms", type=float, default=50.0)
+    parser.add_argument("--duration", type=float, default=8.0, help="giây mỗi lần đo")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--database-url", help="Dùng CSDL có sẵn thay vì SQLite tạm")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        db_file = os.path.join(tempfile.mkdtemp(), "bench_pool.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+        from app.db import models
+        from app.db.database import engine
+
+        models.Base.metadata.create_all(bind=engine)
+
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark tìm kiếm khóa học khi người dùng gõ từng ký tự (as-you-type).
+
+Script tạo catalog tổng hợp (mặc định 100k khóa học, tên/mô tả/kỹ năng sinh từ
+một từ vựng theo phân phối Zipf) trong một CSDL SQLite tạm hoặc trong
+--database-url, rồi phát lại các chuỗi truy vấn như người dùng đang gõ
+("p", "py", "pyt", ..., "python da"), mỗi truy vấn lấy 20 kết quả, so sánh:
+  - ilike: cách cũ, `course_name ILIKE '%term%'` (quét toàn bảng, chỉ khớp tên);
+  - search: crud.course.get_courses với chỉ mục mới (BM25 trong bộ nhớ trên
+    SQLite, tsvector + GIN trên PostgreSQL), gồm cả truy vấn lấy các hàng.
+
+Chạy: python benchmarks/bench_search.py [--courses 100000] [--sequences 30]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+SYLLABLES = [
+    "da", "ta", "py", "thon", "ma", "chi", "ne", "lear", "ning", "web", "de",
+    "vel", "op", "ment", "cloud", "net", "work", "se", "cu", "ri", "ty", "ana",
+    "ly", "tics", "de", "sign", "mo", "bile", "sta", "tis", "al", "go", "rithm",
+]
+
+
+def make_vocabulary(n_words: int, rng: random.Random):
+    words = set()
+    while len(words) < n_words:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))))
+    return sorted(words)
+
+
+def zipf_sampler(words, rng: random.Random):
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    shuffled = words[:]
+    rng.shuffle(shuffled)
+
+    def sample(k):
+        return rng.choices(shuffled, weights=weights, k=k)
+
+    return sample, shuffled
+
+
+def seed(n_courses: int, n_skills: int, desc_words: int):
+    from sqlalchemy import insert
+
+    from app.db import models
+    from app.db.database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    sample, ranked = zipf_sampler(make_vocabulary(5000, rng), rng)
+    skill_names = sorted({" ".join(sample(2)) for _ in range(n_skills * 2)})[:n_skills]
+
+    db = SessionLocal()
+    db.execute(
+        insert(models.Skill),
+        [{"id": i + 1, "skill_name": name} for i, name in enumerate(skill_names)],
+    )
+    batch = 10000
+    for start in range(0, n_courses, batch):
+        ids = range(start + 1, min(n_courses, start + batch) + 1)
+        db.execute(
+            insert(models.Course),
+            [
+                {
+                    "id": course_id,
+                    "course_name": " ".join(sample(rng.randint(2, 6))).title(),
+                    "course_description": " ".join(sample(desc_words)),
+                    "course_rating": round(rng.uniform(3, 5), 2),
+                }
+                for course_id in ids
+            ],
+        )
+        db.execute(
+            insert(models.course_skills_association),
+            [
+                {"course_id": course_id, "skill_id": skill_id}
+                for course_id in ids
+                for skill_id in rng.sample(range(1, len(skill_names) + 1), rng.randint(1, 5))
+            ],
+        )
+    db.commit()
+    db.close()
+    return ranked
+
+
+def typing_sequences(ranked_words, n_sequences: int, rng: random.Random):
+    """Mỗi chuỗi là các tiền tố của một cụm 1-2 từ phổ biến, từng ký tự một."""
+    sequences = []
+    common = ranked_words[:300]
+    for _ in range(n_sequences):
+        phrase = " ".join(rng.sample(common, rng.randint(1, 2)))
+        sequences.append([phrase[:i] for i in range(1, len(phrase) + 1)])
+    return sequences
+
+
+def legacy_search(db, term: str, limit: int):
+    from sqlalchemy import select
+
+    from app.db import models
+
+    return (
+        db.execute(
+            select(models.Course)
+            .where(models.Course.course_name.ilike(f"%{term}%"))
+            .limit(limit)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def measure(fn, sequences, limit):
+    latencies, hits = [], 0
+    for sequence in sequences:
+        for term in sequence:
+            start = time.perf_counter()
+            results = fn(term, limit)
+            latencies.append(time.perf_counter() - start)
+            hits += bool(results)
+    return latencies, hits
+
+
+def report(name, latencies, hits):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<8} {len(latencies):>8} {1000 * statistics.median(latencies):>8.2f} "
+        f"{1000 * quantiles[94]:>8.2f} {1000 * quantiles[98]:>8.2f} "
+        f"{1000 * max(latencies):>8.2f} {hits:>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=100000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--desc-words", type=int, default=40)
+    parser.add_argument("--sequences", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--database-url", help="CSDL trống để seed thay vì SQLite tạm")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        db_file = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+    from app.crud import course as crud_course
+    from app.db.database import SessionLocal
+    from app.services.search import course_search
+
+    start = time.perf_counter()
+    ranked = seed(args.courses, args.skills, args.desc_words)
+    print(f"Seed {args.courses} khóa học: {time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    index = course_search.get(db)
+    if not index.in_database:
+        size_mb = (index.rows.nbytes + index.weights.nbytes + index.indptr.nbytes) / 2**20
+        print(f"Posting list: {size_mb:.1f} MB (chưa tính từ vựng)")
+
+    sequences = typing_sequences(ranked, args.sequences, random.Random(1))
+    print(
+        f"\n{'method':<8} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'non-empty':>10}"
+    )
+    report("ilike", *measure(lambda t, k: legacy_search(db, t, k), sequences, args.limit))
+    report(
+        "search",
+        *measure(
+            lambda t, k: crud_course.get_courses(db, limit=k, search=t),
+            sequences,
+            args.limit,
+        ),
+    )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
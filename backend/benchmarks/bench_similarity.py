@@ -0,0 +1,84 @@
+"""
+So sánh bộ nhớ và độ trễ của các chế độ tương đồng (SIMILARITY_MODE):
+dense (ma trận N×N), sparse (tính khi cần từ TF-IDF) và topk (bảng láng giềng).
+
+Dữ liệu là ma trận TF-IDF ngẫu nhiên có độ thưa tương tự dữ liệu thật
+(vài kỹ năng cho mỗi khóa học). Chế độ dense bị bỏ qua khi ma trận N×N vượt
+quá --dense-limit-mb, khi đó chỉ in ra dung lượng lý thuyết.
+
+Chạy: python benchmarks/bench_similarity.py [--sizes 3000 20000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.services import similarity
+
+
+def random_tfidf(n_courses: int, n_terms: int, terms_per_course: int, seed: int = 0):
+    """Tạo ma trận TF-IDF thưa ngẫu nhiên, đã chuẩn hóa L2 như TfidfVectorizer."""
+    rng = np.random.default_rng(seed)
+    # Phân bố Zipf để một số kỹ năng phổ biến hơn hẳn, giống dữ liệu thật
+    cols = np.minimum(rng.zipf(1.3, n_courses * terms_per_course), n_terms) - 1
+    rows = np.repeat(np.arange(n_courses), terms_per_course)
+    data = rng.random(cols.size).astype(np.float32)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n_courses, n_terms))
+    matrix.sum_duplicates()
+    return normalize(matrix)
+
+
+def time_queries(backend, queries, k: int) -> float:
+    """Trả về độ trễ trung vị (ms) của một truy vấn top-K."""
+    timings = []
+    for idx in queries:
+        start = time.perf_counter()
+        backend.top(int(idx), k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3000, 20000, 100000])
+    parser.add_argument("--terms", type=int, default=5000)
+    parser.add_argument("--terms-per-course", type=int, default=8)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--table-k", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dense-limit-mb", type=int, default=2048)
+    args = parser.parse_args()
+
+    print(f"{'courses':>9} {'mode':>7} {'memory (MB)':>12} {'p50 (ms)':>10}")
+    for n in args.sizes:
+        tfidf = random_tfidf(n, args.terms, args.terms_per_course)
+        queries = np.random.default_rng(1).integers(n, size=args.queries)
+
+        backends = [similarity.SparseSimilarity(tfidf)]
+        neighbors, scores = similarity.build_topk_table(tfidf, args.table_k)
+        backends.append(similarity.TopKNeighborSimilarity(neighbors, scores))
+
+        dense_mb = n * n * 8 / 1024**2
+        if dense_mb <= args.dense_limit_mb:
+            dense = (tfidf @ tfidf.T).toarray().astype(np.float64)
+            backends.insert(0, similarity.DenseSimilarity(dense))
+        else:
+            print(f"{n:>9} {'dense':>7} {dense_mb:>12.1f} {'skipped':>10}")
+
+        for backend in backends:
+            latency = time_queries(backend, queries, args.k)
+            print(
+                f"{n:>9} {backend.mode:>7} {backend.nbytes / 1024**2:>12.1f} {latency:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
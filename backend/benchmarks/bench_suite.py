@@ -0,0 +1,773 @@
+"""
+Bộ benchmark tái lập được cho API gợi ý, kết quả ghi ra JSON để so sánh giữa
+các commit.
+
+Các lệnh:
+  seed     Tạo catalog tổng hợp (khóa học, kỹ năng, cạnh phụ thuộc giữa các kỹ
+           năng, người dùng có khảo sát và tiến độ) trong SQLite (mặc định, nằm
+           trong --workdir) hoặc PostgreSQL (--database-url; CSDL phải trống,
+           hoặc thêm --reset để xóa và tạo lại bảng), cùng artifact model mmap
+           khớp với catalog: TF-IDF theo kỹ năng, bảng top-K và đồ thị kỹ năng.
+  run      Chạy micro-benchmark các phương thức của RecommendationService
+           trong tiến trình này, rồi khởi động uvicorn trên dữ liệu đã seed và
+           phát lại một tỉ lệ request (/courses, tìm kiếm, chi tiết, content-based,
+           lộ trình cá nhân hóa, skill-gap analytics) với --concurrency client
+           trong --duration giây. Báo cáo thông lượng, p50/p95/p99 và số câu
+           lệnh SQL mỗi request (lấy từ /metrics) cho từng endpoint. Tự seed
+           nếu --workdir chưa có dữ liệu với đúng tham số.
+  compare  So sánh hai file JSON; thoát với mã 1 nếu một chỉ số xấu đi quá
+           --threshold (dùng được trong CI).
+
+Cùng --seed và tham số thì cùng dữ liệu và cùng chuỗi request. Trình tạo tải
+chạy trên cùng máy với server nên chia CPU với nó: chỉ so sánh các kết quả đo
+trên cùng một máy.
+
+Chạy:
+    python benchmarks/bench_suite.py run [--courses 5000] [--users 2000]
+        [--concurrency 16] [--duration 30] [--output bench.json]
+    python benchmarks/bench_suite.py compare base.json bench.json [--threshold 0.1]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+# --------------------------------------------------------------------
+
+DATASET_FILE = "bench_dataset.json"
+PASSWORD = "pw"
+DIFFICULTIES = ["beginner", "intermediate", "advanced", "mixed"]
+FORMATS = ["video_heavy", "text_heavy", "project_based", "mixed"]
+STYLES = ["visual", "read_write", "kinesthetic", "auditory", None]
+# Từ dùng cho tên khóa học và truy vấn tìm kiếm
+WORDS = (
+    "python data web machine learning deep network cloud security design "
+    "analysis statistics java react database systems algorithms mobile devops "
+    "finance marketing business writing leadership project management biology "
+    "chemistry physics calculus linear algebra visualization excel sql spark"
+).split()
+
+# Tỉ lệ request mặc định: tên -> (mẫu đường dẫn, cần token, trọng số)
+ENDPOINTS = {
+    "courses": ("/api/v1/courses?limit=20", False, 25),
+    "courses_search": ("/api/v1/courses?search={word}&limit=20", False, 10),
+    "course_detail": ("/api/v1/courses/{course_id}", False, 20),
+    "content_based": ("/api/v1/recommendations/content-based/{course_id}", False, 20),
+    "personalized_path": ("/api/v1/users/me/personalized-path", True, 15),
+    "skill_gap_analytics": ("/api/v1/users/me/skill-gap-analytics", True, 10),
+}
+
+# Chỉ số dùng khi so sánh: (đường dẫn trong JSON, True nếu lớn hơn là tốt hơn)
+COMPARED = (("throughput_rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+
+
+# ---- Dữ liệu tổng hợp ----
+
+
+def dataset_params(args) -> Dict:
+    return {
+        "seed": args.seed,
+        "courses": args.courses,
+        "skills": args.skills,
+        "edges": args.edges,
+        "users": args.users,
+        "progress": args.progress,
+        "topk": args.topk,
+    }
+
+
+def bench_env(workdir: str, database_url: str, args) -> Dict[str, str]:
+    """Biến môi trường cho server và cho các module app import trong tiến trình này."""
+    model_dir = os.path.join(workdir, "models")
+    return {
+        "DATABASE_URL": database_url,
+        "MODEL_DIR": model_dir,
+        "ARTIFACT_FORMAT": "mmap",
+        "MMAP_ARTIFACT_DIR": os.path.join(model_dir, "mmap"),
+        "SIMILARITY_MODE": args.similarity_mode,
+        # Artifact tổng hợp không có vectorizer
+        "CATALOG_SYNC_ENABLED": "false",
+        "MODEL_WATCH_INTERVAL_SECONDS": "0",
+        "USER_CACHE_BACKEND": args.user_cache,
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def _zipf_weights(n: int, a: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** a
+    return weights / weights.sum()
+
+
+def generate_catalog(params: Dict):
+    """Catalog tổng hợp, chỉ phụ thuộc vào `params` (gồm cả seed)."""
+    rng = np.random.default_rng(params["seed"])
+    n_courses, n_skills = params["courses"], params["skills"]
+    skill_names = [f"skill {i}" for i in range(n_skills)]
+
+    # Vài kỹ năng phổ biến xuất hiện ở nhiều khóa học (phân bố Zipf)
+    popularity = _zipf_weights(n_skills)[rng.permutation(n_skills)]
+    courses, course_skills = [], []
+    for course_id in range(1, n_courses + 1):
+        words = rng.choice(WORDS, 3, replace=False)
+        courses.append(
+            {
+                "id": course_id,
+                "course_name": f"{words[0].title()} {words[1]} {words[2]} {course_id}",
+                "university": f"University {rng.integers(1, 50)}",
+                "difficulty_level": DIFFICULTIES[rng.integers(len(DIFFICULTIES))],
+                "course_rating": round(float(rng.uniform(3, 5)), 2),
+                "course_url": f"https://example.com/course/{course_id}",
+                "course_description": " ".join(rng.choice(WORDS, 12)),
+                "course_format": FORMATS[rng.integers(len(FORMATS))],
+            }
+        )
+        for skill in rng.choice(n_skills, rng.integers(1, 7), replace=False, p=popularity):
+            course_skills.append({"course_id": course_id, "skill_id": int(skill) + 1})
+
+    # Đồ thị phụ thuộc không có chu trình: cạnh luôn đi từ vị trí trước tới vị
+    # trí sau trong một thứ tự ngẫu nhiên của các kỹ năng, thường là gần nhau
+    order = rng.permutation(n_skills)
+    max_edges = n_skills * (n_skills - 1) // 2
+    edges = set()
+    while len(edges) < min(params["edges"], max_edges):
+        a = int(rng.integers(0, n_skills - 1))
+        b = min(n_skills - 1, a + int(rng.geometric(0.05)))
+        edges.add((skill_names[order[a]], skill_names[order[b]]))
+    return skill_names, courses, course_skills, sorted(edges)
+
+
+def generate_users(params: Dict, password_hash: str):
+    rng = np.random.default_rng(params["seed"] + 1)
+    n_courses, n_skills = params["courses"], params["skills"]
+    users, profiles, known, target, progress = [], [], [], [], []
+    for user_id in range(1, params["users"] + 1):
+        users.append(
+            {
+                "id": user_id,
+                "email": f"user{user_id}@bench.local",
+                "hashed_password": password_hash,
+                "is_active": True,
+            }
+        )
+        profiles.append(
+            {"user_id": user_id, "learning_style": STYLES[rng.integers(len(STYLES))]}
+        )
+        for skill in rng.choice(n_skills, rng.integers(0, 9), replace=False):
+            known.append({"user_id": user_id, "skill_id": int(skill) + 1})
+        for skill in rng.choice(n_skills, rng.integers(3, 11), replace=False):
+            target.append({"user_id": user_id, "skill_id": int(skill) + 1})
+        n_progress = int(rng.integers(0, params["progress"] + 1))
+        for course_id in rng.choice(n_courses, n_progress, replace=False):
+            progress.append(
+                {
+                    "user_id": user_id,
+                    "course_id": int(course_id) + 1,
+                    "status": "completed" if rng.random() < 0.7 else "in_progress",
+                }
+            )
+    return users, profiles, known, target, progress
+
+
+def write_model_artifacts(out_dir: str, params: Dict, course_skills, skill_names, edges):
+    """Artifact mmap khớp với catalog: TF-IDF theo kỹ năng của từng khóa học."""
+    import networkx as nx
+    from scipy import sparse
+
+    from app.services.artifacts import write_artifacts
+    from app.services.similarity import build_topk_table
+
+    n_courses, n_skills = params["courses"], params["skills"]
+    rows = np.array([r["course_id"] - 1 for r in course_skills])
+    cols = np.array([r["skill_id"] - 1 for r in course_skills])
+    incidence = sparse.csr_matrix(
+        (np.ones(rows.size, dtype=np.float32), (rows, cols)), shape=(n_courses, n_skills)
+    )
+    df = np.bincount(cols, minlength=n_skills)
+    idf = np.log((1 + n_courses) / (1 + df)) + 1
+    tfidf = incidence @ sparse.diags(idf.astype(np.float32))
+    norms = np.sqrt(tfidf.multiply(tfidf).sum(axis=1)).A.ravel()
+    tfidf = sparse.csr_matrix(sparse.diags(1 / np.maximum(norms, 1e-12)) @ tfidf)
+
+    graph = nx.DiGraph()
+    graph.add_nodes_from(skill_names)
+    graph.add_edges_from(edges)
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    write_artifacts(
+        out_dir,
+        course_ids=np.arange(1, n_courses + 1),
+        tfidf_matrix=tfidf,
+        topk_table=build_topk_table(tfidf, params["topk"]),
+        skill_graph=graph,
+    )
+
+
+def _insert_chunks(connection, table, rows, chunk_size: int = 5000):
+    from sqlalchemy import insert
+
+    for start in range(0, len(rows), chunk_size):
+        connection.execute(insert(table), rows[start : start + chunk_size])
+
+
+def seed(workdir: str, database_url: str, params: Dict, reset: bool) -> Dict:
+    from sqlalchemy import func, select, text
+
+    from app.core.security import get_password_hash
+    from app.db import models
+    from app.db.database import engine
+
+    start = time.perf_counter()
+    if reset:
+        models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        if connection.execute(select(func.count(models.Course.id))).scalar():
+            raise SystemExit(
+                "CSDL đã có dữ liệu: dùng CSDL trống hoặc thêm --reset để xóa và seed lại."
+            )
+
+    skill_names, courses, course_skills, edges = generate_catalog(params)
+    # Mọi người dùng có cùng mật khẩu: băm bcrypt một lần
+    users, profiles, known, target, progress = generate_users(
+        params, get_password_hash(PASSWORD)
+    )
+    with engine.begin() as connection:
+        _insert_chunks(
+            connection,
+            models.Skill.__table__,
+            [{"id": i + 1, "skill_name": name} for i, name in enumerate(skill_names)],
+        )
+        _insert_chunks(connection, models.Course.__table__, courses)
+        _insert_chunks(connection, models.course_skills_association, course_skills)
+        _insert_chunks(connection, models.User.__table__, users)
+        _insert_chunks(connection, models.UserProfile.__table__, profiles)
+        _insert_chunks(connection, models.user_known_skills_association, known)
+        _insert_chunks(connection, models.user_target_skills_association, target)
+        _insert_chunks(connection, models.UserCourseProgress.__table__, progress)
+        if connection.dialect.name == "postgresql":
+            # Id được chèn tường minh: đưa sequence về sau id lớn nhất
+            for table in ("skills", "courses", "users"):
+                connection.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT MAX(id) FROM {table}))"
+                    )
+                )
+    db_seconds = time.perf_counter() - start
+
+    write_model_artifacts(
+        os.path.join(workdir, "models", "mmap"), params, course_skills, skill_names, edges
+    )
+    dataset = {
+        "params": params,
+        "database": engine.dialect.name,
+        "rows": {
+            "courses": len(courses),
+            "skills": len(skill_names),
+            "course_skills": len(course_skills),
+            "edges": len(edges),
+            "users": len(users),
+            "progress": len(progress),
+        },
+        "seed_seconds": round(db_seconds, 2),
+        "artifact_seconds": round(time.perf_counter() - start - db_seconds, 2),
+    }
+    with open(os.path.join(workdir, DATASET_FILE), "w", encoding="utf-8") as f:
+        json.dump(dataset, f, indent=2)
+    print(
+        f"Đã seed {dataset['rows']} trong {dataset['seed_seconds']}s, "
+        f"artifact trong {dataset['artifact_seconds']}s."
+    )
+    return dataset
+
+
+def ensure_dataset(workdir: str, database_url: str, params: Dict, reset: bool) -> Dict:
+    """Dùng lại dữ liệu đã seed nếu cùng tham số; SQLite tạm thì seed lại."""
+    path = os.path.join(workdir, DATASET_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            dataset = json.load(f)
+        if dataset["params"] == params and not reset:
+            print(f"Dùng lại dữ liệu đã seed trong {workdir}: {dataset['rows']}")
+            return dataset
+        sqlite_file = os.path.join(workdir, "bench.db")
+        if database_url == f"sqlite:///{sqlite_file}":
+            if os.path.exists(sqlite_file):
+                os.remove(sqlite_file)
+        elif not reset:
+            raise SystemExit(
+                f"{path} được seed với tham số khác; thêm --reset để seed lại CSDL."
+            )
+    return seed(workdir, database_url, params, reset)
+
+
+# ---- Thống kê ----
+
+
+def summarize(latencies: List[float]) -> Dict:
+    if not latencies:
+        return {"count": 0}
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+# ---- Micro-benchmark ----
+
+
+def _time_calls(fn, items) -> Dict:
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    stats = summarize(latencies)
+    stats["ops_per_second"] = round(len(latencies) / sum(latencies), 1)
+    return stats
+
+
+def run_micro(params: Dict, repeat: int, rng: random.Random) -> Dict:
+    """Đo các phương thức của RecommendationService trong tiến trình, không qua HTTP."""
+    from types import SimpleNamespace
+
+    from app.crud import user as crud_user
+    from app.db.database import SessionLocal
+    from app.services.recommendation import recommendation_service as service
+    from app.services.skill_index import CourseSkillIndex
+
+    results = {}
+    start = time.perf_counter()
+    service.load()
+    results["load_model"] = {"seconds": round(time.perf_counter() - start, 3)}
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        CourseSkillIndex.build(db, topo_table=service.topo_table)
+        results["build_skill_index"] = {"seconds": round(time.perf_counter() - start, 3)}
+        index = service.skill_index.get(db)
+        requests = crud_user.get_path_requests(db, limit=repeat)
+    finally:
+        db.close()
+
+    course_ids = [rng.randint(1, params["courses"]) for _ in range(repeat)]
+    # Khởi động: lần gọi đầu chạm các trang mmap
+    service.get_similar_courses(course_ids[0])
+    results["get_similar_courses"] = _time_calls(service.get_similar_courses, course_ids)
+    batches = [course_ids[i : i + 100] for i in range(0, len(course_ids), 100)]
+    results["get_similar_courses_many[100]"] = _time_calls(
+        service.get_similar_courses_many, batches
+    )
+    results["get_personalized_path"] = _time_calls(
+        lambda r: service.get_personalized_path(
+            SimpleNamespace(id=r.user_id),
+            r.known_skill_ids,
+            target_skill_ids=r.target_skill_ids,
+            index=index,
+            learning_style=r.learning_style,
+        ),
+        requests,
+    )
+    results[f"get_personalized_paths[{len(requests)}]"] = _time_calls(
+        lambda _: service.get_personalized_paths(requests, index=index), range(3)
+    )
+    return results
+
+
+# ---- Tải qua HTTP ----
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    if not spec:
+        return {name: weight for name, (_, _, weight) in ENDPOINTS.items()}
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Endpoint không hợp lệ trong --mix: '{name}' ({', '.join(ENDPOINTS)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def build_schedule(
+    mix: Dict[str, int], params: Dict, active_users: int, size: int, rng: random.Random
+) -> List[Tuple[str, str, Optional[int]]]:
+    """Chuỗi request (tên, đường dẫn, user id) cố định theo seed."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    # Khóa học "nóng": phân bố Zipf trên một hoán vị của các id
+    hot = list(range(1, params["courses"] + 1))
+    rng.shuffle(hot)
+    course_weights = _zipf_weights(len(hot)).tolist()
+    schedule = []
+    for name in rng.choices(names, weights, k=size):
+        template, needs_auth, _ = ENDPOINTS[name]
+        path = template.format(
+            word=rng.choice(WORDS), course_id=rng.choices(hot, course_weights)[0]
+        )
+        schedule.append((name, path, rng.randint(1, active_users) if needs_auth else None))
+    return schedule
+
+
+def load_trace(path: str) -> List[Tuple[str, str, Optional[int]]]:
+    """
+    Đọc request đã ghi lại từ file JSONL, mỗi dòng
+    {"endpoint": "...", "path": "/api/v1/...", "user_id": 12 | null}.
+    """
+    schedule = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                schedule.append(
+                    (entry.get("endpoint", entry["path"]), entry["path"], entry.get("user_id"))
+                )
+    return schedule
+
+
+def start_server(env: Dict[str, str], port: int, workers: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 300.0) -> float:
+    import httpx
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() - start < timeout:
+            try:
+                if (await client.get("/readyz")).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError("Server không sẵn sàng kịp.")
+
+
+_METRIC_LINE = re.compile(r'^(\w+)\{method="GET",route="([^"]*)"\} (\S+)$')
+
+
+async def scrape_db_metrics(client) -> Dict[Tuple[str, str], float]:
+    """Tổng số câu lệnh SQL / thời gian CSDL theo route từ /metrics."""
+    wanted = {"http_request_db_queries_sum", "http_request_db_seconds_sum", "http_request_db_queries_count"}
+    values = {}
+    response = await client.get("/metrics")
+    if response.status_code != 200:
+        return values
+    for line in response.text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match and match.group(1) in wanted:
+            values[(match.group(1), match.group(2))] = float(match.group(3))
+    return values
+
+
+def route_of(path: str) -> str:
+    """Mẫu route của một đường dẫn trong ENDPOINTS (khớp nhãn route của /metrics)."""
+    path = path.split("?")[0]
+    for template, _, _ in ENDPOINTS.values():
+        pattern = re.sub(r"\\\{\w+\\\}", r"[^/]+", re.escape(template.split("?")[0]))
+        if re.fullmatch(pattern, path):
+            return template.split("?")[0]
+    return path
+
+
+async def run_load(base_url, schedule, tokens, concurrency, warmup, duration) -> Dict:
+    import httpx
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    routes: Dict[str, str] = {}
+    position = itertools.count()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker(deadline: float, record: bool):
+            while time.perf_counter() < deadline:
+                name, path, user_id = schedule[next(position) % len(schedule)]
+                headers = tokens.get(user_id) if user_id is not None else None
+                start = time.perf_counter()
+                try:
+                    ok = (await client.get(path, headers=headers)).status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if not record:
+                    continue
+                routes.setdefault(name, route_of(path))
+                if ok:
+                    latencies[name].append(time.perf_counter() - start)
+                else:
+                    errors[name] += 1
+
+        async def phase(seconds: float, record: bool):
+            deadline = time.perf_counter() + seconds
+            await asyncio.gather(*(worker(deadline, record) for _ in range(concurrency)))
+
+        await phase(warmup, record=False)
+        before = await scrape_db_metrics(client)
+        start = time.perf_counter()
+        await phase(duration, record=True)
+        elapsed = time.perf_counter() - start
+        after = await scrape_db_metrics(client)
+
+    endpoints = {}
+    for name in sorted(set(latencies) | set(errors)):
+        stats = summarize(latencies[name])
+        stats["errors"] = errors[name]
+        stats["throughput_rps"] = round(len(latencies[name]) / elapsed, 2)
+        route = routes.get(name)
+        count = after.get(("http_request_db_queries_count", route), 0) - before.get(
+            ("http_request_db_queries_count", route), 0
+        )
+        if count:
+            for metric, key, scale in (
+                ("http_request_db_queries_sum", "db_queries_per_request", 1),
+                ("http_request_db_seconds_sum", "db_ms_per_request", 1000),
+            ):
+                total = after.get((metric, route), 0) - before.get((metric, route), 0)
+                stats[key] = round(scale * total / count, 3)
+        endpoints[name] = stats
+    everything = [value for values in latencies.values() for value in values]
+    total = summarize(everything)
+    total["errors"] = sum(errors.values())
+    total["throughput_rps"] = round(len(everything) / elapsed, 2)
+    return {"seconds": round(elapsed, 2), "total": total, "endpoints": endpoints}
+
+
+def mint_tokens(user_ids) -> Dict[int, Dict[str, str]]:
+    """JWT cho người dùng đã seed, không qua /login (không đo bcrypt ở đây)."""
+    from app.core.security import create_access_token
+
+    return {
+        user_id: {
+            "Authorization": "Bearer "
+            + create_access_token({"sub": str(user_id), "email": f"user{user_id}@bench.local"})
+        }
+        for user_id in user_ids
+    }
+
+
+# ---- Báo cáo ----
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: Dict):
+    micro = result.get("micro", {})
+    if micro:
+        print(f"\n{'micro-benchmark':<36} {'lần':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for name, stats in micro.items():
+            if "seconds" in stats:
+                print(f"{name:<36} {'':>6} {1000 * stats['seconds']:>9.1f}")
+            else:
+                print(
+                    f"{name:<36} {stats['count']:>6} {stats['p50_ms']:>9.3f} "
+                    f"{stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}"
+                )
+    load = result.get("load")
+    if load:
+        print(
+            f"\n{'endpoint':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'lỗi':>5} {'SQL/req':>8}"
+        )
+        for name, stats in list(load["endpoints"].items()) + [("TỔNG", load["total"])]:
+            if not stats.get("count"):
+                print(f"{name:<22} {'-':>8} {'':>8} {'':>8} {'':>8} {stats['errors']:>5}")
+                continue
+            queries = stats.get("db_queries_per_request")
+            print(
+                f"{name:<22} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+                f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>5} "
+                f"{'' if queries is None else f'{queries:.1f}':>8}"
+            )
+
+
+def run(args):
+    workdir = os.path.abspath(args.workdir)
+    os.makedirs(workdir, exist_ok=True)
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    env = bench_env(workdir, database_url, args)
+    # Các module app đọc cấu hình từ môi trường lúc import
+    os.environ.update(env)
+    params = dataset_params(args)
+    dataset = ensure_dataset(workdir, database_url, params, args.reset)
+    if args.command == "seed":
+        return
+
+    rng = random.Random(args.seed)
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "options": {
+                key: getattr(args, key)
+                for key in (
+                    "concurrency", "duration", "warmup", "workers", "active_users",
+                    "mix", "trace", "similarity_mode", "user_cache", "micro_repeat",
+                )
+            },
+        },
+        "dataset": dataset,
+    }
+    if args.micro_repeat:
+        result["micro"] = run_micro(params, args.micro_repeat, rng)
+
+    if args.duration > 0:
+        active_users = min(args.active_users, params["users"])
+        schedule = (
+            load_trace(args.trace)
+            if args.trace
+            else build_schedule(parse_mix(args.mix), params, active_users, args.schedule_size, rng)
+        )
+        tokens = mint_tokens({user_id for _, _, user_id in schedule if user_id is not None})
+        server = start_server(env, args.port, args.workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            ready_seconds = asyncio.run(wait_ready(base_url))
+            result["load"] = asyncio.run(
+                run_load(base_url, schedule, tokens, args.concurrency, args.warmup, args.duration)
+            )
+            result["load"]["ready_seconds"] = round(ready_seconds, 2)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_report(result)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\nĐã ghi {args.output}")
+
+
+# ---- So sánh ----
+
+
+def compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        new = json.load(f)
+    print(
+        f"So sánh {base['meta'].get('commit')} -> {new['meta'].get('commit')} "
+        f"(ngưỡng {100 * args.threshold:.0f}%)"
+    )
+    rows = []
+    for section in ("micro", "load"):
+        old_stats, new_stats = base.get(section) or {}, new.get(section) or {}
+        if section == "load":
+            old_stats = {**old_stats.get("endpoints", {}), "TỔNG": old_stats.get("total", {})}
+            new_stats = {**new_stats.get("endpoints", {}), "TỔNG": new_stats.get("total", {})}
+        for name in old_stats.keys() & new_stats.keys():
+            for metric, higher_is_better in COMPARED + (("seconds", False),):
+                old, current = old_stats[name].get(metric), new_stats[name].get(metric)
+                if not old or current is None:
+                    continue
+                change = (current - old) / old
+                worse = -change if higher_is_better else change
+                rows.append((section, name, metric, old, current, change, worse > args.threshold))
+
+    regressions = 0
+    for section, name, metric, old, current, change, regressed in sorted(rows):
+        regressions += regressed
+        print(
+            f"{section:<6} {name:<36} {metric:<15} {old:>10.3f} -> {current:>10.3f} "
+            f"{100 * change:>+7.1f}%{'  XẤU ĐI' if regressed else ''}"
+        )
+    print(f"\n{regressions} chỉ số xấu đi quá ngưỡng.")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("seed", "run"):
+        command = commands.add_parser(name, help="Seed dữ liệu" if name == "seed" else "Seed (nếu cần) và đo")
+        command.add_argument(
+            "--workdir", default=os.path.join(tempfile.gettempdir(), "elearning-bench")
+        )
+        command.add_argument("--database-url", help="Mặc định: SQLite trong --workdir")
+        command.add_argument("--reset", action="store_true", help="Xóa và seed lại CSDL")
+        command.add_argument("--seed", type=int, default=0)
+        command.add_argument("--courses", type=int, default=5000)
+        command.add_argument("--skills", type=int, default=500)
+        command.add_argument("--edges", type=int, default=1500)
+        command.add_argument("--users", type=int, default=2000)
+        command.add_argument("--progress", type=int, default=10, help="số khóa học tối đa có tiến độ mỗi người dùng")
+        command.add_argument("--topk", type=int, default=50)
+        command.add_argument("--similarity-mode", choices=["topk", "sparse"], default="topk")
+        command.add_argument("--user-cache", choices=["memory", "none", "redis"], default="memory")
+        if name == "run":
+            command.add_argument("--concurrency", type=int, default=16)
+            command.add_argument("--duration", type=float, default=30.0, help="giây đo; 0 = chỉ micro-benchmark")
+            command.add_argument("--warmup", type=float, default=5.0)
+            command.add_argument("--workers", type=int, default=1, help="số worker uvicorn")
+            command.add_argument("--active-users", type=int, default=500, help="số người dùng gửi request có token")
+            command.add_argument("--mix", help="ví dụ: courses=25,content_based=20,personalized_path=15")
+            command.add_argument("--trace", help="phát lại request từ file JSONL thay cho --mix")
+            command.add_argument("--schedule-size", type=int, default=20000)
+            command.add_argument("--micro-repeat", type=int, default=1000, help="0 = bỏ qua micro-benchmark")
+            command.add_argument("--port", type=int, default=8766)
+            command.add_argument("--output", default="bench.json")
+
+    compare_parser = commands.add_parser("compare", help="So sánh hai kết quả")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        sys.exit(compare(args))
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
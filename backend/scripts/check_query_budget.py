@@ -0,0 +1,124 @@
+"""
+Kiểm tra hồi quy số truy vấn SQL cho các endpoint của người dùng.
+
+Script tạo một CSDL SQLite tạm với catalog tổng hợp, gọi các endpoint qua
+TestClient và đếm số câu lệnh SQL của mỗi request (QueryCounter). Nếu một
+request vượt quá ngân sách trong QUERY_BUDGETS, script in các câu lệnh đã chạy
+và thoát với mã 1, nên có thể dùng trong CI.
+
+Chạy: python scripts/check_query_budget.py [--completed 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+# Dùng một CSDL SQLite riêng, phải đặt trước khi import app
+_DB_FILE = os.path.join(tempfile.mkdtemp(), "query_budget.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_FILE}"
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+# Thêm thư mục gốc của project (backend/) vào sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from fastapi.testclient import TestClient
+
+from app.db import models
+from app.db.database import SessionLocal, async_engine, engine
+from app.db.query_counter import QueryCounter
+from app.main import app
+from app.services.cache import user_cache
+from app.services.principal import principal_cache
+
+# Số truy vấn tối đa cho mỗi request, không phụ thuộc số khóa học đã hoàn thành.
+# "miss": cache principal và cache kết quả của người dùng vừa bị vô hiệu hóa;
+# "hit": gọi lại ngay sau đó.
+QUERY_BUDGETS = [
+    ("GET /api/v1/users/me", "miss", 1),
+    ("GET /api/v1/users/me", "hit", 0),
+    ("GET /api/v1/users/me/skill-gap-analytics", "miss", 3),
+    ("GET /api/v1/users/me/skill-gap-analytics", "hit", 0),
+    ("GET /api/v1/users/me/personalized-path", "miss", 4),
+    ("GET /api/v1/users/me/personalized-path", "hit", 1),
+]
+
+
+def seed_catalog(n_courses: int = 200, n_skills: int = 100):
+    db = SessionLocal()
+    rng = random.Random(0)
+    skills = [models.Skill(skill_name=f"skill {i}") for i in range(n_skills)]
+    db.add_all(skills)
+    for i in range(n_courses):
+        course = models.Course(
+            course_name=f"Course {i}",
+            difficulty_level=rng.choice(["beginner", "intermediate", "advanced"]),
+            course_rating=round(rng.uniform(3, 5), 2),
+        )
+        course.skills = rng.sample(skills, rng.randint(1, 5))
+        db.add(course)
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--completed", type=int, default=20)
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    seed_catalog()
+
+    failed = False
+    with TestClient(app) as client:
+        client.post(
+            "/api/v1/auth/register", json={"email": "budget@example.com", "password": "pw"}
+        )
+        token = client.post(
+            "/api/v1/auth/login/token",
+            data={"username": "budget@example.com", "password": "pw"},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+        client.post(
+            "/api/v1/survey/",
+            json={
+                "known_skill_ids": [1, 2, 3],
+                "target_skill_ids": list(range(10, 30)),
+                "learning_style": "visual",
+            },
+            headers=headers,
+        )
+        # Số truy vấn không được tăng theo số khóa học đã hoàn thành
+        for course_id in range(1, args.completed + 1):
+            client.post(
+                "/api/v1/users/me/progress",
+                json={"course_id": course_id, "status": "completed"},
+                headers=headers,
+            )
+        # Request đầu tiên dựng chỉ mục khóa học-kỹ năng, không tính vào ngân sách
+        client.get("/api/v1/users/me/personalized-path", headers=headers)
+
+        print(f"{'request':<52} {'queries':>8} {'budget':>7}")
+        for name, cache_state, budget in QUERY_BUDGETS:
+            method, path = name.split(" ", 1)
+            if cache_state == "miss":
+                user_cache.bump_user(user_id)
+                principal_cache.invalidate(user_id)
+            with QueryCounter(engine, async_engine.sync_engine) as counter:
+                response = client.request(method, path, headers=headers)
+            label = f"{name} ({cache_state})" if cache_state else name
+            status = "OK" if counter.count <= budget else "VƯỢT NGÂN SÁCH"
+            print(f"{label:<52} {counter.count:>8} {budget:>7}  {status}")
+            if response.status_code >= 400 or counter.count > budget:
+                failed = True
+                print(f"  status={response.status_code}")
+                for statement in counter.statements:
+                    print("   ", " ".join(statement.split())[:120])
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
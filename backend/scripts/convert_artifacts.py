@@ -0,0 +1,160 @@
+"""
+Chuyển các artifact joblib/CSV/npz hiện có sang định dạng .npy dùng mmap.
+
+Chạy (bên trong container, nơi model được mount vào /models):
+    python scripts/convert_artifacts.py [--model-dir /models] [--out-dir /models/mmap]
+        [--score-dtype float32|float16|uint8] [--min-recall 0.99]
+
+Sau đó khởi động backend với ARTIFACT_FORMAT=mmap.
+
+--score-dtype lưu ma trận cosine và điểm top-K gọn hơn. Trước khi ghi, xếp
+hạng trên một mẫu khóa học được so với điểm gốc; nếu tie_recall (xem
+app/services/artifacts.py: ranking_quality) thấp hơn --min-recall thì dừng
+và không ghi gì.
+"""
+import argparse
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+# Thêm thư mục gốc của project (backend/) vào sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.core import config
+from app.services import similarity
+from app.services.ann import IVFIndex
+from app.services.artifacts import ranking_quality, write_artifacts
+
+
+def load_optional(path, loader):
+    """Tải một artifact nếu file tồn tại, nếu không trả về None."""
+    if not os.path.exists(path):
+        print(f"  - Bỏ qua (không tìm thấy): {path}")
+        return None
+    print(f"  - Đọc: {path}")
+    return loader(path)
+
+
+def load_topk_table(path):
+    with np.load(path) as table:
+        return table["neighbors"], table["scores"]
+
+
+def check_quality(cosine_sim_matrix, topk_table, score_dtype, sample, k, min_recall):
+    """
+    So sánh xếp hạng của điểm đã đổi kiểu với điểm gốc trên `sample` khóa học.
+    Trả về False nếu một backend không đạt `min_recall`.
+    """
+    backends = []
+    if cosine_sim_matrix is not None:
+        backends.append(
+            (
+                "dense",
+                similarity.DenseSimilarity(cosine_sim_matrix),
+                similarity.DenseSimilarity(
+                    similarity.encode_scores(cosine_sim_matrix, score_dtype)
+                ),
+            )
+        )
+    if topk_table is not None:
+        neighbors, scores = topk_table
+        backends.append(
+            (
+                "topk",
+                similarity.TopKNeighborSimilarity(neighbors, scores),
+                similarity.TopKNeighborSimilarity(
+                    neighbors, similarity.encode_scores(scores, score_dtype)
+                ),
+            )
+        )
+
+    ok = True
+    for name, reference, candidate in backends:
+        rng = np.random.default_rng(0)
+        rows = rng.choice(reference.n_items, min(sample, reference.n_items), replace=False)
+        quality = ranking_quality(reference, candidate, rows, k)
+        passed = quality["tie_recall"] >= min_recall
+        ok &= passed
+        print(
+            f"  {name} {score_dtype}: recall@{k}={quality['recall']:.4f} "
+            f"tie_recall@{k}={quality['tie_recall']:.4f} "
+            f"sai số điểm tối đa={quality['max_score_error']:.4f} "
+            f"{reference.nbytes / 2**20:.1f} MB -> {candidate.nbytes / 2**20:.1f} MB "
+            f"{'OK' if passed else 'KHÔNG ĐẠT'}"
+        )
+    return ok
+
+
+def convert(
+    model_dir: str,
+    out_dir: str,
+    score_dtype: str = None,
+    min_recall: float = 0.99,
+    sample: int = 1000,
+    k: int = 10,
+):
+    print(f"--- Chuyển đổi artifact từ '{model_dir}' sang '{out_dir}' ---")
+    course_data = pd.read_csv(
+        os.path.join(model_dir, "course_data_for_recommendation.csv")
+    )
+    cosine_sim_matrix = load_optional(
+        os.path.join(model_dir, "cosine_sim_matrix.joblib"), joblib.load
+    )
+    topk_table = load_optional(
+        os.path.join(model_dir, "topk_neighbors.npz"), load_topk_table
+    )
+
+    if score_dtype:
+        print(f"--- Kiểm tra chất lượng xếp hạng với điểm {score_dtype} ---")
+        if not check_quality(
+            cosine_sim_matrix, topk_table, score_dtype, sample, k, min_recall
+        ):
+            print(f"❌ Xếp hạng giảm quá ngưỡng {min_recall}, không ghi artifact.")
+            sys.exit(1)
+
+    manifest = write_artifacts(
+        out_dir,
+        course_ids=course_data["id"].to_numpy(),
+        cosine_sim_matrix=cosine_sim_matrix,
+        tfidf_matrix=load_optional(
+            os.path.join(model_dir, "tfidf_matrix.npz"), sparse.load_npz
+        ),
+        topk_table=topk_table,
+        skill_graph=load_optional(
+            os.path.join(model_dir, "skill_dependency_graph.joblib"), joblib.load
+        ),
+        ann_index=load_optional(
+            os.path.join(model_dir, "ann_index.npz"), IVFIndex.load
+        ),
+        score_dtype=score_dtype,
+    )
+
+    print("--- Các mảng đã ghi ---")
+    for name, info in manifest["arrays"].items():
+        print(f"  {name}: {info['dtype']} {tuple(info['shape'])}")
+    print("✅ Hoàn tất. Khởi động backend với ARTIFACT_FORMAT=mmap để sử dụng.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-dir", default=config.MODEL_DIR)
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--score-dtype", choices=similarity.SCORE_DTYPES[1:])
+    parser.add_argument("--min-recall", type=float, default=0.99)
+    parser.add_argument("--sample", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    convert(
+        args.model_dir,
+        args.out_dir or os.path.join(args.model_dir, "mmap"),
+        args.score_dtype,
+        args.min_recall,
+        args.sample,
+        args.k,
+    )
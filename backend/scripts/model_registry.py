@@ -0,0 +1,64 @@
+"""
+Quản lý registry phiên bản model (xem app/services/model_registry.py).
+
+Chạy (bên trong container, nơi model được mount vào /models):
+    python scripts/model_registry.py list
+    python scripts/model_registry.py publish /path/to/new_models [--version v2] [--no-activate]
+    python scripts/model_registry.py activate v2
+    python scripts/model_registry.py rollback
+
+Các worker đang chạy tự nạp phiên bản active mới sau tối đa
+MODEL_WATCH_INTERVAL_SECONDS giây, hoặc ngay lập tức qua
+POST /api/v1/admin/models/reload.
+"""
+import argparse
+import os
+import sys
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+# Thêm thư mục gốc của project (backend/) vào sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+from app.core import config
+from app.services.model_registry import ModelRegistry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--registry-dir", default=config.MODEL_REGISTRY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Liệt kê các phiên bản")
+    publish = commands.add_parser("publish", help="Thêm một thư mục artifact")
+    publish.add_argument("source_dir")
+    publish.add_argument("--version")
+    publish.add_argument("--no-activate", action="store_true")
+    activate = commands.add_parser("activate", help="Kích hoạt một phiên bản")
+    activate.add_argument("version")
+    commands.add_parser("rollback", help="Quay về phiên bản trước đó")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry_dir)
+    try:
+        if args.command == "publish":
+            version = registry.publish(
+                args.source_dir, args.version, activate=not args.no_activate
+            )
+            print(f"Đã thêm phiên bản '{version}'.")
+        elif args.command == "activate":
+            registry.activate(args.version)
+            print(f"Phiên bản active: '{args.version}'.")
+        elif args.command == "rollback":
+            print(f"Đã rollback, phiên bản active: '{registry.rollback()}'.")
+    except ValueError as e:
+        print(f"LỖI: {e}")
+        sys.exit(1)
+
+    manifest = registry.read()
+    for version in registry.versions():
+        marker = "*" if version == manifest["active"] else " "
+        print(f" {marker} {version}  {manifest['versions'][version]['created_at']}")
+
+
+if __name__ == "__main__":
+    main()
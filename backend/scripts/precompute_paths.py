@@ -0,0 +1,133 @@
+"""
+Tính sẵn lộ trình cá nhân hóa cho mọi người dùng đã làm khảo sát (job hằng
+đêm cho email tổng hợp và trang chủ).
+
+Người dùng được đọc theo lô (phân trang keyset theo id); mỗi lô tốn 1 truy vấn
+lấy id, 3 truy vấn cho dữ liệu kỹ năng và 1 truy vấn lấy thông tin khóa học. Chỉ mục khóa
+học-kỹ năng được dựng một lần và gửi một lần tới mỗi tiến trình trong pool.
+
+Chạy:
+    python scripts/precompute_paths.py [--output paths.ndjson] [--workers 4]
+        [--batch-size 5000] [--user-ids 1 2 3] [--warm-cache]
+
+--output ghi mỗi người dùng một dòng JSON {"user_id", "courses"}.
+--warm-cache ghi kết quả vào cache lộ trình; chỉ có tác dụng cho backend khi
+dùng USER_CACHE_BACKEND=redis (cache "memory" nằm trong tiến trình này).
+"""
+import argparse
+import os
+import sys
+import time
+
+# ---- Cấu hình đường dẫn để script có thể import các module của app ----
+# Thêm thư mục gốc của project (backend/) vào sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# --------------------------------------------------------------------
+
+
+def write_paths(out, db, paths):
+    """Ghi các lộ trình của một lô dưới dạng NDJSON (một truy vấn lấy khóa học)."""
+    from app.crud import course as crud_course
+    from app.schemas import course as schemas
+
+    courses = crud_course.get_courses_by_ids(
+        db, list({id for ids in paths.values() for id in ids})
+    )
+    course_map = {
+        course.id: schemas.Course.model_validate(course, from_attributes=True)
+        for course in courses
+    }
+    for user_id, course_ids in paths.items():
+        path = schemas.UserLearningPath(
+            user_id=user_id,
+            courses=[course_map[id] for id in course_ids if id in course_map],
+        )
+        out.write(path.model_dump_json() + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="File NDJSON kết quả")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--user-ids", type=int, nargs="+")
+    parser.add_argument("--warm-cache", action="store_true")
+    args = parser.parse_args()
+
+    # Import trong main: tiến trình con ("spawn") import lại module này và
+    # không được tải model
+    from app.core.log import setup_logging
+    from app.crud import user as crud_user
+    from app.db.database import SessionLocal
+    from app.services.cache import user_cache
+    from app.services.learning_path import path_executor
+    from app.services.recommendation import recommendation_service
+
+    # Log tải model / dựng chỉ mục theo LOG_LEVEL như khi chạy trong API
+    setup_logging()
+    db = SessionLocal()
+    # Thế hệ cache đọc trước khi dựng chỉ mục: nếu catalog đổi trong lúc chạy,
+    # lộ trình tính trên chỉ mục này không được ghi vào thế hệ mới
+    generation = user_cache.generation()
+    index = recommendation_service.skill_index.get(db)
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    executor = (
+        path_executor(index, recommendation_service.path_scorer, args.workers)
+        if args.workers > 1
+        else None
+    )
+
+    start = time.perf_counter()
+    n_users = n_empty = 0
+    after_id = None
+    try:
+        while True:
+            # Lấy id của lô trước, rồi khóa cache, rồi mới tải dữ liệu kỹ năng
+            # (xem UserResultCache.key)
+            user_ids = [
+                row[0]
+                for row in db.execute(
+                    crud_user.survey_users_statement(
+                        args.user_ids, after_id, args.batch_size
+                    )
+                )
+            ]
+            if not user_ids:
+                break
+            after_id = user_ids[-1]
+            keys = (
+                {
+                    user_id: user_cache.key("personalized_path", user_id, generation)
+                    for user_id in user_ids
+                }
+                if args.warm_cache
+                else {}
+            )
+            requests = crud_user.get_path_requests(db, user_ids)
+            paths = recommendation_service.get_personalized_paths(
+                requests, index=index, executor=executor
+            )
+            n_users += len(paths)
+            n_empty += sum(1 for ids in paths.values() if not ids)
+            if args.warm_cache:
+                for user_id, course_ids in paths.items():
+                    user_cache.set(keys[user_id], course_ids)
+            if out is not None:
+                write_paths(out, db, paths)
+            print(f"... {n_users} người dùng ({time.perf_counter() - start:.1f}s)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if out is not None:
+            out.close()
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Đã tính lộ trình cho {n_users} người dùng ({n_empty} lộ trình rỗng) "
+        f"trong {elapsed:.1f}s."
+    )
+
+
+if __name__ == "__main__":
+    main()
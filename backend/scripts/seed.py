@@ -1,6 +1,12 @@
+import argparse
+import ast
+import time
+import numpy as np
 import pandas as pd
 import sys
 import os
+from typing import List
+from sqlalchemy import delete, select, text
 from sqlalchemy.orm import Session
 from tqdm import tqdm  # Thư viện thanh tiến trình
 
@@ -25,9 +31,25 @@ models.Base.metadata.create_all(bind=engine)
 # CHÚNG TA SẼ CHỈNH docker-compose.yml SAU BƯỚC NÀY.
 PROCESSED_DATA_PATH = "/data/processed/cleaned_courses.csv"
 
+COURSE_COLUMNS = [
+    "id",
+    "course_name",
+    "university",
+    "difficulty_level",
+    "course_rating",
+    "course_url",
+    "course_description",
+]
+
+# Một phần tử trong chuỗi list Python: 'skill' hoặc "skill's"
+SKILL_TOKEN_PATTERN = r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\""
+
 
 def seed_data():
-    """Hàm chính để nạp dữ liệu từ CSV vào CSDL PostgreSQL."""
+    """
+    (Chế độ cũ, --legacy) Nạp dữ liệu từng dòng qua ORM trong một transaction.
+    Chỉ chạy khi bảng courses còn trống.
+    """
     db: Session = SessionLocal()
 
     print("--- Bắt đầu quá trình nạp dữ liệu (Seeding) ---")
@@ -84,7 +106,9 @@ def seed_data():
                 skill_objects.append(skill_obj)
 
             # 2. Tạo Course object
+            # id lấy từ CSV (id mà model gợi ý dùng), giống chế độ bulk
             course_data = {
+                "id": int(row["id"]),
                 "course_name": row["course_name"],
                 "university": row["university"],
                 "difficulty_level": row["difficulty_level"],
@@ -102,6 +126,7 @@ def seed_data():
 
         print("\nHoàn tất vòng lặp. Bắt đầu commit vào CSDL...")
         db.commit()
+        sync_course_id_sequence()
         print("✅ Commit thành công!")
 
     except Exception as e:
@@ -117,5 +142,192 @@ def seed_data():
         print("--- Quá trình nạp dữ liệu kết thúc ---")
 
 
+def parse_skill_lists(skill_lists: pd.Series) -> pd.DataFrame:
+    """
+    Tách cột processed_skills (chuỗi dạng "['a', 'b']") thành bảng dài
+    (row, skill_name) bằng một lần extractall thay vì ast.literal_eval từng dòng.
+    """
+    tokens = skill_lists.fillna("").astype(str).str.extractall(SKILL_TOKEN_PATTERN)
+    # Hiếm: tên kỹ năng có ký tự escape, giải mã như Python với đúng loại nháy
+    for group, quote in ((0, "'"), (1, '"')):
+        escaped = tokens[group].str.contains("\\", regex=False).fillna(False)
+        if escaped.any():
+            tokens.loc[escaped, group] = tokens.loc[escaped, group].map(
+                lambda n: ast.literal_eval(quote + n + quote)
+            )
+    names = tokens[0].fillna(tokens[1])
+    pairs = names.reset_index(level=1, drop=True).rename("skill_name").reset_index()
+    return pairs.rename(columns={pairs.columns[0]: "row"}).drop_duplicates()
+
+
+def _insert(table):
+    """Câu lệnh INSERT hỗ trợ ON CONFLICT của dialect đang dùng."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(
+            f"Chế độ bulk chưa hỗ trợ CSDL '{engine.dialect.name}', dùng --legacy."
+        )
+    return insert(table)
+
+
+def _records(df: pd.DataFrame):
+    """DataFrame -> list dict, NaN được đổi thành None."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _run_chunks(label, rows, chunk_size, write_chunk):
+    """Ghi `rows` theo từng lô (mỗi lô một transaction) và báo tốc độ rows/s."""
+    start = time.perf_counter()
+    with tqdm(total=len(rows), desc=label, unit="rows") as bar:
+        for offset in range(0, len(rows), chunk_size):
+            chunk = rows[offset : offset + chunk_size]
+            with engine.begin() as conn:
+                write_chunk(conn, offset, chunk)
+            bar.update(len(chunk))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label}: {len(rows)} dòng trong {elapsed:.2f}s "
+        f"({len(rows) / max(elapsed, 1e-9):,.0f} rows/s)"
+    )
+
+
+def sync_course_id_sequence():
+    """
+    id khóa học được chèn tường minh (cả hai chế độ) nên phải đẩy sequence
+    lên để INSERT sau không trùng.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence('courses', 'id'), "
+                "(SELECT MAX(id) FROM courses))"
+            )
+        )
+
+
+def mismatched_course_ids(df: pd.DataFrame) -> List[int]:
+    """
+    id của các khóa học trong CSDL không có trong CSV hoặc có tên khác: CSDL
+    được nạp bằng --legacy trước đây (id tự tăng) nên upsert theo id sẽ ghi
+    đè nhầm khóa học và gắn course_skills sai chỗ.
+    """
+    name_of = dict(zip(df["id"].tolist(), df["course_name"].tolist()))
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(models.Course.id, models.Course.course_name)
+        ).all()
+    return [id for id, name in rows if name_of.get(id) != name]
+
+
+def seed_bulk(csv_path: str = PROCESSED_DATA_PATH, chunk_size: int = 5000):
+    """
+    Nạp dữ liệu theo tập hợp: kỹ năng, khóa học và course_skills được ghi theo
+    lô bằng executemany. Có thể chạy lại nhiều lần:
+      - khóa học được upsert theo cột id của CSV (cũng là id mà model dùng);
+      - kỹ năng được upsert theo skill_name;
+      - liên kết course_skills của mỗi lô khóa học được thay bằng dữ liệu CSV.
+    """
+    print("--- Bắt đầu nạp dữ liệu (bulk) ---")
+    if not os.path.exists(csv_path):
+        print(f"LỖI: Không tìm thấy file dữ liệu tại '{csv_path}'.")
+        return
+
+    total_start = time.perf_counter()
+    print(f"Đọc dữ liệu từ: {csv_path}")
+    df = pd.read_csv(csv_path)
+    mismatched = mismatched_course_ids(df)
+    if mismatched:
+        print(
+            f"LỖI: {len(mismatched)} khóa học trong CSDL không khớp id với CSV "
+            f"(ví dụ id {mismatched[:5]}); có thể CSDL được nạp bằng --legacy cũ. "
+            "Xóa dữ liệu khóa học rồi nạp lại; dừng chế độ bulk."
+        )
+        return
+    pairs = parse_skill_lists(df["processed_skills"])
+    pairs["course_id"] = df["id"].to_numpy()[pairs["row"].to_numpy()]
+
+    skills_table = models.Skill.__table__
+    courses_table = models.Course.__table__
+    links_table = models.course_skills_association
+
+    # 1. Kỹ năng: chèn tên mới, bỏ qua tên đã có
+    skill_names = sorted(pairs["skill_name"].unique())
+
+    def write_skills(conn, offset, chunk):
+        stmt = _insert(skills_table).on_conflict_do_nothing(
+            index_elements=["skill_name"]
+        )
+        conn.execute(stmt, [{"skill_name": name} for name in chunk])
+
+    _run_chunks("skills", skill_names, chunk_size, write_skills)
+
+    with engine.connect() as conn:
+        skill_id_of = dict(
+            conn.execute(select(skills_table.c.skill_name, skills_table.c.id)).all()
+        )
+    pairs["skill_id"] = pairs["skill_name"].map(skill_id_of)
+
+    # 2. Khóa học: upsert theo id
+    courses = _records(df[COURSE_COLUMNS])
+
+    def write_courses(conn, offset, chunk):
+        stmt = _insert(courses_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={c: stmt.excluded[c] for c in COURSE_COLUMNS if c != "id"},
+        )
+        conn.execute(stmt, chunk)
+
+    _run_chunks("courses", courses, chunk_size, write_courses)
+
+    sync_course_id_sequence()
+
+    # 3. course_skills: thay liên kết của từng lô khóa học.
+    # extractall giữ thứ tự dòng nên liên kết của một lô là một đoạn liên tiếp.
+    course_ids = df["id"].tolist()
+    pair_rows = pairs["row"].to_numpy()
+    link_course_ids = pairs["course_id"].tolist()
+    link_skill_ids = pairs["skill_id"].tolist()
+
+    def write_links(conn, offset, chunk):
+        conn.execute(delete(links_table).where(links_table.c.course_id.in_(chunk)))
+        lo, hi = np.searchsorted(pair_rows, [offset, offset + len(chunk)])
+        if hi > lo:
+            conn.execute(
+                links_table.insert(),
+                [
+                    {"course_id": c, "skill_id": s}
+                    for c, s in zip(link_course_ids[lo:hi], link_skill_ids[lo:hi])
+                ],
+            )
+
+    _run_chunks("course_skills (theo khóa học)", course_ids, chunk_size, write_links)
+
+    elapsed = time.perf_counter() - total_start
+    print("--- Thống kê ---")
+    print(f"Khóa học: {len(courses)}, kỹ năng: {len(skill_names)}, liên kết: {len(pairs)}")
+    print(f"Tổng thời gian: {elapsed:.2f}s")
+    print("--- Quá trình nạp dữ liệu kết thúc ---")
+
+
 if __name__ == "__main__":
-    seed_data()
+    parser = argparse.ArgumentParser(description="Nạp dữ liệu khóa học vào CSDL.")
+    parser.add_argument("--csv", default=PROCESSED_DATA_PATH)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="Dùng cách nạp cũ qua ORM (chỉ chạy khi bảng courses trống)",
+    )
+    args = parser.parse_args()
+
+    if args.legacy:
+        PROCESSED_DATA_PATH = args.csv
+        seed_data()
+    else:
+        seed_bulk(args.csv, args.chunk_size)
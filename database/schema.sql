@@ -75,4 +75,12 @@ CREATE TABLE user_course_progress (
     PRIMARY KEY (user_id, course_id),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
-);
\ No newline at end of file
+);
+-- Văn bản tìm kiếm của khóa học (tên: A, kỹ năng: B, mô tả: C), được backend
+-- làm mới khi catalog thay đổi (xem backend/app/services/search.py)
+CREATE TABLE course_search (
+    course_id INTEGER PRIMARY KEY,
+    document TSVECTOR NOT NULL,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE
+);
+CREATE INDEX ix_course_search_document ON course_search USING GIN (document);
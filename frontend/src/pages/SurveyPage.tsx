@@ -36,8 +36,17 @@ const SurveyPage: React.FC = () => {
         const fetchSkills = async () => {
             setLoading(true);
             try {
-                const response = await apiClient.get<Skill[]>('/survey/skills');
-                setAllSkills(response.data);
+                // API trả từng trang; đi theo header X-Next-Cursor cho tới trang cuối
+                const skills: Skill[] = [];
+                let cursor: string | undefined;
+                do {
+                    const response = await apiClient.get<Skill[]>('/survey/skills', {
+                        params: { limit: 1000, cursor },
+                    });
+                    skills.push(...response.data);
+                    cursor = response.headers['x-next-cursor'];
+                } while (cursor);
+                setAllSkills(skills);
             } catch (err) {
                 setError('Could not load skills list. Please try again later.');
                 console.error("Failed to fetch skills:", err);
@@ -0,0 +1,167 @@
+"""
+So sánh cách tính bảng top-K láng giềng khi huấn luyện:
+  - "một lần": cosine_similarity(tfidf, tfidf) dày N×N rồi lấy top-K từng hàng
+    như train_model.ipynb;
+  - "theo khối": compute_topk_table của src/train_model.py với 1..W tiến trình.
+
+Mỗi cấu hình chạy trong một tiến trình riêng để đo đúng bộ nhớ đỉnh (RSS lớn
+nhất của tiến trình và các tiến trình con). Kết quả của các cấu hình được so
+với nhau.
+
+Chạy: python benchmarks/bench_train_topk.py [--courses 20000] [--k 50]
+    [--block-size 512] [--workers 1 2 4]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy import sparse
+
+# ---- Cấu hình đường dẫn để import được src/train_model.py ----
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+# --------------------------------------------------------------
+
+
+def synthetic_tfidf(n_courses: int, n_terms: int = 20000, terms_per_course: int = 40):
+    rng = np.random.default_rng(0)
+    rows = np.repeat(np.arange(n_courses), terms_per_course)
+    # Phân bố Zipf cho từ để các khóa học có từ chung như văn bản thật
+    cols = np.minimum(rng.zipf(1.3, rows.size) - 1, n_terms - 1)
+    matrix = sparse.csr_matrix(
+        (rng.random(rows.size), (rows, cols)), shape=(n_courses, n_terms)
+    )
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A.ravel()
+    return sparse.csr_matrix(sparse.diags(1 / np.maximum(norms, 1e-12)) @ matrix)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss tính bằng KB trên Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+
+def run_one_shot(tfidf_path: str, out_path: str, k: int):
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    tfidf = sparse.load_npz(tfidf_path)
+    cosine_sim_matrix = cosine_similarity(tfidf, tfidf)
+    # Như compute_topk_neighbors trong notebook: bỏ chính nó, sắp giảm dần
+    np.fill_diagonal(cosine_sim_matrix, -np.inf)
+    neighbors = np.argsort(-cosine_sim_matrix, axis=1, kind="stable")[:, :k]
+    scores = np.take_along_axis(cosine_sim_matrix, neighbors, axis=1)
+    np.savez(out_path, neighbors=neighbors.astype(np.int32), scores=scores.astype(np.float32))
+
+
+def child(args):
+    from train_model import compute_topk_table
+
+    start = time.perf_counter()
+    if args.mode == "one-shot":
+        run_one_shot(args.tfidf, args.out, args.k)
+    else:
+        compute_topk_table(
+            args.tfidf, args.out, args.k, args.block_size, args.run_workers, args.product
+        )
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_mb()}))
+
+
+def run_child(script_args):
+    """Chạy một cấu hình; None nếu tiến trình chết (thường là hết bộ nhớ)."""
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", *script_args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def same_table(a_path: str, b_path: str) -> bool:
+    a, b = np.load(a_path), np.load(b_path)
+    # Điểm phải gần bằng nhau; id có thể khác ở những chỗ điểm gần như hòa
+    # (sai số làm tròn khác nhau giữa hai cách nhân)
+    if not np.allclose(a["scores"], b["scores"], atol=1e-5):
+        return False
+    mismatch = a["neighbors"] != b["neighbors"]
+    return np.allclose(a["scores"][mismatch], b["scores"][mismatch], atol=1e-5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--product", choices=("dense", "sparse"), default="dense")
+    parser.add_argument("--skip-one-shot", action="store_true")
+    # Tham số nội bộ cho tiến trình đo
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--tfidf", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    parser.add_argument("--run-workers", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tfidf_path = os.path.join(tmp, "tfidf_matrix.npz")
+        sparse.save_npz(tfidf_path, synthetic_tfidf(args.courses))
+        common = ["--tfidf", tfidf_path, "--k", str(args.k)]
+        print(
+            f"{args.courses} khóa học, top-{args.k}, khối {args.block_size}, "
+            f"nhân {args.product}, {os.cpu_count()} CPU"
+        )
+        print(f"{'cách tính':<22} {'thời gian':>10} {'RSS đỉnh':>10}  kết quả")
+
+        reference = None
+        if not args.skip_one_shot:
+            reference = os.path.join(tmp, "one_shot.npz")
+            stats = run_child(common + ["--mode", "one-shot", "--out", reference])
+            if stats is None:
+                reference = None
+                print(f"{'một lần (N×N)':<22} {'lỗi (hết bộ nhớ?)':>21}")
+            else:
+                print(
+                    f"{'một lần (N×N)':<22} {stats['seconds']:>9.1f}s "
+                    f"{stats['peak_mb']:>7.0f} MB  -"
+                )
+
+        for workers in sorted(set(args.workers)):
+            out = os.path.join(tmp, f"chunked_{workers}.npz")
+            stats = run_child(
+                common
+                + [
+                    "--mode", "chunked",
+                    "--out", out,
+                    "--block-size", str(args.block_size),
+                    "--run-workers", str(workers),
+                    "--product", args.product,
+                ]
+            )
+            if stats is None:
+                print(f"{f'theo khối, {workers} t.trình':<22} {'lỗi':>21}")
+                continue
+            if reference is None:
+                reference, verdict = out, "-"
+            else:
+                verdict = "khớp" if same_table(reference, out) else "KHÁC"
+            print(
+                f"{f'theo khối, {workers} t.trình':<22} {stats['seconds']:>9.1f}s "
+                f"{stats['peak_mb']:>7.0f} MB  {verdict}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Huấn luyện mô hình Content-Based (TF-IDF trên kỹ năng) và lưu các artifact
+cho backend. Đây là phiên bản script của train_model.ipynb.
+
+Notebook tính `cosine_similarity(tfidf_matrix, tfidf_matrix)` một lần: ma trận
+dày N×N phải nằm trọn trong RAM nên không vượt quá khoảng 50k khóa học. Ở chế
+độ mặc định, script chỉ tính bảng top-K láng giềng (SIMILARITY_MODE=topk):
+  - các hàng được chia thành khối `block_size`; mỗi khối là một phép nhân
+    ma trận thưa × dày (hoặc thưa × thưa với --product sparse) giữa các
+    hàng của khối và toàn bộ ma trận TF-IDF, rồi chỉ giữ K láng giềng tốt nhất;
+  - các khối chạy song song trên pool tiến trình; mỗi tiến trình đọc ma trận
+    TF-IDF từ tfidf_matrix.npz một lần;
+  - kết quả từng khối được ghi ngay vào hai mảng .npy mở bằng memmap (int32
+    id, float32 điểm) rồi đóng gói thành topk_neighbors.npz.
+Bộ nhớ đỉnh mỗi tiến trình tỉ lệ với block_size × N, không phải N².
+
+Chạy:
+    python src/train_model.py [--data data/processed/cleaned_courses.csv]
+        [--model-dir models] [--k 50] [--block-size 512] [--workers 4]
+        [--product dense|sparse] [--dense]
+
+--dense lưu thêm cosine_sim_matrix.joblib cho SIMILARITY_MODE=dense (chế độ
+cũ, chỉ cho catalog nhỏ); backend mặc định dùng topk.
+"""
+import argparse
+import ast
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+# --- Định nghĩa các đường dẫn (tương đối với thư mục ml/) ---
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ML_DIR, "data", "processed", "cleaned_courses.csv")
+MODEL_DIR = os.path.join(ML_DIR, "models")
+TFIDF_VECTORIZER_FILE = "tfidf_vectorizer.joblib"
+COSINE_SIM_MATRIX_FILE = "cosine_sim_matrix.joblib"
+TFIDF_MATRIX_FILE = "tfidf_matrix.npz"
+TOPK_NEIGHBORS_FILE = "topk_neighbors.npz"
+COURSE_DATA_FILE = "course_data_for_recommendation.csv"
+# Số láng giềng giữ lại cho mỗi khóa học trong chế độ SIMILARITY_MODE=topk
+TOPK_NEIGHBORS = 50
+BLOCK_SIZE = 512
+
+
+def top_k_block(block: np.ndarray, first_row: int, k: int):
+    """
+    K láng giềng tốt nhất của mỗi hàng trong một khối điểm (b × N), bỏ chính
+    nó (cột first_row + i), điểm giảm dần, hòa thì index nhỏ hơn đứng trước
+    (cùng quy tắc với app/services/topk.py của backend). `block` bị ghi đè.
+    """
+    rows = np.arange(block.shape[0])
+    block[rows, first_row + rows] = -np.inf
+
+    candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(block, candidates, axis=1)
+    order = np.lexsort((candidates, -values), axis=1)
+    neighbors = np.take_along_axis(candidates, order, axis=1)
+    scores = np.take_along_axis(values, order, axis=1)
+
+    # argpartition chọn tùy ý giữa các phần tử bằng ngưỡng: hàng nào còn phần
+    # tử bằng ngưỡng nằm ngoài phần được chọn thì sắp xếp lại cả hàng
+    threshold = scores[:, -1:]
+    ambiguous = (block == threshold).sum(axis=1) > (scores == threshold).sum(axis=1)
+    for i in np.flatnonzero(ambiguous):
+        full = np.lexsort((np.arange(block.shape[1]), -block[i]))[:k]
+        neighbors[i], scores[i] = full, block[i, full]
+    return neighbors.astype(np.int32), scores.astype(np.float32)
+
+
+# Ma trận TF-IDF của tiến trình con, đọc một lần bởi _init_worker
+_worker_matrix = None
+_worker_product = "dense"
+
+
+def _init_worker(tfidf_path: str, product: str):
+    global _worker_matrix, _worker_product
+    _worker_matrix = sparse.csr_matrix(sparse.load_npz(tfidf_path), dtype=np.float32)
+    _worker_product = product
+
+
+def _score_block(start: int, stop: int, k: int):
+    matrix = _worker_matrix
+    if _worker_product == "sparse":
+        block = (matrix[start:stop] @ matrix.T).toarray()
+    else:
+        # Thưa × dày: các hàng của khối được trải dày (số từ × b), nhanh hơn
+        # nhiều so với nhân thưa × thưa khi kết quả gần như dày
+        queries = matrix[start:stop].T.toarray()
+        block = np.ascontiguousarray((matrix @ queries).T)
+    return start, *top_k_block(block, start, k)
+
+
+def compute_topk_table(
+    tfidf_path: str,
+    out_path: str,
+    k: int = TOPK_NEIGHBORS,
+    block_size: int = BLOCK_SIZE,
+    workers: int = 1,
+    product: str = "dense",
+):
+    """
+    Tính bảng top-K láng giềng từ ma trận TF-IDF đã lưu ở `tfidf_path` và ghi
+    ra `out_path` (.npz với các mảng `neighbors`, `scores`). Trả về (N, k).
+    """
+    n = sparse.load_npz(tfidf_path).shape[0]
+    k = min(k, n - 1)
+    blocks = [(start, min(start + block_size, n)) for start in range(0, n, block_size)]
+    print(
+        f"Tính top-{k} láng giềng cho {n} khóa học: {len(blocks)} khối × "
+        f"{block_size} hàng, {workers} tiến trình, nhân {product}; mỗi khối "
+        f"cần ~{block_size * n * 4 / 2**20:.0f} MB"
+    )
+
+    # Kết quả từng khối được ghi thẳng xuống đĩa, không giữ cả bảng trong RAM
+    base = os.path.splitext(out_path)[0]
+    neighbors = np.lib.format.open_memmap(
+        base + ".neighbors.npy", mode="w+", dtype=np.int32, shape=(n, k)
+    )
+    scores = np.lib.format.open_memmap(
+        base + ".scores.npy", mode="w+", dtype=np.float32, shape=(n, k)
+    )
+
+    start_time = time.perf_counter()
+    initargs = (tfidf_path, product)
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=initargs,
+        )
+        results = executor.map(
+            _score_block,
+            [b[0] for b in blocks],
+            [b[1] for b in blocks],
+            [k] * len(blocks),
+        )
+    else:
+        executor = None
+        _init_worker(*initargs)
+        results = (_score_block(a, b, k) for a, b in blocks)
+
+    try:
+        for done, (start, block_neighbors, block_scores) in enumerate(results, 1):
+            stop = start + block_neighbors.shape[0]
+            neighbors[start:stop] = block_neighbors
+            scores[start:stop] = block_scores
+            if done % 20 == 0 or done == len(blocks):
+                print(
+                    f"  {done}/{len(blocks)} khối "
+                    f"({time.perf_counter() - start_time:.1f}s)"
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    neighbors.flush()
+    scores.flush()
+    # Đóng gói thành file backend đọc (np.savez ghi memmap theo từng đoạn)
+    np.savez(out_path, neighbors=neighbors, scores=scores)
+    del neighbors, scores
+    os.remove(base + ".neighbors.npy")
+    os.remove(base + ".scores.npy")
+    return n, k
+
+
+def train_and_save_model(
+    data_path: str = DATA_PATH,
+    model_dir: str = MODEL_DIR,
+    k: int = TOPK_NEIGHBORS,
+    block_size: int = BLOCK_SIZE,
+    workers: int = 1,
+    product: str = "dense",
+    dense: bool = False,
+):
+    """
+    Huấn luyện mô hình Content-Based và lưu các thành phần cần thiết.
+    """
+    # Import tại đây: tiến trình con ("spawn") import lại module này và chỉ
+    # cần numpy/scipy
+    import joblib
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    print("--- Bắt đầu quá trình huấn luyện mô hình gợi ý ---")
+
+    # 1. Tạo thư mục models nếu chưa tồn tại
+    os.makedirs(model_dir, exist_ok=True)
+
+    # 2. Đọc dữ liệu
+    print(f"Đọc dữ liệu từ {data_path}...")
+    try:
+        df = pd.read_csv(data_path)
+    except FileNotFoundError:
+        print(f"LỖI: Không tìm thấy file dữ liệu tại '{data_path}'.")
+        print("Vui lòng chạy script data_preprocessing.py trước.")
+        return
+
+    # 3. Tiền xử lý cột skills để đưa về dạng chuỗi
+    print("Tiền xử lý cột 'processed_skills'...")
+    # Chuyển đổi chuỗi '[skill1, skill2]' thành list python
+    df["processed_skills"] = df["processed_skills"].apply(ast.literal_eval)
+    # Nối các skills trong list thành một chuỗi duy nhất, phân tách bằng khoảng trắng
+    df["skills_as_string"] = df["processed_skills"].apply(lambda x: " ".join(x))
+
+    # 4. Huấn luyện TF-IDF Vectorizer
+    print("Huấn luyện TF-IDF Vectorizer...")
+    # stop_words='english' để loại bỏ các từ phổ biến vô nghĩa trong tiếng Anh
+    tfidf_vectorizer = TfidfVectorizer(stop_words="english")
+    tfidf_matrix = tfidf_vectorizer.fit_transform(df["skills_as_string"])
+
+    # 5. Lưu các thành phần đã huấn luyện
+    path = os.path.join(model_dir, TFIDF_VECTORIZER_FILE)
+    print(f"Lưu TF-IDF Vectorizer vào: {path}")
+    joblib.dump(tfidf_vectorizer, path)
+
+    # Ma trận TF-IDF thưa dùng cho chế độ SIMILARITY_MODE=sparse và để các
+    # tiến trình tính top-K đọc lại
+    tfidf_path = os.path.join(model_dir, TFIDF_MATRIX_FILE)
+    print(f"Lưu ma trận TF-IDF thưa vào: {tfidf_path}")
+    sparse.save_npz(tfidf_path, tfidf_matrix)
+
+    # 6. Bảng top-K láng giềng dùng cho chế độ SIMILARITY_MODE=topk, tính theo khối
+    path = os.path.join(model_dir, TOPK_NEIGHBORS_FILE)
+    compute_topk_table(tfidf_path, path, k, block_size, workers, product)
+    print(f"Đã lưu bảng {k} láng giềng gần nhất vào: {path}")
+
+    # Ma trận tương đồng Cosine đầy đủ (chế độ dense cũ), chỉ khi được yêu cầu
+    if dense:
+        print("Tính toán ma trận tương đồng Cosine...")
+        cosine_sim_matrix = cosine_similarity(tfidf_matrix, tfidf_matrix)
+        path = os.path.join(model_dir, COSINE_SIM_MATRIX_FILE)
+        print(f"Lưu ma trận tương đồng Cosine {cosine_sim_matrix.shape} vào: {path}")
+        joblib.dump(cosine_sim_matrix, path)
+
+    # 7. Lưu một phiên bản DataFrame gọn nhẹ chỉ chứa thông tin cần cho gợi ý
+    # Điều này giúp service gợi ý không cần phải load cả file CSV lớn
+    path = os.path.join(model_dir, COURSE_DATA_FILE)
+    df[["id", "course_name"]].to_csv(path, index=False)
+    print(f"Lưu dữ liệu khóa học cho gợi ý vào: {path}")
+
+    print("\nHuấn luyện và lưu mô hình thành công!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--k", type=int, default=TOPK_NEIGHBORS)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--product", choices=("dense", "sparse"), default="dense")
+    parser.add_argument("--dense", action="store_true")
+    args = parser.parse_args()
+    train_and_save_model(
+        args.data,
+        args.model_dir,
+        args.k,
+        args.block_size,
+        args.workers,
+        args.product,
+        args.dense,
+    )